@@ -2,14 +2,36 @@
 # Quick MoneroOcean mining status checker
 
 WALLET="49KKJwFdsu2SVtXSKQ3XDe2Ly2qsnjniFZhSyCQHiw7rMZo5VUzEy3YWueLK5siepaWpRKzL8vxVT9Dkbpok3kv62EdzT8c"
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 
 echo "========================================"
 echo "   MONEROOCEAN MINING STATUS"
 echo "========================================"
 echo
 
-# Get local XMRig stats
-if curl -s "http://127.0.0.1:3001/1/summary" -H "Authorization: Bearer mining-dashboard" >/dev/null 2>&1; then
+# Get local XMRig stats, from the collector's snapshot when it is running
+if SNAPSHOT=$(python3 "$SCRIPT_DIR/scripts/shm_snapshot.py" env 2>/dev/null) && eval "$SNAPSHOT" && [ "$XMRIG_OK" = "1" ]; then
+    printf '📊 LOCAL MINER:\n'
+    printf '  Hashrate: %.2f H/s (1m: %.2f, 15m: %.2f)\n' "${XMRIG_HASHRATE_10S:-0}" "${XMRIG_HASHRATE_60S:-0}" "${XMRIG_HASHRATE_15M:-0}"
+    printf '  Uptime: %dh %dm\n' $((XMRIG_UPTIME / 3600)) $((XMRIG_UPTIME % 3600 / 60))
+    printf '  Shares: %d accepted, %d rejected\n' "$XMRIG_SHARES_GOOD" $((XMRIG_SHARES_TOTAL - XMRIG_SHARES_GOOD))
+    printf '  Pool: %s\n\n' "${XMRIG_POOL:-gulf.moneroocean.stream}"
+    printf '📈 RECENT SHARES:\n'
+    for WINDOW in 5M 1H 24H; do
+        ACCEPTANCE="SHARES_${WINDOW}_ACCEPTANCE" ACCEPTED="SHARES_${WINDOW}_ACCEPTED" REJECTED="SHARES_${WINDOW}_REJECTED"
+        RATE="SHARES_${WINDOW}_SHARES_PER_MIN" PING="SHARES_${WINDOW}_PING_AVG" PING_MAX="SHARES_${WINDOW}_PING_MAX"
+        if [ -z "${!ACCEPTANCE}" ]; then
+            printf '  %-4s no shares yet\n' "${WINDOW,,}"
+            continue
+        fi
+        awk -v w="${WINDOW,,}" -v a="${!ACCEPTANCE}" -v ok="${!ACCEPTED}" -v bad="${!REJECTED}" -v r="${!RATE:-0}" \
+            -v p="${!PING}" -v pm="${!PING_MAX}" 'BEGIN {
+                ping = (p == "") ? "n/a" : sprintf("%.0f ms (max %.0f)", p, pm)
+                printf "  %-4s %.1f%% accepted (%d ok, %d rejected), %.2f shares/min, ping %s\n", w, a * 100, ok, bad, r, ping
+            }'
+    done
+    echo
+elif curl -s "http://127.0.0.1:3001/1/summary" -H "Authorization: Bearer mining-dashboard" >/dev/null 2>&1; then
     curl -s "http://127.0.0.1:3001/1/summary" -H "Authorization: Bearer mining-dashboard" | python3 -c "
 import sys, json
 d = json.load(sys.stdin)
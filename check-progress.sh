@@ -1,17 +1,20 @@
 #!/bin/bash
 # Quick sync progress checker
 
-screen -r monerod -X hardcopy /tmp/sync_now.log 2>/dev/null
-CURRENT=$(grep "Synced" /tmp/sync_now.log | tail -1 | grep -oP 'Synced \K[0-9]+' | head -1)
-TOTAL=3536707
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 
-if [ -z "$CURRENT" ]; then
+# Heights come from monerod's get_info RPC (see scripts/sync_progress.py)
+eval "$(python3 "$SCRIPT_DIR/scripts/sync_progress.py" --format env)"
+
+if [ "$SYNC_AVAILABLE" != "1" ]; then
     echo "⚠️  Could not read sync status. Is monerod running?"
     exit 1
 fi
 
-PERCENT=$(echo "scale=2; $CURRENT * 100 / $TOTAL" | bc)
-REMAINING=$((TOTAL - CURRENT))
+CURRENT=$SYNC_HEIGHT
+TOTAL=$SYNC_TARGET
+PERCENT=$SYNC_PERCENT
+REMAINING=$SYNC_REMAINING
 
 # Progress bar
 FILLED=$(echo "$PERCENT / 2" | bc)
@@ -28,7 +31,7 @@ echo "Blocks: $CURRENT / $TOTAL"
 echo "Remaining: $REMAINING blocks"
 echo ""
 
-if [ $(echo "$PERCENT >= 100" | bc) -eq 1 ]; then
+if [ "$SYNC_SYNCHRONIZED" = "1" ] || [ $(echo "$PERCENT >= 100" | bc) -eq 1 ]; then
     echo "🎉 SYNC COMPLETE! Mining should be active now!"
     echo "   Check dashboard: http://localhost:3380"
 elif [ $(echo "$PERCENT >= 50" | bc) -eq 1 ]; then
@@ -39,7 +42,3 @@ else
     echo "⏳ Early stage - this is the slowest part"
     echo "   Speed increases as you reach newer blocks"
 fi
-
-echo ""
-echo "Last sync line:"
-grep "Synced" /tmp/sync_now.log | tail -1
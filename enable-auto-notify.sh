@@ -9,6 +9,11 @@ if [ ! -f "$CONFIG_FILE" ]; then
     exit 1
 fi
 
+echo "Alerts (miner offline, hashrate drop, rejected shares, stalled sync, huge pages)"
+echo "are pushed by telegram-poll-bot.py as soon as they happen and when they clear;"
+echo "rules live in ~/monero-mining/alert-rules.json (see scripts/alert_rules.py)."
+echo "This sets up an additional periodic status digest."
+echo ""
 echo "Setting up automatic notifications..."
 
 # Create cron job for every 4 hours
@@ -38,6 +38,9 @@ fi
 echo ""
 echo "Temperature & Power:"
 sensors 2>/dev/null | grep -E "Core|Package" || echo "  Install lm-sensors: sudo apt install lm-sensors"
+if [ -f ~/monero-mining/thermal-decisions.jsonl ]; then
+    echo "  Last governor decision: $(tail -n 1 ~/monero-mining/thermal-decisions.jsonl)"
+fi
 
 echo ""
 echo "Commands:"
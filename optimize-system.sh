@@ -9,10 +9,13 @@ echo "║  🚀 MONERO MINING SYSTEM OPTIMIZATION (ENTERPRISE GRADE)  ║"
 echo "╚════════════════════════════════════════════════════════════╝"
 
 # 1. Huge Pages Setup (Critical for RandomX)
-echo "[1/6] Enabling 1GB Huge Pages..."
-sudo bash -c 'echo "vm.nr_hugepages=9" >> /etc/sysctl.conf' 2>/dev/null || true
+# 2 MB pages for the RandomX dataset, cache and per-thread scratchpads of
+# config.json (scripts/hugepages.py works it out; 1280 covers 8 threads)
+HUGEPAGES=$(python3 "$(dirname "$0")/scripts/hugepages.py" --recommend 2>/dev/null || echo 1280)
+echo "[1/6] Enabling Huge Pages ($HUGEPAGES x 2 MB)..."
+sudo bash -c "echo 'vm.nr_hugepages=$HUGEPAGES' >> /etc/sysctl.conf" 2>/dev/null || true
 sudo bash -c 'echo "vm.nr_overcommit_memory=1" >> /etc/sysctl.conf' 2>/dev/null || true
-sudo sysctl -w vm.nr_hugepages=9 2>/dev/null
+sudo sysctl -w vm.nr_hugepages=$HUGEPAGES 2>/dev/null
 sudo sysctl -p > /dev/null 2>&1 || true
 
 # 2. CPU Frequency Scaling (Maximize performance)
@@ -58,7 +61,7 @@ echo ""
 echo "✓ System Optimization Complete!"
 echo ""
 echo "Huge Pages:"
-grep "nr_hugepages" /proc/sys/vm/nr_hugepages
+python3 "$(dirname "$0")/scripts/hugepages.py" 2>/dev/null || cat /proc/sys/vm/nr_hugepages
 echo ""
 echo "CPU Governor:"
 cat /sys/devices/system/cpu/cpu0/cpufreq/scaling_governor 2>/dev/null || echo "CPU governor management not available"
@@ -0,0 +1,269 @@
+"""Declarative alert rules evaluated incrementally on every collector sample.
+
+The cron-driven status scripts push a full status dump on a timer whatever
+the state, forking screen, curl, jq, top and bc each time. Instead, the
+Telegram bot feeds each new snapshot (shm_snapshot.py) to an AlertEngine,
+which sends a message when a rule starts firing and, optionally, when it
+resolves.
+
+A rule names a dotted snapshot metric and an operator:
+
+- `<`, `<=`, `>`, `>=`, `==`, `!=` against `value`,
+- `true` / `false` on the metric's truthiness,
+- `unchanged`: the metric has not moved since the previous sample,
+- `below_ewma`: the metric is under `value` times its own EWMA with time
+  constant `tau` seconds (irregular sample spacing is accounted for),
+- `stale`: the metric is an age in seconds and is over `value`; while it is
+  missing (nothing has arrived yet) the time since it went missing counts
+  as the age, so data that never arrives alerts too.
+
+The condition must hold for `for` seconds before the rule fires. `requires`
+and `unless` name metrics that must be truthy / falsy for the rule to be
+evaluated at all; samples that fail them leave the rule's state untouched.
+Once fired, a rule stays quiet until it resolves (de-duplication), and it
+does not notify again within `cooldown` seconds of its last notification;
+a suppressed firing does not send a resolve either.
+
+Event texts use Telegram's Markdown; names, metrics and string values are
+escaped so an underscore in a rule name cannot break the message.
+
+Every rule keeps a few scalars of state, so a sample costs O(1) per rule.
+Rules come from ~/monero-mining/alert-rules.json (a JSON list of objects
+with the Rule field names; `for` may be used for `for_`) or DEFAULT_RULES.
+
+    python3 scripts/alert_rules.py          # print events for the live snapshot
+"""
+
+import argparse
+import json
+import math
+import operator
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from miner_api import MONERO_CONFIG
+
+RULES_FILE = MONERO_CONFIG.parent / "alert-rules.json"
+
+COMPARISONS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+               "==": operator.eq, "!=": operator.ne}
+OPERATORS = (*COMPARISONS, "true", "false", "unchanged", "below_ewma", "stale")
+MARKDOWN_SPECIAL = "_*[`"
+
+
+class Rule(NamedTuple):
+    name: str
+    metric: str  # dotted snapshot key, e.g. "xmrig.hashrate_60s"
+    op: str
+    value: Any = None
+    for_: float = 0.0  # seconds the condition must hold
+    cooldown: float = 900.0  # minimum seconds between notifications
+    resolve: bool = True  # send a message when it clears
+    requires: Optional[str] = None  # evaluate only while this metric is truthy
+    unless: Optional[str] = None  # skip while this metric is truthy
+    tau: float = 3600.0  # below_ewma time constant
+    warmup: float = 0.0  # below_ewma: seconds of EWMA before it can fire
+    message: str = "{name}: {metric} is {current}"
+
+
+DEFAULT_RULES = (
+    Rule("miner_offline", "xmrig_proc.running", "false", for_=120.0,
+         message="XMRig has been offline for {duration}"),
+    Rule("hashrate_drop", "xmrig.hashrate_60s", "below_ewma", 0.8, for_=300.0, requires="xmrig.ok",
+         tau=3600.0, warmup=900.0,
+         message="Hashrate {current:.0f} H/s is below 80% of its 1 h average ({ewma:.0f} H/s) for {duration}"),
+    Rule("reject_rate", "shares.1h.acceptance", "<", 0.95, requires="shares.1h.rejected",
+         message="Only {current:.1%} of shares accepted in the last hour"),
+    Rule("sync_stalled", "sync.height", "unchanged", for_=900.0, requires="sync.available",
+         unless="sync.synchronized", message="monerod sync stuck at height {current} for {duration}"),
+    # pool.age is missing until the first good fetch, and pool.ok False until then
+    Rule("pool_api_down", "pool.age", "stale", 900.0, requires="pool", cooldown=3600.0,
+         message="MoneroOcean API unreachable: no fresh pool stats for {age}"),
+    Rule("hugepages_fallback", "hugepages.alert", "true", cooldown=0.0, message="{current}"),
+    Rule("thread_underperforming", "threads.alert", "true", cooldown=3600.0, message="{current}"),
+)
+
+
+def lookup(sample: dict, key: str) -> Any:
+    node: Any = sample
+    for part in key.split("."):
+        if not isinstance(node, dict):
+            return None
+        node = node.get(part)
+    return node
+
+
+def escape_markdown(value: Any) -> Any:
+    """`value` with Telegram Markdown's special characters escaped; non-strings as is."""
+    if not isinstance(value, str):
+        return value
+    for char in MARKDOWN_SPECIAL:
+        value = value.replace(char, "\\" + char)
+    return value
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds < 120:
+        return f"{seconds}s"
+    if seconds < 7200:
+        return f"{seconds // 60} min"
+    return f"{seconds / 3600:.1f} h"
+
+
+def load_rules(path: Path = RULES_FILE) -> Sequence[Rule]:
+    """Rules from `path`, or DEFAULT_RULES when it does not exist."""
+    if not path.exists():
+        return DEFAULT_RULES
+    with path.open("r", encoding="utf-8") as fh:
+        specs = json.load(fh)
+    rules = []
+    for spec in specs:
+        spec = dict(spec)
+        if "for" in spec:
+            spec["for_"] = spec.pop("for")
+        rule = Rule(**spec)
+        if rule.op not in OPERATORS:
+            raise ValueError(f"rule {rule.name}: unknown op {rule.op!r}")
+        rules.append(rule)
+    return tuple(rules)
+
+
+class Event(NamedTuple):
+    rule: str
+    kind: str  # "firing" or "resolved"
+    when: float
+    text: str
+
+
+class RuleState:
+    """Per-rule scalars: everything a sample needs to update in O(1)."""
+
+    __slots__ = ("since", "firing", "notified", "last_notified", "previous", "ewma", "ewma_at", "ewma_start",
+                 "missing_since")
+
+    def __init__(self) -> None:
+        self.since: Optional[float] = None  # condition true since
+        self.firing = False
+        self.notified = False  # the current firing was announced
+        self.last_notified = -math.inf
+        self.previous: Any = None
+        self.ewma: Optional[float] = None
+        self.ewma_at: Optional[float] = None
+        self.ewma_start: Optional[float] = None
+        self.missing_since: Optional[float] = None  # stale: metric missing since
+
+
+class AlertEngine:
+    """Evaluates rules on each sample and hands messages to `notify`."""
+
+    def __init__(self, rules: Sequence[Rule] = DEFAULT_RULES, notify: Optional[Callable[[str], Any]] = None) -> None:
+        self.rules = tuple(rules)
+        self.notify = notify
+        self.states: Dict[str, RuleState] = {rule.name: RuleState() for rule in self.rules}
+
+    def _condition(self, rule: Rule, state: RuleState, current: Any, now: float) -> Dict[str, Any]:
+        """Update the rule's running state; returns the condition and format fields."""
+        fields: Dict[str, Any] = {}
+        if rule.op in COMPARISONS:
+            active = current is not None and COMPARISONS[rule.op](current, rule.value)
+        elif rule.op == "true":
+            active = bool(current)
+        elif rule.op == "false":
+            active = not current
+        elif rule.op == "unchanged":
+            active = state.previous is not None and current == state.previous
+            state.previous = current
+        elif rule.op == "stale":
+            if current is None:
+                if state.missing_since is None:
+                    state.missing_since = now
+                age = now - state.missing_since
+            else:
+                state.missing_since = None
+                age = float(current)
+            active = age > rule.value
+            fields["age"] = age
+        else:  # below_ewma
+            active = False
+            if current is not None:
+                if state.ewma is None:
+                    state.ewma, state.ewma_start = float(current), now
+                else:
+                    active = (now - state.ewma_start >= rule.warmup and current < rule.value * state.ewma)
+                    alpha = 1.0 - math.exp(-max(0.0, now - state.ewma_at) / rule.tau)
+                    state.ewma += alpha * (current - state.ewma)
+                state.ewma_at = now
+                fields["ewma"] = state.ewma
+        fields["active"] = active
+        return fields
+
+    def evaluate(self, sample: dict, now: Optional[float] = None) -> List[Event]:
+        """Feed one sample; returns (and notifies) the events it caused."""
+        now = time.time() if now is None else now
+        events = []
+        for rule in self.rules:
+            state = self.states[rule.name]
+            if rule.requires and not lookup(sample, rule.requires):
+                continue
+            if rule.unless and lookup(sample, rule.unless):
+                continue
+            current = lookup(sample, rule.metric)
+            fields = self._condition(rule, state, current, now)
+            if fields.pop("active"):
+                if state.since is None:
+                    state.since = now
+                if state.firing or now - state.since < rule.for_:
+                    continue
+                state.firing = True
+                state.notified = now - state.last_notified >= rule.cooldown
+                if not state.notified:
+                    continue
+                state.last_notified = now
+                text = rule.message.format(name=escape_markdown(rule.name), metric=escape_markdown(rule.metric),
+                                           current=escape_markdown(current), threshold=rule.value,
+                                           duration=format_duration(now - state.since),
+                                           ewma=fields.get("ewma", 0.0), age=format_duration(fields.get("age", 0.0)))
+                events.append(Event(rule.name, "firing", now, f"⚠️ *ALERT* {text}"))
+            else:
+                since, state.since = state.since, None
+                if not state.firing:
+                    continue
+                state.firing = False
+                if state.notified and rule.resolve:
+                    text = f"{escape_markdown(rule.name)} after {format_duration(now - since)}"
+                    events.append(Event(rule.name, "resolved", now, f"✅ *RESOLVED* {text}"))
+        if self.notify:
+            for event in events:
+                self.notify(event.text)
+        return events
+
+    def status(self) -> Dict[str, dict]:
+        return {name: {"firing": state.firing, "since": state.since} for name, state in self.states.items()}
+
+
+def main() -> None:
+    from shm_snapshot import SnapshotReader
+
+    parser = argparse.ArgumentParser(description="Evaluate the alert rules against the collector snapshot")
+    parser.add_argument("--rules", type=Path, default=RULES_FILE)
+    parser.add_argument("--interval", type=float, default=1.0)
+    args = parser.parse_args()
+    engine = AlertEngine(load_rules(args.rules), notify=print)
+    reader = SnapshotReader()
+    print(f"Watching {len(engine.rules)} rules: {', '.join(rule.name for rule in engine.rules)}")
+    last_seq = None
+    while True:
+        snapshot = reader.read()
+        if snapshot and snapshot["seq"] != last_seq:
+            last_seq = snapshot["seq"]
+            engine.evaluate(snapshot)
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""Empirical thread-layout autotuner for XMRig's RandomX profile.
+
+`cpu.rx` in config.json was written by hand. This tries alternatives on the
+running miner through its HTTP config API and keeps the fastest:
+
+    python3 scripts/autotune.py                      # tune the local miner
+    python3 scripts/autotune.py --simulate           # against a stand-in
+    python3 scripts/autotune.py --threads 4,5,6 --prefetch 1,2 --exhaustive
+
+Each candidate is a thread count, an affinity layout ("cores": one thread
+per physical core before any hyperthread sibling, "sequential": logical
+CPUs 0..n-1, "unpinned": affinity -1), an intensity and a
+`randomx.scratchpad_prefetch_mode`. It is applied with PUT /2/config, and
+/1/summary is sampled until the 10s hashrate is stable: the last `window`
+samples have a relative stdev under `tolerance` and no upward trend. A
+candidate that has settled clearly below the best so far is pruned after
+half a window instead of being measured out.
+
+The search is staged (layout, then prefetch mode, then intensity, each on
+the best so far); --exhaustive measures the full grid instead. The top
+candidates and the original config are measured again with a longer
+window, and the winner is written back only if it beats the original by
+`min_gain`; otherwise the original config is restored. XMRig persists the
+change itself when `autosave` is on; --write-config also updates a
+config file. Every measurement is appended to a JSON-lines results log.
+
+The API must be writable: "restricted": false under "http" in config.json.
+"""
+
+import argparse
+import copy
+import json
+import os
+import statistics
+import sys
+import time
+import urllib.error
+import urllib.request
+from itertools import product
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from miner_api import MONERO_CONFIG, XMRIG_API, XMRIG_TOKEN
+
+LAYOUTS = ("cores", "sequential", "unpinned")
+PREFETCH_MODES = (0, 1, 2, 3)
+INTENSITIES = (1, 2)
+RESULTS_LOG = MONERO_CONFIG.parent / "autotune-results.jsonl"
+REPO_CONFIG = Path(__file__).resolve().parent.parent / "config.json"
+
+
+class TuneError(RuntimeError):
+    """The miner API refused or failed a request."""
+
+
+class Candidate(NamedTuple):
+    threads: int
+    layout: str
+    intensity: int
+    prefetch: int
+
+    def label(self) -> str:
+        return f"{self.threads}x {self.layout} i{self.intensity} pf{self.prefetch}"
+
+
+class Settings(NamedTuple):
+    interval: float = 2.0  # seconds between /1/summary samples
+    window: int = 10  # samples that must agree
+    tolerance: float = 0.015  # max relative stdev of a stable window
+    max_samples: int = 60  # give up stabilizing after this many
+    warmup_timeout: float = 180.0  # longest wait for the first 10s hashrate
+    prune_margin: float = 0.05  # prune when settled this far below the best
+    min_gain: float = 0.01  # required gain over the original config
+    confirm: int = 3  # finalists re-measured at the end
+
+
+DEFAULTS = Settings()
+
+
+def read_topology(sys_root: str = "/sys") -> List[List[int]]:
+    """Logical CPUs grouped by physical core, e.g. [[0, 4], [1, 5], ...]."""
+    groups = set()
+    for path in Path(sys_root, "devices/system/cpu").glob("cpu[0-9]*/topology/thread_siblings_list"):
+        try:
+            text = path.read_text().strip()
+        except OSError:
+            continue
+        cpus = []
+        for part in text.split(","):
+            first, _, last = part.partition("-")
+            cpus.extend(range(int(first), int(last or first) + 1))
+        groups.add(tuple(sorted(cpus)))
+    if not groups:
+        return [[cpu] for cpu in range(os.cpu_count() or 1)]
+    return [list(group) for group in sorted(groups)]
+
+
+def affinity(layout: str, threads: int, siblings: List[List[int]]) -> List[int]:
+    """CPU of each thread for a layout; raises ValueError for unknown layouts."""
+    if layout == "unpinned":
+        return [-1] * threads
+    if layout == "sequential":
+        order = sorted(cpu for group in siblings for cpu in group)
+    elif layout == "cores":
+        depth = max(len(group) for group in siblings)
+        order = [group[i] for i in range(depth) for group in siblings if i < len(group)]
+    else:
+        raise ValueError(f"unknown layout {layout!r}")
+    # more threads than CPUs wrap around and share
+    return [order[i % len(order)] for i in range(threads)]
+
+
+def apply_candidate(config: dict, candidate: Candidate, siblings: List[List[int]], profile: str = "rx") -> dict:
+    """Copy of `config` with the candidate's layout and prefetch mode."""
+    tuned = copy.deepcopy(config)
+    cpus = affinity(candidate.layout, candidate.threads, siblings)
+    tuned.setdefault("cpu", {})[profile] = [[candidate.intensity, cpu] for cpu in cpus]
+    tuned.setdefault("randomx", {})["scratchpad_prefetch_mode"] = candidate.prefetch
+    return tuned
+
+
+def config_key(config: dict, profile: str = "rx") -> str:
+    """What a measurement depends on, to skip duplicate candidates."""
+    return json.dumps([config.get("cpu", {}).get(profile),
+                       config.get("randomx", {}).get("scratchpad_prefetch_mode")])
+
+
+def relative_stdev(values: List[float]) -> float:
+    mean = statistics.fmean(values)
+    return statistics.pstdev(values) / mean if mean else float("inf")
+
+
+def trend(values: List[float]) -> float:
+    """Relative change from the first half of `values` to the second."""
+    half = len(values) // 2
+    first = statistics.fmean(values[:half])
+    return (statistics.fmean(values[half:]) - first) / first if first else float("inf")
+
+
+class XMRigClient:
+    """The two XMRig API calls the tuner needs, with bearer auth."""
+
+    def __init__(self, url: str = XMRIG_API, token: str = XMRIG_TOKEN, timeout: float = 10.0) -> None:
+        self.url = url.rstrip("/")
+        self.token = token
+        self.timeout = timeout
+
+    def _request(self, method: str, path: str, payload: Optional[dict] = None) -> dict:
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        req = urllib.request.Request(self.url + path, data=data, method=method)
+        req.add_header("Authorization", f"Bearer {self.token}")
+        if data is not None:
+            req.add_header("Content-Type", "application/json")
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                body = resp.read()
+        except urllib.error.HTTPError as exc:
+            if exc.code == 403:
+                raise TuneError(f"{method} {path}: 403, set \"restricted\": false under \"http\" "
+                                "in the miner config to allow config changes") from exc
+            raise TuneError(f"{method} {path}: HTTP {exc.code}") from exc
+        except (urllib.error.URLError, OSError) as exc:
+            raise TuneError(f"{method} {path}: {exc}") from exc
+        return json.loads(body) if body else {}
+
+    def get_config(self) -> dict:
+        return self._request("GET", "/2/config")
+
+    def put_config(self, config: dict) -> None:
+        self._request("PUT", "/2/config", config)
+
+    def hashrate(self) -> Optional[float]:
+        """Current 10s total hashrate; None while the miner is warming up."""
+        total = self._request("GET", "/1/summary").get("hashrate", {}).get("total") or [None]
+        return total[0]
+
+
+class Autotuner:
+    """Runs the search against one miner and logs every measurement."""
+
+    def __init__(self, client: XMRigClient, base: dict, siblings: List[List[int]], settings: Settings = DEFAULTS,
+                 results_log: Optional[Path] = RESULTS_LOG, profile: str = "rx", tags: Optional[dict] = None) -> None:
+        self.client = client
+        self.base = base
+        self.siblings = siblings
+        self.settings = settings
+        self.results_log = results_log
+        self.profile = profile
+        self.tags = tags or {}
+        self.best: Optional[float] = None
+        self.measured: Dict[str, dict] = {}
+
+    def log(self, record: dict) -> None:
+        if self.results_log is None:
+            return
+        record = {"time": round(time.time(), 1), **self.tags, **record}
+        with open(self.results_log, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record) + "\n")
+
+    def measure(self, config: dict, window: int, prune: bool = True) -> dict:
+        """Apply `config` and sample the 10s hashrate until it is stable."""
+        s = self.settings
+        started = time.monotonic()
+        self.client.put_config(config)
+        samples: List[float] = []
+        status = "unstable"
+        deadline = started + s.warmup_timeout
+        while len(samples) < max(s.max_samples, window):
+            time.sleep(s.interval)
+            rate = self.client.hashrate()
+            if rate is None:
+                if not samples and time.monotonic() > deadline:
+                    status = "no-hashrate"
+                    break
+                continue
+            samples.append(rate)
+            recent = samples[-window:]
+            if len(recent) >= 2 and trend(recent) <= s.tolerance:
+                if len(recent) == window and relative_stdev(recent) <= s.tolerance:
+                    status = "stable"
+                    break
+                if (prune and self.best and len(recent) >= window // 2
+                        and max(recent) < self.best * (1 - s.prune_margin)):
+                    status = "pruned"
+                    break
+        recent = samples[-window:]
+        return {
+            "status": status,
+            "hashrate": round(statistics.fmean(recent), 1) if recent else None,
+            "rel_stdev": round(relative_stdev(recent), 4) if len(recent) > 1 else None,
+            "samples": len(samples),
+            "seconds": round(time.monotonic() - started, 1),
+        }
+
+    def evaluate(self, stage: str, label: str, config: dict, candidate: Optional[Candidate] = None,
+                 window: Optional[int] = None, prune: bool = True) -> dict:
+        result = self.measure(config, window or self.settings.window, prune)
+        if result["status"] != "pruned" and result["hashrate"] and (self.best is None or result["hashrate"] > self.best):
+            self.best = result["hashrate"]
+        record = {"stage": stage, "label": label, **(candidate._asdict() if candidate else {}),
+                  "rx": config.get("cpu", {}).get(self.profile), **result}
+        self.log(record)
+        mark = "" if result["status"] == "stable" else f" ({result['status']})"
+        print(f"  {stage:<9} {label:<28} {result['hashrate'] or 0:>9.1f} H/s{mark}", flush=True)
+        return record
+
+    def search(self, stages: Iterable[Tuple[str, Callable[[Candidate], List[Candidate]]]], start: Candidate) -> Candidate:
+        """Staged search; each stage's candidates are built from the best so far."""
+        best = start
+        for stage, build in stages:
+            for candidate in build(best):
+                config = apply_candidate(self.base, candidate, self.siblings, self.profile)
+                key = config_key(config, self.profile)
+                if key in self.measured:
+                    continue
+                self.measured[key] = {**self.evaluate(stage, candidate.label(), config, candidate),
+                                      "candidate": candidate}
+            ranked = self.ranked()
+            if ranked:
+                best = ranked[0]["candidate"]
+        return best
+
+    def ranked(self) -> List[dict]:
+        done = [r for r in self.measured.values() if r["status"] in ("stable", "unstable") and r["hashrate"]]
+        return sorted(done, key=lambda r: r["hashrate"], reverse=True)
+
+    def run(self, threads: List[int], layouts: List[str], intensities: List[int], prefetch: List[int],
+            exhaustive: bool = False, apply: bool = True) -> dict:
+        s = self.settings
+        current = self.base.get("randomx", {}).get("scratchpad_prefetch_mode")
+        start = Candidate(threads[0], layouts[0], intensities[0], current if current in prefetch else prefetch[0])
+        if exhaustive:
+            stages = [("grid", lambda best: [Candidate(*c) for c in product(threads, layouts, intensities, prefetch)])]
+        else:
+            stages = [
+                ("layout", lambda best: [best._replace(threads=t, layout=l) for t, l in product(threads, layouts)]),
+                ("prefetch", lambda best: [best._replace(prefetch=p) for p in prefetch]),
+                ("intensity", lambda best: [best._replace(intensity=i) for i in intensities]),
+            ]
+        finished = False
+        try:
+            baseline = self.evaluate("baseline", "current config", self.base, prune=False)
+            self.search(stages, start)
+            # fresh, longer measurements of the finalists and the original
+            finalists = [r["candidate"] for r in self.ranked()[:s.confirm]]
+            self.best = None
+            confirmed_base = self.evaluate("confirm", "current config", self.base, window=s.window * 2, prune=False)
+            confirmed = []
+            for candidate in finalists:
+                config = apply_candidate(self.base, candidate, self.siblings, self.profile)
+                record = self.evaluate("confirm", candidate.label(), config, candidate, window=s.window * 2, prune=False)
+                if record["hashrate"]:
+                    confirmed.append((record["hashrate"], candidate, config))
+            confirmed.sort(key=lambda item: item[0], reverse=True)
+            base_rate = confirmed_base["hashrate"] or baseline["hashrate"] or 0.0
+            winner = None
+            if confirmed and confirmed[0][0] > base_rate * (1 + s.min_gain):
+                winner = confirmed[0]
+            final = winner[2] if winner and apply else self.base
+            self.client.put_config(final)
+            finished = True
+        finally:
+            if not finished:
+                # leave the miner as we found it
+                try:
+                    self.client.put_config(self.base)
+                except TuneError as exc:
+                    print(f"Could not restore the original config: {exc}", file=sys.stderr)
+        result = {
+            "stage": "result",
+            "baseline": base_rate,
+            "best": winner[1]._asdict() if winner else None,
+            "hashrate": winner[0] if winner else base_rate,
+            "gain": round(winner[0] / base_rate - 1, 4) if winner and base_rate else 0.0,
+            "rx": final.get("cpu", {}).get(self.profile),
+            "applied": bool(winner and apply),
+            "measured": len(self.measured),
+        }
+        self.log(result)
+        result["config"] = final
+        return result
+
+
+def write_config(path: Path, tuned: dict, profile: str = "rx") -> None:
+    """Copy the tuned layout and prefetch mode into a config file; nothing else changes."""
+    with path.open("r", encoding="utf-8") as fh:
+        config = json.load(fh)
+    config.setdefault("cpu", {})[profile] = tuned["cpu"][profile]
+    config.setdefault("randomx", {})["scratchpad_prefetch_mode"] = tuned["randomx"]["scratchpad_prefetch_mode"]
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as fh:
+        json.dump(config, fh, indent=4)
+        fh.write("\n")
+    os.replace(tmp, path)
+
+
+def int_list(text: str) -> List[int]:
+    return [int(part) for part in text.split(",") if part.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tune XMRig's RandomX thread layout through its HTTP API")
+    parser.add_argument("--url", default=XMRIG_API, help="XMRig HTTP API")
+    parser.add_argument("--token", default=XMRIG_TOKEN, help="XMRig access token")
+    parser.add_argument("--profile", default="rx", help="cpu profile to tune")
+    parser.add_argument("--threads", type=int_list, help="thread counts to try (default: cores, 1.5x cores, CPUs)")
+    parser.add_argument("--layouts", default=",".join(LAYOUTS), help=f"affinity layouts ({', '.join(LAYOUTS)})")
+    parser.add_argument("--intensities", type=int_list, default=list(INTENSITIES))
+    parser.add_argument("--prefetch", type=int_list, default=list(PREFETCH_MODES), help="scratchpad prefetch modes")
+    parser.add_argument("--exhaustive", action="store_true", help="measure the full grid instead of staged search")
+    parser.add_argument("--interval", type=float, help="seconds between samples (default 2, 0.2 simulated)")
+    parser.add_argument("--window", type=int, default=DEFAULTS.window, help="samples in a stable window")
+    parser.add_argument("--tolerance", type=float, default=DEFAULTS.tolerance, help="max relative stdev when stable")
+    parser.add_argument("--min-gain", type=float, default=DEFAULTS.min_gain, help="required gain over the original")
+    parser.add_argument("--results", type=Path, default=RESULTS_LOG, help="JSON-lines results log")
+    parser.add_argument("--no-apply", action="store_true", help="measure only; restore the original config")
+    parser.add_argument("--write-config", type=Path, help="also write the winning layout into this config file")
+    parser.add_argument("--simulate", action="store_true", help="tune a stand-in XMRig (scripts/standins.py)")
+    parser.add_argument("--config", type=Path, help="config the stand-in starts from (default: the miner's)")
+    args = parser.parse_args()
+
+    layouts = [layout for layout in args.layouts.split(",") if layout]
+    unknown = set(layouts) - set(LAYOUTS)
+    if unknown:
+        parser.error(f"unknown layouts: {', '.join(sorted(unknown))}")
+    settings = Settings(window=args.window, tolerance=args.tolerance, min_gain=args.min_gain,
+                        interval=args.interval or (0.2 if args.simulate else DEFAULTS.interval))
+    tags = {}
+    if args.simulate:
+        from standins import FakeXMRig, serve
+
+        source = args.config or (MONERO_CONFIG if MONERO_CONFIG.exists() else REPO_CONFIG)
+        with source.open("r", encoding="utf-8") as fh:
+            fake = FakeXMRig(config=json.load(fh), warmup=1.0, settle=2.0)
+        server = serve(fake)
+        client = XMRigClient(f"http://127.0.0.1:{server.server_port}", fake.token)
+        siblings = FakeXMRig.SIBLINGS
+        settings = settings._replace(warmup_timeout=10.0)
+        tags["simulated"] = True
+    else:
+        client = XMRigClient(args.url, args.token)
+        siblings = read_topology()
+    logical = sum(len(group) for group in siblings)
+    threads = args.threads or sorted({len(siblings), len(siblings) + len(siblings) // 2, logical})
+
+    try:
+        base = client.get_config()
+    except TuneError as exc:
+        sys.exit(f"Cannot read the miner config: {exc}")
+    grid = len(threads) * len(layouts) * len(args.intensities) * len(args.prefetch)
+    print(f"Tuning cpu.{args.profile} on {len(siblings)} cores / {logical} CPUs "
+          f"({'full grid of' if args.exhaustive else 'staged search over'} {grid} candidates)")
+    if args.results:
+        args.results.parent.mkdir(parents=True, exist_ok=True)
+    tuner = Autotuner(client, base, siblings, settings, args.results, args.profile, tags)
+    try:
+        result = tuner.run(threads, layouts, args.intensities, args.prefetch, args.exhaustive, not args.no_apply)
+    except TuneError as exc:
+        sys.exit(f"Autotune aborted: {exc}")
+    except KeyboardInterrupt:
+        sys.exit("Interrupted; original config restored")
+
+    print(f"Original config: {result['baseline']:.1f} H/s")
+    if result["best"]:
+        best = Candidate(**result["best"])
+        print(f"Best: {best.label()} at {result['hashrate']:.1f} H/s ({result['gain'] * 100:+.1f} %)")
+        print(f"cpu.{args.profile}: {json.dumps(result['rx'])}")
+    else:
+        print(f"Nothing beat the original config by {settings.min_gain * 100:.1f} %")
+    if result["applied"]:
+        print("Applied to the miner")
+        if args.write_config:
+            write_config(args.write_config, result["config"], args.profile)
+            print(f"Written to {args.write_config}")
+    if args.results:
+        print(f"Results appended to {args.results}")
+
+
+if __name__ == "__main__":
+    main()
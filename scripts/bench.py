@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""Benchmarks for the dashboard, bot and collector hot paths.
+
+Starts local stand-ins (scripts/standins.py) for XMRig, MoneroOcean, monerod
+and the Telegram Bot API, points the tools at them through their environment
+overrides, and measures:
+
+- the collectors each tool runs (nanopool_dashboard, mining-dashboard,
+  telegram-poll-bot, collector.py), called back to back;
+- the HTTP endpoints (nanopool "/", /api/snapshot and /api/history,
+  mining-dashboard /api/stats) under concurrent keep-alive load;
+- a burst of /status commands answered by the bot;
+
+once polling upstream directly and once reading a collector snapshot. For each it
+reports p50/p99 latency, throughput, CPU time per call (process CPU, which
+for HTTP benchmarks includes the load-generating clients) and the number of
+subprocesses spawned per call. Results go to a JSON file so runs can be
+compared between commits:
+
+    python3 scripts/bench.py --output bench-base.json
+    python3 scripts/bench.py --latency 0.05 --fail-rate 0.2 --compare bench-base.json
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from loadtest import load_test, percentile
+from standins import FakeMoneroOcean, FakeMonerod, FakeTelegram, FakeXMRig, serve
+
+ROOT = Path(__file__).resolve().parent.parent
+BENCH_WALLET = "4" + "A" * 94
+
+
+class SubprocessCounter:
+    """Counts subprocess.Popen instances created while installed."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self._original = subprocess.Popen.__init__
+
+    def install(self) -> None:
+        original, counter = self._original, self
+
+        def counting_init(popen, *args, **kwargs):  # noqa: ANN001
+            counter.count += 1
+            return original(popen, *args, **kwargs)
+
+        subprocess.Popen.__init__ = counting_init
+
+
+SUBPROCESSES = SubprocessCounter()
+
+
+def start_standins(latency: float, fail_rate: float) -> Dict[str, object]:
+    """Start every stand-in and export the environment overrides for them."""
+    fakes = {
+        "xmrig": FakeXMRig(latency=latency, fail_rate=fail_rate),
+        "moneroocean": FakeMoneroOcean(latency=latency, fail_rate=fail_rate),
+        "monerod": FakeMonerod(latency=latency, fail_rate=fail_rate),
+        "telegram": FakeTelegram(latency=latency, fail_rate=fail_rate, max_wait=0.5),
+    }
+    ports = {name: serve(fake).server_port for name, fake in fakes.items()}
+    os.environ["XMRIG_API"] = f"http://127.0.0.1:{ports['xmrig']}"
+    os.environ["XMRIG_TOKEN"] = fakes["xmrig"].token
+    os.environ["MONEROOCEAN_API"] = f"http://127.0.0.1:{ports['moneroocean']}"
+    os.environ["MONEROD_RPC_URL"] = f"http://127.0.0.1:{ports['monerod']}/json_rpc"
+    os.environ["TELEGRAM_API"] = f"http://127.0.0.1:{ports['telegram']}"
+    # never read a real collector's snapshot
+    os.environ["STATS_SEGMENT"] = f"monerominer-bench-{os.getpid()}"
+    return fakes
+
+
+def load_script(name: str, path: Path):
+    """Import one of the hyphenated entry points as a module."""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def time_calls(fn: Callable[[], object], calls: int) -> dict:
+    """Call `fn` back to back and summarise latency, CPU and subprocesses."""
+    latencies = []
+    errors = 0
+    spawned = SUBPROCESSES.count
+    cpu = time.process_time()
+    started = time.perf_counter()
+    for _ in range(calls):
+        t0 = time.perf_counter()
+        try:
+            fn()
+        except Exception:  # noqa: BLE001
+            errors += 1
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+    return summarise(sorted(latencies), elapsed, time.process_time() - cpu, SUBPROCESSES.count - spawned, errors)
+
+
+def summarise(latencies: List[float], elapsed: float, cpu: float, spawned: int, errors: int) -> dict:
+    calls = len(latencies) or 1
+    return {
+        "calls": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "cpu_ms_per_call": round(cpu * 1000 / calls, 3),
+        "subprocesses_per_call": round(spawned / calls, 3),
+    }
+
+
+def time_endpoint(url: str, clients: int, requests: int) -> dict:
+    spawned = SUBPROCESSES.count
+    cpu = time.process_time()
+    result = load_test(url, clients, requests)
+    calls = result["requests"] or 1
+    return {
+        "calls": result["requests"],
+        "errors": result["errors"],
+        "p50_ms": result["p50_ms"],
+        "p99_ms": result["p99_ms"],
+        "max_ms": result["max_ms"],
+        "throughput_rps": result["throughput_rps"],
+        "cpu_ms_per_call": round((time.process_time() - cpu) * 1000 / calls, 3),
+        "subprocesses_per_call": round((SUBPROCESSES.count - spawned) / calls, 3),
+    }
+
+
+def serve_handler(server_cls, handler) -> object:
+    server = server_cls(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def bench_bot_burst(bot, telegram: FakeTelegram, chats: int, bursts: int) -> dict:
+    """Time from a burst of /status (every chat, twice) to the last reply."""
+    threading.Thread(target=bot.poll_updates, daemon=True).start()
+    time.sleep(0.2)  # let the bot skip the (empty) backlog first
+    latencies = []
+    spawned = SUBPROCESSES.count
+    cpu = time.process_time()
+    started = time.perf_counter()
+    for _ in range(bursts):
+        expected = len(telegram.sent) + chats
+        t0 = time.perf_counter()
+        for chat in range(chats):
+            telegram.push(1000 + chat, "/status")
+            telegram.push(1000 + chat, "/status")
+        telegram.wait_sent(expected, timeout=30)
+        latencies.append(time.perf_counter() - t0)
+        time.sleep(1.1)  # let the per-chat limit refill between bursts
+    elapsed = time.perf_counter() - started
+    return summarise(sorted(latencies), elapsed, time.process_time() - cpu, SUBPROCESSES.count - spawned, 0)
+
+
+def run(args: argparse.Namespace) -> dict:
+    fakes = start_standins(args.latency, args.fail_rate)
+    SUBPROCESSES.install()
+    sys.path.insert(0, str(ROOT / "scripts"))
+
+    import collector
+    import nanopool_dashboard
+    from http_serving import PooledHTTPServer
+    from shm_snapshot import SnapshotWriter
+    from stats_cache import StatsCache
+
+    nanopool_dashboard.MONERO_WALLET = BENCH_WALLET
+    collector.WALLET = BENCH_WALLET
+    dashboard = load_script("mining_dashboard", ROOT / "mining-dashboard.py")
+    try:
+        bot = load_script("telegram_poll_bot", ROOT / "telegram-poll-bot.py")
+    except ImportError as exc:
+        bot = None
+        print(f"skipping telegram-poll-bot: {exc}", file=sys.stderr)
+
+    calls = args.calls
+    functions = {
+        "nanopool.get_system_stats": nanopool_dashboard.get_system_stats,
+        "nanopool.get_process_snapshot": lambda: nanopool_dashboard.get_process_snapshot("xmrig"),
+        "nanopool.get_monero_pool_stats": nanopool_dashboard.get_monero_pool_stats,
+        "mining_dashboard.get_mining_stats": dashboard.MiningDashboard.get_mining_stats,
+    }
+    if bot:
+        functions["bot.get_mining_status"] = bot.get_mining_status
+    collectors = {
+        "collector.collect_xmrig": collector.collect_xmrig,
+        "collector.collect_pool": collector.collect_pool,
+        "collector.collect_host": collector.collect_host,
+        "collector.collect_processes": collector.collect_processes,
+        "collector.sync": collector.SYNC.poll,
+    }
+
+    results = {}
+
+    def record(name: str, result: dict) -> None:
+        results[name] = result
+        print(f"{name:<45} p50 {result['p50_ms']:>9.3f} ms  p99 {result['p99_ms']:>9.3f} ms  "
+              f"{result['throughput_rps']:>9.1f}/s  cpu {result['cpu_ms_per_call']:.3f} ms  "
+              f"subproc {result['subprocesses_per_call']}", file=sys.stderr)
+
+    # 1. every tool polling upstream itself
+    for name, fn in {**collectors, **functions}.items():
+        record(f"direct/{name}", time_calls(fn, calls))
+
+    nanopool_dashboard.register_sources(nanopool_dashboard.STATS)
+    nanopool_dashboard.STATS.start()
+    nanopool = serve_handler(PooledHTTPServer, nanopool_dashboard.DashboardHandler)
+    mining = serve_handler(PooledHTTPServer, dashboard.MiningDashboard)
+    endpoints = {
+        "nanopool GET /": f"http://127.0.0.1:{nanopool.server_port}/",
+        "nanopool GET /api/snapshot": f"http://127.0.0.1:{nanopool.server_port}/api/snapshot",
+        "nanopool GET /api/history": f"http://127.0.0.1:{nanopool.server_port}/api/history",
+        "mining_dashboard GET /api/stats": f"http://127.0.0.1:{mining.server_port}/api/stats",
+    }
+    for name, url in endpoints.items():
+        record(f"direct/{name}", time_endpoint(url, args.clients, args.requests))
+
+    # 2. the same consumers reading the collector's shared-memory snapshot
+    cache = StatsCache()
+    collector.register_sources(cache)
+    cache.start()
+    writer = SnapshotWriter()
+    stop = threading.Event()
+
+    def publish() -> None:
+        while not stop.is_set():
+            writer.write(collector.build_snapshot(cache))
+            stop.wait(collector.PUBLISH_INTERVAL)
+
+    threading.Thread(target=publish, daemon=True).start()
+    time.sleep(1.5)
+    for name, fn in functions.items():
+        record(f"snapshot/{name}", time_calls(fn, calls))
+    for name, url in endpoints.items():
+        record(f"snapshot/{name}", time_endpoint(url, args.clients, args.requests))
+    if bot:
+        record("snapshot/bot /status burst", bench_bot_burst(bot, fakes["telegram"], args.chats, args.bursts))
+
+    stop.set()
+    cache.stop()
+    nanopool_dashboard.STATS.stop()
+    nanopool.server_close()
+    mining.server_close()
+    writer.close()
+    return results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "-C", str(ROOT), "rev-parse", "--short", "HEAD"],
+                             capture_output=True, text=True, timeout=5)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> List[str]:
+    """Print p50/p99 changes against a baseline run; return regressions."""
+    regressions = []
+    print(f"\n{'benchmark':<45} {'p50 change':>12} {'p99 change':>12}")
+    for name, now in results.items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        changes = []
+        for key in ("p50_ms", "p99_ms"):
+            if before[key]:
+                pct = (now[key] - before[key]) * 100 / before[key]
+                changes.append(f"{pct:+.1f}%")
+                if key == "p99_ms" and pct > threshold:
+                    regressions.append(name)
+            else:
+                changes.append("n/a")
+        print(f"{name:<45} {changes[0]:>12} {changes[1]:>12}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the dashboards, bot and collectors against stand-ins")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every upstream response")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of upstream requests answered with 503")
+    parser.add_argument("--calls", type=int, default=200, help="calls per collector benchmark")
+    parser.add_argument("--clients", type=int, default=20, help="concurrent clients per endpoint")
+    parser.add_argument("--requests", type=int, default=25, help="requests per client")
+    parser.add_argument("--chats", type=int, default=10, help="chats in each /status burst")
+    parser.add_argument("--bursts", type=int, default=5)
+    parser.add_argument("--output", type=Path, default=Path("bench-results.json"))
+    parser.add_argument("--compare", type=Path, help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=25.0,
+                        help="p99 increase (%%) that counts as a regression with --compare")
+    args = parser.parse_args()
+
+    results = run(args)
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        "results": results,
+    }
+    with args.output.open("w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"\nResults written to {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with args.compare.open("r", encoding="utf-8") as fh:
+            regressions = compare(results, json.load(fh), args.threshold)
+        if regressions:
+            print(f"\np99 regressed by more than {args.threshold:.0f}%: {', '.join(regressions)}")
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""Single stats collector for every monitoring tool on the mining box.
+
+Without it the dashboards, the Telegram bot and the shell scripts each poll
+XMRig, MoneroOcean, monerod and /proc on their own. This daemon does it once,
+on per-source intervals, and publishes the result into shared memory (see
+shm_snapshot.py). The other tools read that snapshot when it is fresh and
+fall back to collecting themselves when the collector is not running.
+
+    python3 scripts/collector.py [--metrics-port 9105]
+
+It also serves the snapshot in Prometheus text format on /metrics (see
+metrics.py), re-rendered on every publish so scrapes never do any work.
+When config.json names a `log-file`, that log is followed too (see
+log_tailer.py) and its counters are exported alongside. Earnings are
+projected from a week of hashrate history (see earnings.py), and threads
+that lag their siblings over the last hour are published as threads.alert
+(see thread_analysis.py) for the alert rules.
+"""
+
+import argparse
+import signal
+import threading
+import time
+
+from earnings import WINDOWS as EARNINGS_WINDOWS, EarningsProjector, PICONERO
+from fleet import FleetPoller, load_rigs
+from history import DEFAULT_INTERVAL as HISTORY_INTERVAL, HashrateHistory
+from http_serving import PooledHTTPServer
+from hugepages import HugePagesAuditor, summarize
+from log_tailer import LogTailer
+from metrics import MetricsHandler, UpstreamMetrics, render_metrics
+from miner_api import XMRIG_SUMMARY_URL, fetch_json, read_log_file, read_rx_affinity, read_wallet
+from moneroocean import MONEROOCEAN
+from proc_sampler import ProcSampler, read_cpu_temp
+from process_tracker import ProcessTracker
+from share_stats import ShareAnalytics
+from shm_snapshot import SnapshotWriter
+from stats_cache import StatsCache
+from sync_progress import SyncProgress
+from thread_analysis import alert_text, analyze_threads
+
+# Refresh interval (seconds) of each source.
+INTERVALS = {
+    "xmrig": 5.0,
+    "pool": 60.0,
+    "host": 5.0,
+    "processes": 2.0,
+    "sync": 10.0,
+    "fleet": 5.0,
+    "hugepages": 30.0,
+    "earnings": 60.0,
+    "threads": 60.0,
+}
+# Window of the per-thread underperformance check
+THREAD_WINDOW = 3600.0
+# How often the combined snapshot is published.
+PUBLISH_INTERVAL = 1.0
+# Prometheus scrape port (0 disables /metrics)
+METRICS_PORT = 9105
+
+SAMPLER = ProcSampler()
+TRACKER = ProcessTracker()
+SYNC = SyncProgress(ttl=0)
+WALLET = read_wallet()
+# Fleet mode is on when rigs.json lists rigs
+RIGS = load_rigs()
+FLEET = FleetPoller(RIGS) if RIGS else None
+# 5m / 1h / 24h share and ping windows, fed by every XMRig poll
+SHARES = ShareAnalytics()
+# xmrig.log follower, when the miner writes a log file
+XMRIG_LOG = read_log_file()
+LOG_TAILER = LogTailer(XMRIG_LOG) if XMRIG_LOG else None
+# huge-pages readiness of the running miner
+HUGEPAGES = HugePagesAuditor()
+HUGEPAGES_ALERT = {"text": ""}
+# total hashrate only (threads=0): ~3 MB for the longest earnings window
+HISTORY = HashrateHistory(retention=max(span for _, span in EARNINGS_WINDOWS), interval=HISTORY_INTERVAL, threads=0)
+EARNINGS = EarningsProjector(HISTORY)
+# per-thread hashrate for the last hour (~46 KB), for threads.alert
+THREAD_HISTORY = HashrateHistory(retention=THREAD_WINDOW, interval=HISTORY_INTERVAL)
+THREAD_AFFINITY = read_rx_affinity()
+THREAD_FLAGGED = {"threads": ()}
+
+
+def collect_xmrig() -> dict:
+    """Summary from the local XMRig HTTP API; ok=False when it is down."""
+    data = fetch_json(XMRIG_SUMMARY_URL, timeout=3.0)
+    if not data or "hashrate" not in data:
+        return {"ok": False, "updated_at": time.time()}
+    total = (data["hashrate"].get("total") or []) + [None] * 3
+    results = data.get("results", {})
+    connection = data.get("connection", {})
+    now = time.time()
+    SHARES.observe(now, results.get("shares_good", 0), results.get("shares_total", 0),
+                   data.get("uptime", 0), connection.get("ping"))
+    threads = [(t[0] or 0.0) if t else 0.0 for t in data["hashrate"].get("threads", [])]
+    rejected = results.get("shares_total", 0) - results.get("shares_good", 0)
+    HISTORY.append(now, total[0] or 0.0, (), results.get("shares_good", 0), rejected, None)
+    THREAD_HISTORY.append(now, total[0] or 0.0, threads, results.get("shares_good", 0), rejected, None)
+    return {
+        "ok": True,
+        "updated_at": now,
+        "hashrate_10s": total[0],
+        "hashrate_60s": total[1],
+        "hashrate_15m": total[2],
+        "shares_good": results.get("shares_good", 0),
+        "shares_total": results.get("shares_total", 0),
+        "uptime": data.get("uptime", 0),
+        "ping": connection.get("ping", 0),
+        "diff": connection.get("diff", 0),
+        "pool": connection.get("pool", ""),
+        "algo": data.get("algo") or connection.get("algo") or "",
+        "threads": threads,
+    }
+
+
+def collect_pool() -> dict:
+    """Miner stats from MoneroOcean.
+
+    During an outage the client serves the last good stats; they are
+    published with ok=False, the breaker state and their age, so readers
+    still see the balance but can tell it is stale.
+    """
+    if not WALLET:
+        return {"ok": False, "updated_at": time.time()}
+    path = f"/miner/{WALLET}/stats"
+    stats, fresh = MONEROOCEAN.get(path)
+    return {
+        "ok": fresh and bool(stats),
+        "fresh": fresh,
+        "breaker": MONEROOCEAN.breaker.state,
+        "age": MONEROOCEAN.age(path),
+        "updated_at": time.time(),
+        "hashrate": stats.get("hash", 0) or 0,
+        "amt_due": stats.get("amtDue", 0) or 0,
+        "amt_paid": stats.get("amtPaid", 0) or 0,
+    }
+
+
+def collect_host() -> dict:
+    system = SAMPLER.system()
+    return {
+        "cpu_percent": system["cpu_percent"],
+        "mem_used_kb": system["mem_used_kb"],
+        "mem_total_kb": system["mem_total_kb"],
+        "cpu_temp": read_cpu_temp(),
+    }
+
+
+def collect_processes() -> dict:
+    status = TRACKER.poll()
+    usage = SAMPLER.processes(TRACKER.pids())
+    result = {}
+    for name, info in status.items():
+        result[f"{name}_proc"] = {
+            "running": info["running"],
+            "pid": info["pid"],
+            "uptime": info["uptime"],
+            "restarts": info["restarts"],
+            "cpu_percent": usage[name]["cpu_percent"],
+            "rss_kb": usage[name]["rss_kb"],
+        }
+    return result
+
+
+def log_alert(what: str, text: str) -> None:
+    """Log an alert (or its clearing) on stdout; notifications come from the alert rules."""
+    stamp = time.strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{stamp}] ALERT: {text}" if text else f"[{stamp}] {what} alert cleared", flush=True)
+
+
+def collect_hugepages() -> dict:
+    """Huge-pages audit of the running XMRig; logs when its alert changes."""
+    summary = summarize(HUGEPAGES.audit(TRACKER.poll()["xmrig"]))
+    if summary["alert"] != HUGEPAGES_ALERT["text"]:
+        HUGEPAGES_ALERT["text"] = summary["alert"]
+        log_alert("Huge pages", summary["alert"])
+    return summary
+
+
+def collect_threads() -> dict:
+    """Underperforming threads over the last hour; logs when the flagged set changes."""
+    now = time.time()
+    analysis = analyze_threads(THREAD_HISTORY, now - THREAD_WINDOW, now, THREAD_AFFINITY)
+    flagged = tuple(analysis["flagged"])
+    alert = alert_text(analysis)
+    if flagged != THREAD_FLAGGED["threads"]:
+        THREAD_FLAGGED["threads"] = flagged
+        log_alert("Thread", alert)
+    return {"flagged": len(flagged), "alert": alert}
+
+
+def collect_earnings(cache: StatsCache) -> dict:
+    """Projection from the hashrate history and the last good pool balance."""
+    pool = cache.get("pool")
+    xmrig = cache.get("xmrig")
+    return EARNINGS.project((pool.get("amt_due") or 0) / PICONERO, xmrig.get("hashrate_60s"))
+
+
+def register_sources(cache: StatsCache) -> None:
+    cache.register("xmrig", collect_xmrig, INTERVALS["xmrig"], default={"ok": False})
+    cache.register("pool", collect_pool, INTERVALS["pool"], default={"ok": False})
+    cache.register("host", collect_host, INTERVALS["host"], default={})
+    cache.register("processes", collect_processes, INTERVALS["processes"], default={})
+    cache.register("sync", SYNC.poll, INTERVALS["sync"], default={"available": False})
+    cache.register("hugepages", collect_hugepages, INTERVALS["hugepages"], default={})
+    cache.register("threads", collect_threads, INTERVALS["threads"], default={})
+    cache.register("earnings", lambda: collect_earnings(cache), INTERVALS["earnings"], default={"ok": False})
+    if FLEET:
+        cache.register("fleet", FLEET.poll, INTERVALS["fleet"], default={"count": 0, "rigs": []})
+
+
+def build_snapshot(cache: StatsCache) -> dict:
+    snapshot = {
+        "xmrig": cache.get("xmrig"),
+        "pool": cache.get("pool"),
+        "host": cache.get("host"),
+        "sync": cache.get("sync"),
+        "shares": SHARES.snapshot(time.time()),
+        "hugepages": cache.get("hugepages"),
+        "earnings": cache.get("earnings"),
+        "threads": cache.get("threads"),
+    }
+    if FLEET:
+        snapshot["fleet"] = cache.get("fleet")
+    if LOG_TAILER:
+        # metrics only; not part of the shared-memory layout
+        snapshot["xmrig_log"] = LOG_TAILER.snapshot()
+    snapshot.update(cache.get("processes"))
+    return snapshot
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Collect mining stats into shared memory")
+    parser.add_argument("--metrics-port", type=int, default=METRICS_PORT, help="Prometheus /metrics port, 0 to disable")
+    args = parser.parse_args()
+
+    upstream = UpstreamMetrics()
+    cache = StatsCache(on_refresh=upstream.observe_refresh)
+    register_sources(cache)
+    writer = SnapshotWriter()
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stop.set())
+
+    metrics_server = None
+    if args.metrics_port:
+        metrics_server = PooledHTTPServer(("0.0.0.0", args.metrics_port), MetricsHandler, workers=4)
+        threading.Thread(target=metrics_server.serve_forever, daemon=True).start()
+
+    cache.start()
+    tailer_thread = None
+    if LOG_TAILER:
+        tailer_thread = threading.Thread(target=LOG_TAILER.run, args=(stop,), name="xmrig-log", daemon=True)
+        tailer_thread.start()
+        print(f"Following {LOG_TAILER.path} from byte {LOG_TAILER.offset}")
+    print(f"Collector publishing to shared memory segment '{writer.shm.name}'")
+    if metrics_server:
+        print(f"Prometheus metrics on http://0.0.0.0:{args.metrics_port}/metrics")
+    try:
+        while not stop.is_set():
+            snapshot = build_snapshot(cache)
+            writer.write(snapshot)
+            if metrics_server:
+                MetricsHandler.body = render_metrics(snapshot, upstream, cache.status())
+            stop.wait(PUBLISH_INTERVAL)
+    finally:
+        if metrics_server:
+            metrics_server.shutdown()
+            metrics_server.server_close()
+        cache.stop()
+        if tailer_thread:
+            tailer_thread.join(2.0)
+        writer.close()
+
+
+if __name__ == "__main__":
+    main()
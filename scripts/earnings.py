@@ -0,0 +1,221 @@
+"""Earnings projection from the hashrate history and pool / network stats.
+
+The pool only reports the unpaid (`amtDue`) and paid (`amtPaid`) balances,
+and the README's per-day figures are estimates. This module combines
+
+- the local hashrate history (history.py) over the 1h / 24h / 7d windows,
+- MoneroOcean's /network/stats (difficulty, block reward) and /pool/stats
+  (pool hashrate), read through the shared client, which caches each
+  endpoint for its own TTL (moneroocean.ENDPOINT_TTLS),
+
+into expected XMR/day and the time to the minimum payout, with bands.
+
+MoneroOcean pays PPLNS, so over time a miner earns its share of the hashes
+on every block: hashrate * 86400 / difficulty * reward per day. Two things
+spread the outcome around that. The hashrate varies; its relative stdev in
+the window is taken as the uncertainty of the rate. And the pool finds
+blocks by luck: about pool_hashrate * 86400 / difficulty a day, a Poisson
+count, so over d days luck adds a relative stdev of 1 / sqrt(blocks * d).
+The bands are the expectation +- Z times the combined relative stdev.
+
+Every window is reduced in one pass over the history: prefix sums of the
+hashrate and its square are built once with itertools.accumulate, and each
+window's mean and variance is then two bisects and two subtractions.
+"""
+
+import math
+import time
+from bisect import bisect_left
+from itertools import accumulate
+from operator import mul
+from typing import Dict, Optional, Sequence, Tuple
+
+from history import HashrateHistory
+from moneroocean import MONEROOCEAN, MoneroOceanClient
+
+PICONERO = 1e12
+# MoneroOcean's default minimum payout (XMR) and fee
+PAYOUT_THRESHOLD = 0.003
+POOL_FEE = 0.0
+BLOCK_TIME = 120.0
+# (name, seconds); the projection is based on the longest window that is
+# at least MIN_COVERAGE covered by history
+WINDOWS: Tuple[Tuple[str, float], ...] = (("1h", 3600.0), ("24h", 86400.0), ("7d", 7 * 86400.0))
+MIN_COVERAGE = 0.5
+# two-sided 90% band
+Z = 1.645
+
+
+def window_stats(times: Sequence[float], rates: Sequence[float], now: float,
+                 windows: Sequence[Tuple[str, float]] = WINDOWS) -> Dict[str, dict]:
+    """Mean, stdev, sample count and coverage of the hashrate per window ending at `now`."""
+    sums = [0.0, *accumulate(rates)]
+    squares = [0.0, *accumulate(map(mul, rates, rates))]
+    end = bisect_left(times, now + 1e-6)
+    stats = {}
+    for name, span in windows:
+        start = bisect_left(times, now - span, 0, end)
+        n = end - start
+        if not n:
+            stats[name] = {"hashrate": None, "stdev": None, "samples": 0, "coverage": 0.0}
+            continue
+        mean = (sums[end] - sums[start]) / n
+        variance = max(0.0, (squares[end] - squares[start]) / n - mean * mean)
+        stats[name] = {
+            "hashrate": mean,
+            "stdev": math.sqrt(variance),
+            "samples": n,
+            "coverage": min(1.0, (now - times[start]) / span),
+        }
+    return stats
+
+
+def read_inputs(client: MoneroOceanClient = MONEROOCEAN) -> dict:
+    """Difficulty, block reward and pool hashrate; `fresh` is False when served stale."""
+    network, network_fresh = client.get("/network/stats")
+    pool, pool_fresh = client.get("/pool/stats")
+    difficulty = float(network.get("difficulty") or 0)
+    return {
+        "difficulty": difficulty,
+        "reward_xmr": float(network.get("value") or 0) / PICONERO,
+        "height": int(network.get("height") or 0),
+        "network_hashrate": difficulty / BLOCK_TIME,
+        "pool_hashrate": float((pool.get("pool_statistics") or {}).get("hashRate") or 0),
+        "fresh": network_fresh and pool_fresh,
+    }
+
+
+def xmr_per_day(hashrate: float, inputs: dict, fee: float = POOL_FEE) -> Optional[float]:
+    if not inputs["difficulty"] or not inputs["reward_xmr"]:
+        return None
+    return hashrate * 86400.0 / inputs["difficulty"] * inputs["reward_xmr"] * (1 - fee)
+
+
+def relative_spread(hashrate_cv: float, pool_blocks_per_day: float, days: float) -> float:
+    """Relative stdev of the earnings over `days` from hashrate spread and pool luck."""
+    luck = 1.0 / (pool_blocks_per_day * days) if pool_blocks_per_day > 0 and days > 0 else 0.0
+    return math.sqrt(hashrate_cv ** 2 + luck)
+
+
+def project(hashrate: float, hashrate_cv: float, inputs: dict, amt_due: float,
+            threshold: float = PAYOUT_THRESHOLD, fee: float = POOL_FEE, z: float = Z) -> dict:
+    """XMR/day and time to `threshold` from `amt_due` (XMR), with Z-sigma bands."""
+    daily = xmr_per_day(hashrate, inputs, fee)
+    blocks = inputs["pool_hashrate"] * 86400.0 / inputs["difficulty"] if inputs["difficulty"] else 0.0
+    result = {
+        "xmr_day": daily,
+        "xmr_day_low": None,
+        "xmr_day_high": None,
+        "payout_days": None,
+        "payout_days_low": None,
+        "payout_days_high": None,
+        "pool_blocks_day": blocks,
+    }
+    if not daily:
+        return result
+    spread = relative_spread(hashrate_cv, blocks, 1.0)
+    result["xmr_day_low"] = daily * max(0.0, 1 - z * spread)
+    result["xmr_day_high"] = daily * (1 + z * spread)
+    remaining = max(0.0, threshold - amt_due)
+    days = remaining / daily
+    result["payout_days"] = days
+    if not remaining:
+        result["payout_days_low"] = result["payout_days_high"] = 0.0
+        return result
+    # luck averages out over the time it takes to reach the threshold
+    spread = relative_spread(hashrate_cv, blocks, days)
+    result["payout_days_low"] = days / (1 + z * spread)
+    result["payout_days_high"] = days / (1 - z * spread) if z * spread < 1 else None
+    return result
+
+
+class EarningsProjector:
+    """Projections from a hashrate history; without one, from a current hashrate."""
+
+    def __init__(self, history: Optional[HashrateHistory] = None, client: MoneroOceanClient = MONEROOCEAN,
+                 windows: Sequence[Tuple[str, float]] = WINDOWS, threshold: float = PAYOUT_THRESHOLD,
+                 fee: float = POOL_FEE) -> None:
+        self.history = history
+        self.client = client
+        self.windows = tuple(windows)
+        self.threshold = threshold
+        self.fee = fee
+
+    def window_stats(self, now: float) -> Dict[str, dict]:
+        if self.history is None:
+            return {name: {"hashrate": None, "stdev": None, "samples": 0, "coverage": 0.0}
+                    for name, _ in self.windows}
+        span = max(span for _, span in self.windows)
+        times = self.history.column("time", now - span, now + 1e-6)
+        rates = self.history.column("hashrate", now - span, now + 1e-6)
+        # a sample appended between the two copies only lengthens the second
+        n = min(len(times), len(rates))
+        return window_stats(times[:n], rates[:n], now, self.windows)
+
+    def project(self, amt_due: float, current: Optional[float] = None, now: Optional[float] = None) -> dict:
+        """Projection for an unpaid balance of `amt_due` XMR.
+
+        Based on the longest well-covered window, else the shortest window
+        with samples, else `current` (no hashrate spread).
+        """
+        now = time.time() if now is None else now
+        inputs = read_inputs(self.client)
+        windows = self.window_stats(now)
+        basis = next((name for name, _ in reversed(self.windows)
+                      if windows[name]["coverage"] >= MIN_COVERAGE), None)
+        basis = basis or next((name for name, _ in self.windows if windows[name]["samples"]), None)
+        if basis:
+            hashrate, stdev = windows[basis]["hashrate"], windows[basis]["stdev"]
+        else:
+            basis, hashrate, stdev = "current", current or 0.0, 0.0
+        projection = project(hashrate, stdev / hashrate if hashrate else 0.0, inputs, amt_due,
+                             self.threshold, self.fee)
+        return {
+            "ok": bool(projection["xmr_day"]),
+            "updated_at": now,
+            "basis": basis,
+            "hashrate": hashrate,
+            "hashrate_stdev": stdev,
+            "amt_due": amt_due,
+            "threshold": self.threshold,
+            **projection,
+            "difficulty": inputs["difficulty"],
+            "reward_xmr": inputs["reward_xmr"],
+            "network_hashrate": inputs["network_hashrate"],
+            "pool_hashrate": inputs["pool_hashrate"],
+            "inputs_fresh": inputs["fresh"],
+            "windows": {
+                name: {
+                    "hashrate": stats["hashrate"],
+                    "samples": stats["samples"],
+                    "xmr_day": xmr_per_day(stats["hashrate"], inputs, self.fee) if stats["hashrate"] else None,
+                }
+                for name, stats in windows.items()
+            },
+        }
+
+
+def format_days(days: Optional[float]) -> str:
+    if days is None:
+        return "?"
+    if days < 1:
+        return f"{days * 24:.1f} h"
+    return f"{days:.1f} d"
+
+
+def format_projection(projection: dict) -> str:
+    """'0.00231 XMR/day (0.00190-0.00272, 24h avg)'."""
+    if not projection or not projection.get("ok"):
+        return "N/A"
+    return (f"{projection['xmr_day']:.5f} XMR/day ({projection['xmr_day_low']:.5f}-"
+            f"{projection['xmr_day_high']:.5f}, {projection['basis']} avg)")
+
+
+def format_payout(projection: dict) -> str:
+    """'in 1.2 d (21.6 h-1.6 d)'."""
+    if not projection or not projection.get("ok"):
+        return "N/A"
+    if not projection["payout_days"]:
+        return "threshold reached, payout pending"
+    return (f"in {format_days(projection['payout_days'])} ({format_days(projection['payout_days_low'])}-"
+            f"{format_days(projection['payout_days_high'])})")
@@ -0,0 +1,134 @@
+"""Server-Sent Events fan-out for live dashboard stats.
+
+One collector thread computes the stats once per interval and pushes only the
+fields that changed to every connected client, so N open tabs cost the same
+upstream work as one. A client gets the full state when it subscribes and
+deltas afterwards.
+"""
+
+import json
+import queue
+import threading
+from typing import Any, Callable, Dict, Optional
+
+# Sentinel pushed to subscriber queues when the broadcaster stops.
+CLOSED = object()
+
+
+class StatsBroadcaster:
+    """Collects stats on an interval and fans out changed fields."""
+
+    def __init__(self, collect: Callable[[], Dict[str, Any]], interval: float = 3.0, max_subscribers: int = 32,
+                 pace: Optional[Callable[[str, float], float]] = None) -> None:
+        self.collect = collect
+        self.interval = interval
+        self.pace = pace
+        self.max_subscribers = max_subscribers
+        self.state: Dict[str, Any] = {}
+        self.seq = 0
+        self._subscribers: set = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="sse-collector", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop collecting and release every subscriber."""
+        self._stop.set()
+        self._wake.set()
+        with self._lock:
+            for q in self._subscribers:
+                q.put(CLOSED)
+            self._subscribers.clear()
+
+    def subscribe(self) -> Optional[queue.Queue]:
+        """Register a client; returns None when the subscriber limit is hit."""
+        with self._lock:
+            if self._stop.is_set() or len(self._subscribers) >= self.max_subscribers:
+                return None
+            q: queue.Queue = queue.Queue(maxsize=16)
+            if self.state:
+                q.put((self.seq, dict(self.state)))
+            self._subscribers.add(q)
+        # the first viewer should not wait a whole interval for data
+        self._wake.set()
+        return q
+
+    def unsubscribe(self, q: queue.Queue) -> None:
+        with self._lock:
+            self._subscribers.discard(q)
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge `stats` into the state and broadcast the changed fields."""
+        changed = {k: v for k, v in stats.items() if self.state.get(k, CLOSED) != v}
+        if not changed:
+            return changed
+        with self._lock:
+            self.state.update(changed)
+            self.seq += 1
+            for q in list(self._subscribers):
+                try:
+                    q.put_nowait((self.seq, changed))
+                except queue.Full:
+                    # a stalled client would miss deltas; drop it so it reconnects
+                    # and receives a fresh full state
+                    self._subscribers.discard(q)
+                    q.queue.clear()
+                    q.put_nowait(CLOSED)
+        return changed
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            # nothing to do while nobody is watching
+            if self._subscribers:
+                try:
+                    self.publish(self.collect())
+                except Exception:  # noqa: BLE001 - keep streaming on collector errors
+                    pass
+            self._wake.wait(self.interval if self.pace is None else self.pace("stream", self.interval))
+            self._wake.clear()
+
+
+def format_event(seq: int, data: Dict[str, Any], event: str = "stats") -> bytes:
+    """Encode one SSE message."""
+    return f"id: {seq}\nevent: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
+
+
+def stream_to(handler, broadcaster: StatsBroadcaster, heartbeat: float = 15.0) -> None:
+    """Serve an SSE response on a BaseHTTPRequestHandler until the client leaves."""
+    q = broadcaster.subscribe()
+    if q is None:
+        handler.send_body(503, "text/plain", b"Too many live streams", {"Retry-After": "10"})
+        return
+
+    handler.send_response(200)
+    handler.send_header("Content-Type", "text/event-stream")
+    handler.send_header("Cache-Control", "no-cache")
+    # no Content-Length, so the stream ends by closing the connection
+    handler.send_header("Connection", "close")
+    handler.end_headers()
+    handler.close_connection = True
+    try:
+        handler.wfile.write(f"retry: {int(broadcaster.interval * 1000)}\n\n".encode())
+        while True:
+            try:
+                item = q.get(timeout=heartbeat)
+            except queue.Empty:
+                handler.wfile.write(b": keepalive\n\n")
+                continue
+            if item is CLOSED:
+                break
+            seq, data = item
+            handler.wfile.write(format_event(seq, data))
+    except (BrokenPipeError, ConnectionResetError, OSError):
+        pass
+    finally:
+        broadcaster.unsubscribe(q)
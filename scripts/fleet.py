@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""Fleet mode: poll the XMRig HTTP API of many rigs concurrently.
+
+The rigs are listed in rigs.json next to the miner config:
+
+    [
+        {"name": "rig-01", "url": "http://10.0.0.11:3001", "token": "mining-dashboard"},
+        {"name": "rig-02", "url": "http://10.0.0.12:3001"}
+    ]
+
+Every rig is polled on its own worker thread over a persistent keep-alive
+connection with a per-rig deadline. A rig that is down or slow is reported
+as such at the deadline instead of delaying the others; a rig whose previous
+request is still outstanding is skipped rather than queued twice.
+
+    python3 scripts/fleet.py                  # poll rigs.json once
+    python3 scripts/fleet.py --standins 150   # benchmark against local stand-ins
+"""
+
+import argparse
+import http.client
+import json
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List, NamedTuple
+
+from miner_api import MONERO_CONFIG, XMRIG_TOKEN
+
+RIGS_FILE = MONERO_CONFIG.parent / "rigs.json"
+DEFAULT_DEADLINE = 3.0
+MAX_WORKERS = 256
+
+
+class Rig(NamedTuple):
+    name: str
+    url: str
+    token: str = XMRIG_TOKEN
+
+
+def load_rigs(path: Path = RIGS_FILE) -> List[Rig]:
+    """Return the rigs listed in rigs.json, or [] when fleet mode is off."""
+    if not path.exists():
+        return []
+    try:
+        with path.open("r", encoding="utf-8") as fh:
+            entries = json.load(fh)
+    except (json.JSONDecodeError, OSError):
+        return []
+    rigs = []
+    for i, entry in enumerate(entries):
+        if entry.get("url"):
+            rigs.append(Rig(entry.get("name") or f"rig-{i + 1}", entry["url"].rstrip("/"),
+                            entry.get("token", XMRIG_TOKEN)))
+    return rigs
+
+
+def parse_rig_summary(data: dict) -> dict:
+    """The per-rig fields the fleet views show, from XMRig's /1/summary."""
+    total = (data.get("hashrate", {}).get("total") or []) + [None] * 3
+    results = data.get("results", {})
+    return {
+        "hashrate_10s": total[0] or 0.0,
+        "hashrate_60s": total[1] or 0.0,
+        "hashrate_15m": total[2] or 0.0,
+        "shares_good": results.get("shares_good", 0) or 0,
+        "shares_total": results.get("shares_total", 0) or 0,
+        "uptime": data.get("uptime", 0) or 0,
+    }
+
+
+def down(rig: Rig, error: str) -> dict:
+    return {"name": rig.name, "url": rig.url, "ok": False, "error": error, "hashrate_10s": 0.0,
+            "hashrate_60s": 0.0, "hashrate_15m": 0.0, "shares_good": 0, "shares_total": 0,
+            "uptime": 0, "latency_ms": None}
+
+
+def aggregate(rigs: List[dict]) -> dict:
+    """Fleet totals over the rigs that answered."""
+    online = [r for r in rigs if r["ok"]]
+    return {
+        "count": len(rigs),
+        "online": len(online),
+        "hashrate_10s": sum(r["hashrate_10s"] for r in online),
+        "hashrate_60s": sum(r["hashrate_60s"] for r in online),
+        "hashrate_15m": sum(r["hashrate_15m"] for r in online),
+        "shares_good": sum(r["shares_good"] for r in online),
+        "shares_total": sum(r["shares_total"] for r in online),
+    }
+
+
+class FleetPoller:
+    """Concurrent /1/summary poller for a list of rigs."""
+
+    def __init__(self, rigs: List[Rig], deadline: float = DEFAULT_DEADLINE, max_workers: int = MAX_WORKERS) -> None:
+        self.rigs = rigs
+        self.deadline = deadline
+        self.pool = ThreadPoolExecutor(max_workers=max(1, min(len(rigs), max_workers)), thread_name_prefix="rig")
+        self._connections: Dict[str, http.client.HTTPConnection] = {}
+        self._in_flight = set()
+        self._lock = threading.Lock()
+
+    def _connection(self, rig: Rig) -> http.client.HTTPConnection:
+        conn = self._connections.get(rig.name)
+        if conn is None:
+            parts = urllib.parse.urlsplit(rig.url)
+            cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+            conn = self._connections[rig.name] = cls(parts.hostname, parts.port, timeout=self.deadline)
+        return conn
+
+    def _fetch(self, rig: Rig) -> dict:
+        started = time.perf_counter()
+        try:
+            # only this rig's worker touches its connection (see _in_flight)
+            conn = self._connection(rig)
+            try:
+                conn.request("GET", "/1/summary", headers={"Authorization": f"Bearer {rig.token}"})
+                resp = conn.getresponse()
+                body = resp.read()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                # idle keep-alive connection was closed by the rig; retry once
+                conn.close()
+                conn.request("GET", "/1/summary", headers={"Authorization": f"Bearer {rig.token}"})
+                resp = conn.getresponse()
+                body = resp.read()
+            if resp.will_close:
+                conn.close()
+            if resp.status != 200:
+                return down(rig, f"HTTP {resp.status}")
+            data = json.loads(body)
+            if not isinstance(data, dict):
+                return down(rig, "bad response")
+        except (OSError, http.client.HTTPException, ValueError) as exc:
+            self._connections.pop(rig.name, None)
+            return down(rig, type(exc).__name__)
+        finally:
+            with self._lock:
+                self._in_flight.discard(rig.name)
+        result = {"name": rig.name, "url": rig.url, "ok": True, "error": ""}
+        result.update(parse_rig_summary(data))
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    def poll(self) -> dict:
+        """Poll every rig; returns {"rigs": [...], **aggregate} within the deadline."""
+        futures = {}
+        with self._lock:
+            for rig in self.rigs:
+                if rig.name in self._in_flight:
+                    continue
+                self._in_flight.add(rig.name)
+                futures[rig.name] = self.pool.submit(self._fetch, rig)
+        if futures:
+            wait(futures.values(), timeout=self.deadline)
+
+        rigs = []
+        for rig in self.rigs:
+            future = futures.get(rig.name)
+            if future is None:
+                rigs.append(down(rig, "busy"))
+            elif future.done():
+                rigs.append(future.result())
+            else:
+                rigs.append(down(rig, "timeout"))
+        result = aggregate(rigs)
+        result["rigs"] = rigs
+        result["updated_at"] = time.time()
+        return result
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        for conn in list(self._connections.values()):
+            conn.close()
+
+
+def format_fleet_line(fleet: dict) -> str:
+    """One-line fleet summary, e.g. '97/100 rigs online, 412.5 kH/s'."""
+    return f"{fleet['online']}/{fleet['count']} rigs online, {fleet['hashrate_10s'] / 1000:.1f} kH/s"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Poll every rig in rigs.json")
+    parser.add_argument("--rigs-file", type=Path, default=RIGS_FILE)
+    parser.add_argument("--deadline", type=float, default=DEFAULT_DEADLINE)
+    parser.add_argument("--standins", type=int, metavar="N",
+                        help="start N local stand-in XMRig APIs (10%% down, 5%% slower than the deadline) and poll them")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    servers = []
+    if args.standins:
+        from standins import FakeXMRig, serve
+
+        rigs = []
+        for i in range(args.standins):
+            fake = FakeXMRig(name=f"rig-{i + 1:03d}", hashrate=4000.0 + i,
+                             latency=args.deadline * 2 if i % 20 == 7 else 0.0)
+            fake.down = i % 10 == 3
+            server = serve(fake)
+            servers.append(server)
+            rigs.append(Rig(fake.name, f"http://127.0.0.1:{server.server_port}", fake.token))
+    else:
+        rigs = load_rigs(args.rigs_file)
+        if not rigs:
+            raise SystemExit(f"No rigs configured in {args.rigs_file}")
+
+    poller = FleetPoller(rigs, deadline=args.deadline)
+    for _ in range(args.rounds if args.standins else 1):
+        started = time.perf_counter()
+        fleet = poller.poll()
+        elapsed = time.perf_counter() - started
+        print(f"{format_fleet_line(fleet)} in {elapsed * 1000:.0f} ms")
+    if not args.standins:
+        for rig in fleet["rigs"]:
+            state = f"{rig['hashrate_10s']:.1f} H/s" if rig["ok"] else f"DOWN ({rig['error']})"
+            print(f"  {rig['name']:<20} {state}")
+    poller.close()
+    for server in servers:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Fixed-memory hashrate history.
+
+Samples live in preallocated `array` columns used as a ring buffer, so memory
+is fixed up front and no per-sample Python objects are kept. Per-thread
+hashrates get their own, shorter ring (`thread_retention`, one day by
+default): 7 days of totals at 5 s resolution (~2.9 MB) plus one day of
+8 threads (~0.7 MB) is ~3.6 MB. Downsampling slices the columns per bucket
+and lets the C-level `min`/`max`/`sum` builtins do the work.
+"""
+
+import math
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_INTERVAL = 5.0
+DEFAULT_RETENTION = 7 * 24 * 3600
+DEFAULT_THREAD_RETENTION = 24 * 3600
+
+# Scalar columns and their array typecodes. Time needs double precision,
+# the rest fit comfortably in 32 bits.
+COLUMNS = (
+    ("time", "d"),
+    ("hashrate", "f"),
+    ("accepted", "I"),
+    ("rejected", "I"),
+    ("cpu_temp", "f"),
+)
+
+
+def _segments(head: int, count: int, capacity: int) -> List[Tuple[int, int]]:
+    """Physical [start, end) ranges of a ring buffer in chronological order."""
+    if count < capacity:
+        return [(0, count)]
+    if head == 0:
+        return [(0, capacity)]
+    return [(head, capacity), (0, head)]
+
+
+def _ranges(times: array, segments: List[Tuple[int, int]], start: float, end: float) -> List[Tuple[int, int]]:
+    """Physical index ranges whose timestamps fall in [start, end)."""
+    ranges = []
+    for lo, hi in segments:
+        a = bisect_left(times, start, lo, hi)
+        b = bisect_left(times, end, lo, hi)
+        if a < b:
+            ranges.append((a, b))
+    return ranges
+
+
+class HashrateHistory:
+    """Ring buffer of miner samples with min/mean/max downsampling."""
+
+    def __init__(self, retention: float = DEFAULT_RETENTION, interval: float = DEFAULT_INTERVAL, threads: int = 8,
+                 thread_retention: float = DEFAULT_THREAD_RETENTION) -> None:
+        self.capacity = int(retention // interval)
+        self.threads = threads
+        self.columns: Dict[str, array] = {
+            name: array(code, bytes(array(code).itemsize * self.capacity)) for name, code in COLUMNS
+        }
+        self.count = 0
+        self.head = 0  # next slot to write
+        # per-thread hashrate over the last `thread_retention` seconds, row-major:
+        # sample i occupies [i*threads, (i+1)*threads), taken at thread_time[i]
+        self.thread_capacity = int(min(retention, thread_retention) // interval) if threads else 0
+        self.thread_time = array("d", bytes(8 * self.thread_capacity))
+        self.thread_hashrate = array("f", bytes(4 * self.thread_capacity * threads))
+        self.thread_count = 0
+        self.thread_head = 0
+        self._lock = threading.RLock()
+
+    def memory_bytes(self) -> int:
+        arrays = [*self.columns.values(), self.thread_time, self.thread_hashrate]
+        return sum(col.itemsize * len(col) for col in arrays)
+
+    def append(self, when: float, hashrate: float, thread_rates: Sequence[float],
+               accepted: int, rejected: int, cpu_temp: Optional[float]) -> None:
+        """Record one sample; `when` must not go backwards."""
+        with self._lock:
+            i = self.head
+            self.columns["time"][i] = when
+            self.columns["hashrate"][i] = hashrate
+            self.columns["accepted"][i] = accepted
+            self.columns["rejected"][i] = rejected
+            self.columns["cpu_temp"][i] = math.nan if cpu_temp is None else cpu_temp
+            self.head = (i + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+            if not self.thread_capacity:
+                return
+            j = self.thread_head
+            self.thread_time[j] = when
+            base = j * self.threads
+            for t in range(self.threads):
+                self.thread_hashrate[base + t] = thread_rates[t] if t < len(thread_rates) else math.nan
+            self.thread_head = (j + 1) % self.thread_capacity
+            self.thread_count = min(self.thread_count + 1, self.thread_capacity)
+
+    def _segments(self) -> List[Tuple[int, int]]:
+        return _segments(self.head, self.count, self.capacity)
+
+    def _ranges(self, start: float, end: float) -> List[Tuple[int, int]]:
+        return _ranges(self.columns["time"], self._segments(), start, end)
+
+    def _thread_ranges(self, start: float, end: float) -> List[Tuple[int, int]]:
+        segments = _segments(self.thread_head, self.thread_count, self.thread_capacity)
+        return _ranges(self.thread_time, segments, start, end)
+
+    def span(self) -> Tuple[Optional[float], Optional[float]]:
+        """Timestamps of the oldest and newest sample."""
+        if not self.count:
+            return None, None
+        segs = self._segments()
+        times = self.columns["time"]
+        return times[segs[0][0]], times[segs[-1][1] - 1]
+
+    def column(self, name: str, start: float, end: float) -> array:
+        """Contiguous copy of one scalar column for [start, end)."""
+        col = self.columns[name]
+        out = array(col.typecode)
+        with self._lock:
+            for a, b in self._ranges(start, end):
+                out.extend(col[a:b])
+        return out
+
+    def thread_time_column(self, start: float, end: float) -> array:
+        """Timestamps of the per-thread samples in [start, end) (at most `thread_retention` back)."""
+        out = array("d")
+        with self._lock:
+            for a, b in self._thread_ranges(start, end):
+                out.extend(self.thread_time[a:b])
+        return out
+
+    def thread_column(self, thread: int, start: float, end: float) -> array:
+        """Contiguous copy of one thread's hashrate for [start, end)."""
+        out = array("f")
+        with self._lock:
+            for a, b in self._thread_ranges(start, end):
+                out.extend(self.thread_hashrate[a * self.threads + thread:b * self.threads:self.threads])
+        return out
+
+    def downsample(self, start: float, end: float, step: float) -> dict:
+        """Return min/mean/max per `step`-second bucket for every column."""
+        with self._lock:
+            return self._downsample(start, end, step)
+
+    def _downsample(self, start: float, end: float, step: float) -> dict:
+        buckets = max(1, int(math.ceil((end - start) / step)))
+        def boundaries(times: array) -> List[int]:
+            """Bucket boundaries as indexes into a copied window."""
+            return [bisect_left(times, start + k * step) for k in range(buckets)] + [len(times)]
+
+        bounds = boundaries(self.column("time", start, end))
+        thread_bounds = boundaries(self.thread_time_column(start, end))
+
+        def reduce(values: array, bounds: List[int] = bounds) -> dict:
+            mins, means, maxs = [], [], []
+            for k in range(buckets):
+                chunk = values[bounds[k]:bounds[k + 1]]
+                total = sum(chunk)
+                if total != total:
+                    # NaN gaps (missing thread or sensor) are rare; drop them
+                    chunk = array(chunk.typecode, [v for v in chunk if v == v])
+                    total = sum(chunk)
+                if not chunk:
+                    mins.append(None)
+                    means.append(None)
+                    maxs.append(None)
+                    continue
+                mins.append(round(min(chunk), 2))
+                means.append(round(total / len(chunk), 2))
+                maxs.append(round(max(chunk), 2))
+            return {"min": mins, "mean": means, "max": maxs}
+
+        return {
+            "from": start,
+            "to": end,
+            "step": step,
+            "time": [start + k * step for k in range(buckets)],
+            "samples": [bounds[k + 1] - bounds[k] for k in range(buckets)],
+            "columns": {name: reduce(self.column(name, start, end)) for name, _ in COLUMNS if name != "time"},
+            "threads": [reduce(self.thread_column(t, start, end), thread_bounds) for t in range(self.threads)],
+        }
+
+
+def parse_summary(summary: dict) -> Optional[Tuple[float, List[float], int, int]]:
+    """Extract (total hashrate, per-thread 10s rates, accepted, rejected) from /1/summary."""
+    hashrate = summary.get("hashrate") if summary else None
+    if not hashrate:
+        return None
+    total = (hashrate.get("total") or [0])[0] or 0.0
+    threads = [(t[0] or 0.0) if t else 0.0 for t in hashrate.get("threads", [])]
+    results = summary.get("results", {})
+    good = int(results.get("shares_good", 0) or 0)
+    total_shares = int(results.get("shares_total", 0) or 0)
+    return float(total), threads, good, max(0, total_shares - good)
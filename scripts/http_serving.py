@@ -0,0 +1,275 @@
+"""Concurrent HTTP serving shared by both dashboards.
+
+`http.server.HTTPServer` handles one connection at a time, so a single slow
+handler (or an idle keep-alive client) blocks everybody else. PooledHTTPServer
+hands each connection to a bounded thread pool instead, speaks HTTP/1.1 with
+keep-alive, and drains in-flight requests on shutdown. `upstream_slot()` caps
+how many upstream calls (pool API, XMRig, monerod) run at once across all
+request threads.
+
+PreparedBody holds a response compressed once up front, with a strong ETag
+per encoding; `KeepAliveHandler.send_prepared()` negotiates Accept-Encoding
+and answers If-None-Match with a bodiless 304. StaticPage re-renders one
+from a template file only when the file changes.
+"""
+
+import gzip
+import hashlib
+import os
+import signal
+import socket
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional
+
+# Worker threads per server; each keep-alive connection holds one while open.
+DEFAULT_WORKERS = 64
+# Seconds an idle keep-alive connection may hold a worker before it is closed.
+KEEPALIVE_TIMEOUT = 15.0
+# Upstream calls allowed in flight at once, process-wide.
+UPSTREAM_CONCURRENCY = 4
+# Content-Encodings PreparedBody produces, preferred first at equal q.
+ENCODINGS = ("gzip", "deflate")
+# Bodies smaller than this are not worth compressing.
+MIN_COMPRESS_SIZE = 256
+
+_upstream = threading.BoundedSemaphore(UPSTREAM_CONCURRENCY)
+
+
+@contextmanager
+def upstream_slot(timeout: float = 10.0) -> Iterator[bool]:
+    """Hold one of the shared upstream slots.
+
+    Yields False when no slot frees up within `timeout`; callers should then
+    skip the call and fall back to whatever they would return on failure.
+    """
+    acquired = _upstream.acquire(timeout=timeout)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            _upstream.release()
+
+
+def accepted_encodings(header: Optional[str]) -> Dict[str, float]:
+    """Parse Accept-Encoding into {coding: q}; '*' is kept as a key."""
+    accepted = {}
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def negotiate_encoding(header: Optional[str], available) -> str:
+    """Pick the best of `available` for an Accept-Encoding header, or 'identity'."""
+    accepted = accepted_encodings(header)
+    best, best_q = "identity", 0.0
+    for coding in available:
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def etag_matches(if_none_match: Optional[str], etags) -> bool:
+    """If-None-Match uses weak comparison: W/ prefixes are ignored."""
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or not candidates.isdisjoint(etags)
+
+
+class PreparedBody:
+    """A response body encoded once in every supported Content-Encoding.
+
+    Each representation gets its own strong ETag (RFC 9110 8.8.3), derived
+    from a hash of the uncompressed body, so caches never mix them up.
+    """
+
+    def __init__(self, body: bytes, content_type: str, headers: Optional[dict] = None) -> None:
+        self.content_type = content_type
+        self.headers = headers or {}
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.variants: Dict[str, bytes] = {"identity": body}
+        self.etags: Dict[str, str] = {"identity": f'"{digest}"'}
+        if len(body) >= MIN_COMPRESS_SIZE:
+            for coding in ENCODINGS:
+                # mtime=0 keeps the gzip bytes, and so the ETag, reproducible
+                encoded = gzip.compress(body, 9, mtime=0) if coding == "gzip" else zlib.compress(body, 9)
+                if len(encoded) < len(body):
+                    self.variants[coding] = encoded
+                    self.etags[coding] = f'"{digest}-{coding}"'
+
+    def encodings(self) -> list:
+        return [coding for coding in ENCODINGS if coding in self.variants]
+
+
+class StaticPage:
+    """A PreparedBody rendered from a template file, re-rendered when it changes.
+
+    The file's mtime and size are checked at most every `check_interval`
+    seconds, so a request normally costs one time comparison.
+    """
+
+    def __init__(self, path: Path, content_type: str = "text/html; charset=utf-8",
+                 render: Optional[Callable[[str], str]] = None, headers: Optional[dict] = None,
+                 check_interval: float = 1.0) -> None:
+        self.path = Path(path)
+        self.content_type = content_type
+        self.render = render or (lambda text: text)
+        self.headers = headers
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._checked = 0.0
+        self.body = self._load()
+
+    def _load(self) -> PreparedBody:
+        stat = os.stat(self.path)
+        self._stamp = (stat.st_mtime_ns, stat.st_size)
+        text = self.render(self.path.read_text(encoding="utf-8"))
+        return PreparedBody(text.encode("utf-8"), self.content_type, self.headers)
+
+    def current(self) -> PreparedBody:
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return self.body
+        with self._lock:
+            if now - self._checked >= self.check_interval:
+                self._checked = now
+                try:
+                    stat = os.stat(self.path)
+                    if (stat.st_mtime_ns, stat.st_size) != self._stamp:
+                        self.body = self._load()
+                except OSError:
+                    pass  # keep serving the last good render
+        return self.body
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Base handler speaking HTTP/1.1 with an idle keep-alive timeout.
+
+    Every response must carry Content-Length (or close the connection), so
+    subclasses should send bodies through `send_body()`.
+    """
+
+    protocol_version = "HTTP/1.1"
+    timeout = KEEPALIVE_TIMEOUT
+    # headers and body go out in separate writes; without TCP_NODELAY the
+    # second one waits for the client's delayed ACK (~40 ms per request)
+    disable_nagle_algorithm = True
+
+    def send_body(self, status: int, content_type: str, body: bytes, headers: dict = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def send_prepared(self, prepared: PreparedBody) -> None:
+        """Send the best encoding of `prepared`, or 304 if the client has it."""
+        coding = negotiate_encoding(self.headers.get("Accept-Encoding"), prepared.encodings())
+        headers = dict(prepared.headers)
+        headers["ETag"] = prepared.etags[coding]
+        if len(prepared.variants) > 1:
+            headers["Vary"] = "Accept-Encoding"
+        if etag_matches(self.headers.get("If-None-Match"), prepared.etags.values()):
+            self.send_response(304)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+        if coding != "identity":
+            headers["Content-Encoding"] = coding
+        self.send_body(200, prepared.content_type, prepared.variants[coding], headers)
+
+    def handle_one_request(self) -> None:
+        try:
+            super().handle_one_request()
+        except ConnectionError:
+            # client went away mid-request
+            self.close_connection = True
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer that serves connections from a bounded thread pool."""
+
+    allow_reuse_address = True
+    request_queue_size = 128
+
+    def __init__(self, server_address, handler_class, workers: int = DEFAULT_WORKERS) -> None:
+        super().__init__(server_address, handler_class)
+        self.workers = workers
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="http")
+        self._connections = set()
+        self._conn_lock = threading.Lock()
+
+    def process_request(self, request, client_address) -> None:
+        self._pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address) -> None:
+        with self._conn_lock:
+            self._connections.add(request)
+        try:
+            self.finish_request(request, client_address)
+        except Exception:  # noqa: BLE001
+            self.handle_error(request, client_address)
+        finally:
+            with self._conn_lock:
+                self._connections.discard(request)
+            self.shutdown_request(request)
+
+    def server_close(self) -> None:
+        """Stop accepting, then wait for in-flight requests to finish.
+
+        Open connections get their read side shut, so idle keep-alive clients
+        are released at once while a response being written still completes.
+        """
+        super().server_close()
+        with self._conn_lock:
+            for conn in list(self._connections):
+                try:
+                    conn.shutdown(socket.SHUT_RD)
+                except OSError:
+                    pass
+        self._pool.shutdown(wait=True)
+
+
+def serve_until_signalled(server: HTTPServer, on_shutdown: Callable[[], None] = None) -> None:
+    """Run `server` until SIGINT/SIGTERM, then shut down gracefully.
+
+    `on_shutdown` runs before in-flight requests are drained; use it to end
+    long-lived responses such as event streams.
+    """
+
+    def stop(signum, frame) -> None:  # noqa: ANN001
+        # shutdown() blocks until serve_forever returns, so call it elsewhere
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    try:
+        server.serve_forever()
+    finally:
+        if on_shutdown:
+            on_shutdown()
+        server.server_close()
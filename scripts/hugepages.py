@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""Huge-pages readiness audit for RandomX.
+
+In fast mode RandomX keeps a 2080 MB dataset (one per NUMA node with
+`numa`) and a 256 MB cache, plus a 2 MB scratchpad per mining thread and,
+with `huge-pages-jit`, a page of JIT code per thread. XMRig asks for huge
+pages at start-up. If they are not there it quietly uses 4 KB pages, which
+costs about 20 % of the hashrate.
+
+audit() compares what config.json needs with:
+
+- the huge page pools (/sys/kernel/mm/hugepages/hugepages-*kB/, with
+  /proc/meminfo as the fallback),
+- what the running XMRig actually maps: Shared/Private_Hugetlb plus
+  AnonHugePages from /proc/<pid>/smaps_rollup.
+
+The readiness score (0-100) is the share of the requirement that XMRig
+has on huge pages: "ready", "partial" or "fallback" (4 KB pages). When that
+cannot be read (miner stopped, still starting, or smaps_rollup not readable
+by this user), the score is the share the pools could cover, `verified` is
+False and the status is "pending", "ready" or "insufficient".
+
+HugePagesAuditor remembers which PID last had its pages, so a restart that
+fell back to 4 KB pages raises `alert`.
+
+    python3 scripts/hugepages.py [--json | --recommend]
+"""
+
+import argparse
+import json
+import math
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+from miner_api import MONERO_CONFIG
+from proc_sampler import read_meminfo
+from process_tracker import ProcessTracker
+
+DATASET_MB = 2080
+CACHE_MB = 256
+SCRATCHPAD_MB = 2
+PAGE_2M_KB = 2048
+PAGE_1G_KB = 1048576
+# XMRig allocates in its first seconds; judge a process only after this
+GRACE = 60.0
+# At or above this score the miner counts as ready
+READY_SCORE = 95.0
+# Below this share of the requirement the miner runs on 4 KB pages
+FALLBACK_SCORE = 10.0
+# XMRig's defaults for the keys audit() reads, for a missing config
+DEFAULTS = {"huge-pages": True, "huge-pages-jit": False, "1gb-pages": False, "numa": True, "mode": "auto"}
+
+
+def read_config(config: Path = MONERO_CONFIG) -> dict:
+    """The memory-related settings of the miner config (XMRig defaults when unreadable)."""
+    settings = dict(DEFAULTS, threads=os.cpu_count() or 1)
+    try:
+        with config.open("r", encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (json.JSONDecodeError, OSError):
+        return settings
+    cpu, randomx = data.get("cpu", {}), data.get("randomx", {})
+    for key in ("huge-pages", "huge-pages-jit"):
+        settings[key] = bool(cpu.get(key, settings[key]))
+    for key in ("1gb-pages", "numa", "mode"):
+        settings[key] = randomx.get(key, settings[key])
+    if isinstance(cpu.get("rx"), list):
+        settings["threads"] = len(cpu["rx"])
+    return settings
+
+
+def numa_nodes(sys_root: str = "/sys") -> int:
+    return len(list(Path(sys_root, "devices/system/node").glob("node[0-9]*"))) or 1
+
+
+def requirement(settings: dict, nodes: int = 1) -> dict:
+    """Memory RandomX wants on huge pages, in kB and in pages."""
+    threads = settings["threads"]
+    dataset_kb = 0 if settings["mode"] == "light" else DATASET_MB * 1024 * (nodes if settings["numa"] else 1)
+    small_kb = CACHE_MB * 1024 + threads * SCRATCHPAD_MB * 1024
+    if settings["huge-pages-jit"]:
+        small_kb += threads * PAGE_2M_KB
+    return {
+        "threads": threads,
+        "dataset_kb": dataset_kb,
+        "total_kb": dataset_kb + small_kb,
+        # everything on 2 MB pages, or the dataset on 1 GB pages
+        "pages_2m": math.ceil((dataset_kb + small_kb) / PAGE_2M_KB),
+        "pages_1g": math.ceil(dataset_kb / PAGE_1G_KB) if settings["1gb-pages"] else 0,
+        "pages_2m_with_1g": math.ceil(small_kb / PAGE_2M_KB),
+    }
+
+
+def read_pools(sys_root: str = "/sys", proc: str = "/proc") -> Dict[int, dict]:
+    """{page size kB: {"total", "free", "reserved", "surplus"}} of every hugetlb pool."""
+    pools = {}
+    for path in Path(sys_root, "kernel/mm/hugepages").glob("hugepages-*kB"):
+        values = {}
+        for key, name in (("total", "nr_hugepages"), ("free", "free_hugepages"),
+                          ("reserved", "resv_hugepages"), ("surplus", "surplus_hugepages")):
+            try:
+                values[key] = int((path / name).read_text())
+            except (OSError, ValueError):
+                values[key] = 0
+        pools[int(path.name[len("hugepages-"):-2])] = values
+    if not pools:
+        try:
+            info = read_meminfo(Path(proc))
+        except OSError:
+            info = {}
+        if info.get("Hugepagesize"):
+            pools[info["Hugepagesize"]] = {"total": info.get("HugePages_Total", 0),
+                                           "free": info.get("HugePages_Free", 0),
+                                           "reserved": info.get("HugePages_Rsvd", 0),
+                                           "surplus": info.get("HugePages_Surp", 0)}
+    return pools
+
+
+def read_smaps_rollup(pid: int, proc: str = "/proc") -> Optional[Dict[str, int]]:
+    """Hugetlb and THP kB mapped by `pid`, or None if gone or not readable."""
+    usage = {"hugetlb_kb": 0, "thp_kb": 0, "rss_kb": 0}
+    try:
+        with open(os.path.join(proc, str(pid), "smaps_rollup"), "rb") as fh:
+            for line in fh:
+                key, _, rest = line.partition(b":")
+                if key in (b"Shared_Hugetlb", b"Private_Hugetlb"):
+                    usage["hugetlb_kb"] += int(rest.split()[0])
+                elif key == b"AnonHugePages":
+                    usage["thp_kb"] = int(rest.split()[0])
+                elif key == b"Rss":
+                    usage["rss_kb"] = int(rest.split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return usage
+
+
+def _status(score: float) -> str:
+    if score >= READY_SCORE:
+        return "ready"
+    return "partial" if score >= FALLBACK_SCORE else "fallback"
+
+
+class HugePagesAuditor:
+    """Audits on demand and remembers which XMRig PID last had huge pages."""
+
+    def __init__(self, config: Path = MONERO_CONFIG, proc: str = "/proc", sys_root: str = "/sys",
+                 grace: float = GRACE) -> None:
+        self.config = config
+        self.proc = proc
+        self.sys_root = sys_root
+        self.grace = grace
+        self._good_pid: Optional[int] = None
+
+    def audit(self, process: Optional[dict] = None) -> dict:
+        """Audit against one ProcessTracker.poll() entry for xmrig (None: not running)."""
+        settings = read_config(self.config)
+        need = requirement(settings, numa_nodes(self.sys_root))
+        pools = read_pools(self.sys_root, self.proc)
+        pool_2m = pools.get(PAGE_2M_KB, {"total": 0, "free": 0})
+        pool_1g = pools.get(PAGE_1G_KB, {"total": 0, "free": 0})
+        running = bool(process and process.get("running"))
+        usage = read_smaps_rollup(process["pid"], self.proc) if running else None
+        settled = running and (process.get("uptime") or 0) >= self.grace
+        problems = []
+
+        # what the pools could give a (re)starting miner
+        key = "total" if running else "free"
+        on_1g = settings["1gb-pages"] and pool_1g[key] >= need["pages_1g"] > 0
+        wanted_2m = need["pages_2m_with_1g"] if on_1g else need["pages_2m"]
+        capacity_kb = min(need["total_kb"], pool_2m[key] * PAGE_2M_KB + (need["dataset_kb"] if on_1g else 0))
+        verified = settled and usage is not None
+        if not settings["huge-pages"]:
+            score = 0.0
+            status = "disabled"
+            problems.append("huge-pages is off in config.json")
+        elif verified:
+            used_kb = usage["hugetlb_kb"] + usage["thp_kb"]
+            score = min(100.0, 100.0 * used_kb / need["total_kb"]) if need["total_kb"] else 100.0
+            status = _status(score)
+        else:
+            score = 100.0 * capacity_kb / need["total_kb"] if need["total_kb"] else 100.0
+            # unverified: only whether the pools could cover a (re)start
+            if running and usage is not None:
+                status = "pending"
+            else:
+                status = "ready" if score >= READY_SCORE else "insufficient"
+            if running and usage is None:
+                problems.append(f"cannot read /proc/{process['pid']}/smaps_rollup; usage not verified")
+
+        if settings["huge-pages"] and pool_2m["total"] < wanted_2m:
+            problems.append(f"vm.nr_hugepages is {pool_2m['total']} ({pool_2m['total'] * 2} MB); "
+                            f"RandomX needs about {wanted_2m} 2 MB pages")
+        if settings["1gb-pages"] and need["pages_1g"] and pool_1g["total"] < need["pages_1g"]:
+            problems.append(f"1gb-pages is on but only {pool_1g['total']} of {need['pages_1g']} 1 GB pages "
+                            "are reserved (hugepagesz=1G hugepages=N on the kernel command line)")
+        if verified and status != "ready":
+            problems.append(f"XMRig has {(usage['hugetlb_kb'] + usage['thp_kb']) // 1024} of "
+                            f"{need['total_kb'] // 1024} MB on huge pages")
+
+        alert = ""
+        if verified and status == "ready":
+            self._good_pid = process["pid"]
+        elif verified and status == "fallback":
+            restarted = self._good_pid is not None and self._good_pid != process["pid"]
+            alert = ("XMRig restarted on 4 KB pages" if restarted else "XMRig is running on 4 KB pages") + \
+                ": huge pages were not available, expect about 20% less hashrate"
+        return {
+            "score": round(score, 1),
+            "status": status,
+            "verified": verified,
+            "required": need,
+            "recommended_nr_hugepages": wanted_2m,
+            "pools": {str(size): pool for size, pool in sorted(pools.items())},
+            "xmrig": dict(usage, pid=process["pid"]) if usage is not None else None,
+            "settings": settings,
+            "problems": problems,
+            "alert": alert,
+        }
+
+
+def summarize(audit: dict) -> dict:
+    """The flat subset the collector publishes and the dashboards show."""
+    pool = audit["pools"].get(str(PAGE_2M_KB), {})
+    xmrig = audit["xmrig"]
+    return {
+        "score": audit["score"],
+        "status": audit["status"],
+        "verified": audit["verified"],
+        "required_kb": audit["required"]["total_kb"],
+        "used_kb": xmrig["hugetlb_kb"] + xmrig["thp_kb"] if audit["verified"] else None,
+        "pages_total": pool.get("total", 0),
+        "pages_free": pool.get("free", 0),
+        "recommended": audit["recommended_nr_hugepages"],
+        "problem": audit["problems"][0] if audit["problems"] else "",
+        "alert": audit["alert"],
+    }
+
+
+def format_readiness(summary: dict) -> str:
+    """One-line summary such as '100% ready (2368/2368 MB in use)'."""
+    if summary["status"] == "disabled":
+        return "disabled in config.json"
+    total_mb = summary["required_kb"] // 1024
+    if summary["verified"]:
+        return f"{summary['score']:.0f}% {summary['status']} ({summary['used_kb'] // 1024}/{total_mb} MB in use)"
+    return f"{summary['score']:.0f}% {summary['status']} (pools cover {summary['score'] * total_mb / 100:.0f}/{total_mb} MB)"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check that XMRig gets the huge pages RandomX needs")
+    parser.add_argument("--config", type=Path, default=MONERO_CONFIG, help="miner config.json")
+    parser.add_argument("--json", action="store_true", help="print the full audit as JSON")
+    parser.add_argument("--recommend", action="store_true", help="print only the vm.nr_hugepages to set")
+    args = parser.parse_args()
+
+    process = ProcessTracker(names=("xmrig",)).poll()["xmrig"]
+    audit = HugePagesAuditor(args.config).audit(process)
+    if args.recommend:
+        print(audit["recommended_nr_hugepages"])
+        return
+    if args.json:
+        print(json.dumps(audit, indent=2))
+        return
+    print(f"Huge pages: {format_readiness(summarize(audit))}")
+    need = audit["required"]
+    print(f"Required:   {need['total_kb'] // 1024} MB for {need['threads']} threads "
+          f"(nr_hugepages >= {audit['recommended_nr_hugepages']}"
+          + (f", or {need['pages_2m_with_1g']} with {need['pages_1g']} x 1 GB" if need["pages_1g"] else "") + ")")
+    for size, pool in audit["pools"].items():
+        print(f"Pool {int(size) // 1024:>5} MB: {pool['total']} total, {pool['free']} free, {pool['reserved']} reserved")
+    for problem in audit["problems"]:
+        print(f"  ! {problem}")
+    if audit["alert"]:
+        print(f"ALERT: {audit['alert']}")
+
+
+if __name__ == "__main__":
+    main()
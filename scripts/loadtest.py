@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Concurrent load test for the dashboards.
+
+Opens N keep-alive connections and has each fire requests back to back,
+then prints latency percentiles and throughput:
+
+    python3 scripts/loadtest.py http://127.0.0.1:3001/api/stats --clients 50 --requests 40
+"""
+
+import argparse
+import http.client
+import json
+import threading
+import time
+import urllib.parse
+from typing import List
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def run_client(url: urllib.parse.SplitResult, requests: int, latencies: List[float], errors: List[str]) -> None:
+    conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+    path = url.path or "/"
+    if url.query:
+        path += "?" + url.query
+    for _ in range(requests):
+        started = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status >= 400:
+                errors.append(f"HTTP {resp.status}")
+        except (OSError, http.client.HTTPException) as exc:
+            errors.append(str(exc))
+            conn.close()
+            conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - started)
+    conn.close()
+
+
+def load_test(url: str, clients: int = 50, requests: int = 20) -> dict:
+    """Run the load test and return a summary dict (latencies in ms)."""
+    parts = urllib.parse.urlsplit(url)
+    latencies: List[float] = []
+    errors: List[str] = []
+    threads = [
+        threading.Thread(target=run_client, args=(parts, requests, latencies, errors))
+        for _ in range(clients)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "url": url,
+        "clients": clients,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test a dashboard endpoint")
+    parser.add_argument("url")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=20, help="requests per client")
+    args = parser.parse_args()
+    print(json.dumps(load_test(args.url, args.clients, args.requests), indent=2))
+
+
+if __name__ == "__main__":
+    main()
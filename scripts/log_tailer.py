@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""Incremental tailer for XMRig's log file (`log-file` in config.json).
+
+The log has what the HTTP API forgets: every accepted/rejected share, every
+new job, huge-page allocation and algorithm switches. LogTailer follows the
+file from a persisted byte offset, so nothing is read twice across restarts:
+
+- it wakes on inotify events for the log's directory (through libc via
+  ctypes) and falls back to polling os.stat() where inotify is missing;
+- a new inode at the path (rotation by rename) is finished to EOF on the
+  old descriptor before the new file is opened; a file shorter than the
+  offset (copytruncate) is re-read from the start;
+- only complete lines are consumed; a partial last line waits for its end.
+
+Parsing works on whole chunks of bytes rather than line by line, without
+copying them: job lines are counted with bytes.count(), share counts come
+from the cumulative "(accepted/rejected)" pair XMRig prints on every share
+line (counting lines only when a start-up banner shows a restart), and only
+the last speed, huge pages and share line of a chunk goes through a regex.
+A chunk that mentions no other algorithm than the current one skips the
+per-job scan, so a large backlog is processed close to disk speed.
+
+    python3 scripts/log_tailer.py [--log PATH] [--follow]
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import json
+import os
+import re
+import select
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from miner_api import read_log_file
+
+CHUNK_SIZE = 4 << 20
+POLL_INTERVAL = 1.0
+# Seconds between offset saves while the log is busy
+SAVE_INTERVAL = 5.0
+
+ACCEPTED = b" accepted ("
+REJECTED = b" rejected ("
+NEW_JOB = b" new job from "
+# first line of XMRig's start-up banner: share counters restart from zero
+STARTUP = b" * ABOUT "
+SPEED = b" speed 10s/60s/15m "
+HUGE_PAGES = b"huge pages "
+SPEED_RE = re.compile(rb"speed 10s/60s/15m (\S+) (\S+) (\S+) H/s max (\S+) H/s")
+SHARE_RE = re.compile(rb"accepted \((\d+)/(\d+)\) diff (\d+) \((\d+) ms\)")
+SHARE_COUNTS_RE = re.compile(rb"(?:accepted|rejected) \((\d+)/(\d+)\)")
+HUGE_PAGES_RE = re.compile(rb"huge pages (\d+)% (\d+)/(\d+)")
+JOB_ALGO_RE = re.compile(rb"new job from \S+ diff \d+ algo (\S+)")
+
+# inotify(7) event masks for the log's directory
+IN_MODIFY = 0x002
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+WATCH_MASK = IN_MODIFY | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+
+def _rate(value: bytes) -> Optional[float]:
+    try:
+        return float(value)
+    except ValueError:
+        return None  # "n/a" until the window has filled
+
+
+def _last_line(chunk: bytes, marker: bytes, end: int) -> Optional[bytes]:
+    at = chunk.rfind(marker, 0, end)
+    if at < 0:
+        return None
+    return chunk[at:chunk.find(b"\n", at, end)]
+
+
+class LogStats:
+    """Counters since the tailer first saw the log, plus the latest gauges."""
+
+    COUNTERS = ("accepted", "rejected", "jobs", "algo_switches", "bytes")
+
+    def __init__(self) -> None:
+        self.accepted = self.rejected = self.jobs = self.algo_switches = self.bytes = 0
+        self.algo: Optional[str] = None
+        self.hashrate: Optional[list] = None  # 10s, 60s, 15m, max
+        self.huge_pages: Optional[float] = None
+        self.last_share: Optional[dict] = None
+        # XMRig's own (accepted, rejected) totals from the last share line
+        self.miner_totals: Optional[tuple] = None
+        self._other_algo = None
+
+    def feed(self, chunk: bytes, end: int) -> None:
+        """Account the complete lines in chunk[:end]."""
+        self.bytes += end
+        jobs = chunk.count(NEW_JOB, 0, end)
+        self.jobs += jobs
+        if jobs:
+            self._track_algo(chunk, end)
+        self._count_shares(chunk, end)
+
+        line = _last_line(chunk, SPEED, end)
+        match = line and SPEED_RE.search(line)
+        if match:
+            self.hashrate = [_rate(v) for v in match.groups()]
+        line = _last_line(chunk, HUGE_PAGES, end)
+        match = line and HUGE_PAGES_RE.search(line)
+        if match:
+            self.huge_pages = int(match.group(1)) / 100
+        line = _last_line(chunk, ACCEPTED, end)
+        match = line and SHARE_RE.search(line)
+        if match:
+            good, bad, diff, latency = (int(v) for v in match.groups())
+            self.last_share = {"accepted": good, "rejected": bad, "diff": diff, "latency_ms": latency}
+
+    def _count_shares(self, chunk: bytes, end: int) -> None:
+        restarted = chunk.find(STARTUP, 0, end) >= 0
+        at = max(chunk.rfind(ACCEPTED, 0, end), chunk.rfind(REJECTED, 0, end))
+        match = SHARE_COUNTS_RE.match(chunk, at + 1) if at >= 0 else None
+        if match is None:
+            if restarted:
+                self.miner_totals = (0, 0)  # the next share lines count from zero
+            return
+        totals = (int(match.group(1)), int(match.group(2)))
+        previous, self.miner_totals = self.miner_totals, totals
+        if previous is not None and not restarted and totals[0] >= previous[0] and totals[1] >= previous[1]:
+            self.accepted += totals[0] - previous[0]
+            self.rejected += totals[1] - previous[1]
+        else:
+            # first chunk, or the miner restarted inside it: count the lines
+            self.accepted += chunk.count(ACCEPTED, 0, end)
+            self.rejected += chunk.count(REJECTED, 0, end)
+
+    def _track_algo(self, chunk: bytes, end: int) -> None:
+        if self.algo is not None:
+            if self._other_algo is None:
+                self._other_algo = re.compile(rb"algo (?!" + re.escape(self.algo.encode()) + rb" )")
+            if not self._other_algo.search(chunk, 0, end):
+                return  # no other algorithm is mentioned anywhere in the chunk
+        for match in JOB_ALGO_RE.finditer(chunk, 0, end):
+            algo = match.group(1).decode("ascii", "replace")
+            if algo != self.algo:
+                if self.algo is not None:
+                    self.algo_switches += 1
+                self.algo, self._other_algo = algo, None
+
+    def as_dict(self) -> dict:
+        result = {name: getattr(self, name) for name in self.COUNTERS}
+        result.update(algo=self.algo, hashrate=self.hashrate, huge_pages=self.huge_pages,
+                      last_share=self.last_share, miner_totals=self.miner_totals)
+        return result
+
+    def restore(self, saved: dict) -> None:
+        for name in self.COUNTERS:
+            setattr(self, name, int(saved.get(name, 0)))
+        self.algo = saved.get("algo")
+        self.hashrate = saved.get("hashrate")
+        self.huge_pages = saved.get("huge_pages")
+        self.last_share = saved.get("last_share")
+        self.miner_totals = tuple(saved["miner_totals"]) if saved.get("miner_totals") else None
+
+
+class _Inotify:
+    """Minimal inotify binding: a non-blocking fd that becomes readable on events."""
+
+    def __init__(self, directory: Path) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    def wait(self, timeout: float) -> None:
+        if select.select([self.fd], [], [], timeout)[0]:
+            try:
+                while os.read(self.fd, 65536):
+                    pass  # the events only mean "look again"
+            except BlockingIOError:
+                pass
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class LogTailer:
+    """Follows one log file from a persisted offset; see the module docstring."""
+
+    def __init__(self, path: Path, state_path: Optional[Path] = None, chunk_size: int = CHUNK_SIZE,
+                 on_update: Optional[Callable[[LogStats], None]] = None) -> None:
+        self.path = Path(path)
+        self.state_path = Path(state_path) if state_path else self.path.with_name(self.path.name + ".offset")
+        self.chunk_size = chunk_size
+        self.on_update = on_update
+        self.stats = LogStats()
+        self.offset = 0
+        self.inode: Optional[tuple] = None  # (st_dev, st_ino) the offset belongs to
+        self.rotations = 0
+        self._fh = None
+        self._saved_at = 0.0
+        self._save_failed = False
+        self._lock = threading.Lock()
+        self._load_state()
+
+    def _load_state(self) -> None:
+        try:
+            saved = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        self.offset = int(saved.get("offset", 0))
+        self.inode = tuple(saved["inode"]) if saved.get("inode") else None
+        self.stats.restore(saved.get("stats", {}))
+
+    def save_state(self) -> None:
+        """Atomically persist offset, inode and counters."""
+        state = {"path": str(self.path), "offset": self.offset, "inode": self.inode, "stats": self.stats.as_dict()}
+        tmp = self.state_path.with_name(self.state_path.name + ".tmp")
+        try:
+            tmp.write_text(json.dumps(state), encoding="utf-8")
+            os.replace(tmp, self.state_path)
+        except OSError as exc:
+            if not self._save_failed:
+                print(f"log tailer: cannot save offset to {self.state_path}: {exc}", file=sys.stderr)
+            self._save_failed = True
+        self._saved_at = time.monotonic()
+
+    def _open(self) -> bool:
+        """(Re)open the path; returns False while the file does not exist."""
+        try:
+            # unbuffered: _drain seeks back over partial lines, and every
+            # read is one large syscall anyway
+            fh = open(self.path, "rb", buffering=0)
+        except OSError:
+            return False
+        st = os.fstat(fh.fileno())
+        inode = (st.st_dev, st.st_ino)
+        if inode != self.inode:
+            # a different file than the saved offset refers to
+            if self.inode is not None:
+                self.rotations += 1
+            self.inode, self.offset = inode, 0
+        elif st.st_size < self.offset:
+            self.offset = 0  # truncated while we were not looking
+        fh.seek(self.offset)
+        self._fh = fh
+        return True
+
+    def _drain(self) -> int:
+        """Consume every complete line after the offset."""
+        consumed = 0
+        size = self.chunk_size
+        while True:
+            data = self._fh.read(size)
+            end = data.rfind(b"\n") + 1
+            if end:
+                self.stats.feed(data, end)
+                self.offset += end
+                consumed += end
+            # re-read the partial tail with the next chunk instead of copying it
+            self._fh.seek(self.offset)
+            if len(data) < size:
+                return consumed  # end of file
+            size = self.chunk_size if end else size * 2  # grow for a line longer than the chunk
+
+    def poll(self) -> int:
+        """Read whatever is new; returns the number of bytes consumed."""
+        with self._lock:
+            if self._fh is None and not self._open():
+                return 0
+            consumed = self._drain()
+            try:
+                st = os.stat(self.path)
+            except OSError:
+                st = None  # rotated away and not recreated yet
+            current = os.fstat(self._fh.fileno())
+            if st is not None and (st.st_dev, st.st_ino) != self.inode:
+                # rotated: the old file is finished, continue with the new one
+                self._fh.close()
+                self._fh = None
+                if self._open():
+                    consumed += self._drain()
+            elif current.st_size < self.offset:
+                # truncated in place (copytruncate)
+                self.offset = 0
+                self._fh.seek(0)
+                consumed += self._drain()
+            if consumed:
+                if self.on_update:
+                    self.on_update(self.stats)
+                if time.monotonic() - self._saved_at >= SAVE_INTERVAL:
+                    self.save_state()
+            return consumed
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            result = self.stats.as_dict()
+            result.update(offset=self.offset, rotations=self.rotations, path=str(self.path))
+        return result
+
+    def run(self, stop: threading.Event, poll_interval: float = POLL_INTERVAL) -> None:
+        """Follow the log until `stop` is set."""
+        watcher = None
+        try:
+            watcher = _Inotify(self.path.parent)
+        except (OSError, AttributeError) as exc:
+            print(f"log tailer: inotify unavailable ({exc}), polling every {poll_interval}s", file=sys.stderr)
+        try:
+            while not stop.is_set():
+                self.poll()
+                if watcher:
+                    # the timeout notices `stop` and a directory that was replaced
+                    watcher.wait(poll_interval)
+                else:
+                    stop.wait(poll_interval)
+        finally:
+            if watcher:
+                watcher.close()
+            self.save_state()
+            if self._fh:
+                self._fh.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tail XMRig's log file into counters")
+    parser.add_argument("--log", type=Path, default=read_log_file(), help="log file (default: log-file from config.json)")
+    parser.add_argument("--state", type=Path, help="offset file (default: <log>.offset)")
+    parser.add_argument("--follow", action="store_true", help="keep following and print the stats on every update")
+    args = parser.parse_args()
+    if args.log is None:
+        parser.error("no log-file in the miner config; pass --log")
+
+    tailer = LogTailer(args.log, args.state)
+    started = time.perf_counter()
+    consumed = tailer.poll()
+    elapsed = time.perf_counter() - started
+    tailer.save_state()
+    print(f"read {consumed / 1e6:.1f} MB in {elapsed:.2f}s ({consumed / 1e6 / max(elapsed, 1e-9):.0f} MB/s)", file=sys.stderr)
+    print(json.dumps(tailer.snapshot(), indent=2))
+    if args.follow:
+        tailer.on_update = lambda stats: print(json.dumps(stats.as_dict()), flush=True)
+        stop = threading.Event()
+        try:
+            tailer.run(stop)
+        except KeyboardInterrupt:
+            stop.set()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""Prometheus text exposition of the collector snapshot.
+
+The collector re-renders the whole page once per publish cycle (see
+collector.py), so a scrape only copies a prepared byte string. Metric
+families use Prometheus base units: seconds, bytes, hashes per second.
+
+Upstream call latencies are histograms fed from the StatsCache refresh hook,
+one series per source (xmrig, pool, sync, ...).
+"""
+
+import math
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from http_serving import KeepAliveHandler
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Upstream calls range from microseconds (cached) to the 8 s timeout
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PICONERO = 1e12
+
+
+class Histogram:
+    """Cumulative-bucket histogram of observed values."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.counts[bisect_left(self.buckets, value)] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        """Cumulative bucket counts (including +Inf), sum and count."""
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        cumulative, running = [], 0
+        for c in counts:
+            running += c
+            cumulative.append(running)
+        return cumulative, total, count
+
+
+class UpstreamMetrics:
+    """Per-source refresh latency histograms and error counters."""
+
+    def __init__(self) -> None:
+        self.latency: Dict[str, Histogram] = {}
+        self.errors: Dict[str, int] = {}
+
+    def observe_refresh(self, name: str, entry) -> None:  # noqa: ANN001 - stats_cache.Entry
+        """StatsCache refresh hook."""
+        if name not in self.latency:
+            self.latency[name] = Histogram()
+            self.errors[name] = 0
+        self.latency[name].observe(entry.duration)
+        if entry.error:
+            self.errors[name] += 1
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Optional[dict]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _value(value) -> str:
+    if value is None or value != value:
+        return "NaN"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
+
+
+class Page:
+    """Accumulates metric families in exposition order."""
+
+    def __init__(self) -> None:
+        self.lines: List[str] = []
+
+    def family(self, name: str, kind: str, help_text: str, samples: Iterable[Tuple[Optional[dict], object]]) -> None:
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            self.lines.append(f"{name}{_labels(labels)} {_value(value)}")
+
+    def gauge(self, name: str, help_text: str, value, labels: Optional[dict] = None) -> None:
+        self.family(name, "gauge", help_text, [(labels, value)])
+
+    def histogram(self, name: str, help_text: str, series: Dict[str, Histogram], label: str) -> None:
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} histogram")
+        for key, hist in sorted(series.items()):
+            cumulative, total, count = hist.snapshot()
+            for bound, c in zip(list(hist.buckets) + [math.inf], cumulative):
+                le = "+Inf" if math.isinf(bound) else repr(bound)
+                self.lines.append(f'{name}_bucket{_labels({label: key, "le": le})} {c}')
+            self.lines.append(f"{name}_sum{_labels({label: key})} {_value(total)}")
+            self.lines.append(f"{name}_count{_labels({label: key})} {count}")
+
+    def render(self) -> bytes:
+        return ("\n".join(self.lines) + "\n").encode("utf-8")
+
+
+def render_metrics(snapshot: dict, upstream: Optional[UpstreamMetrics] = None,
+                   cache_status: Optional[Dict[str, dict]] = None) -> bytes:
+    """Render a collector snapshot (collector.build_snapshot) as Prometheus text."""
+    page = Page()
+    xmrig = snapshot.get("xmrig") or {}
+    page.gauge("xmrig_up", "Whether the XMRig HTTP API answered the last poll.", bool(xmrig.get("ok")))
+    if xmrig.get("ok"):
+        page.family("xmrig_hashrate_hs", "gauge", "Total XMRig hashrate by averaging window.",
+                    [({"window": w}, xmrig.get(f"hashrate_{w}")) for w in ("10s", "60s", "15m")])
+        page.family("xmrig_thread_hashrate_hs", "gauge", "10s hashrate of each mining thread.",
+                    [({"thread": str(i)}, rate) for i, rate in enumerate(xmrig.get("threads") or [])])
+        page.family("xmrig_shares_good_total", "counter", "Shares accepted by the pool.",
+                    [(None, xmrig.get("shares_good", 0))])
+        page.family("xmrig_shares_total", "counter", "Shares submitted to the pool.",
+                    [(None, xmrig.get("shares_total", 0))])
+        page.gauge("xmrig_pool_ping_seconds", "Round trip to the pool.", (xmrig.get("ping") or 0) / 1000)
+        page.gauge("xmrig_difficulty", "Current share difficulty.", xmrig.get("diff", 0))
+        page.gauge("xmrig_uptime_seconds", "Miner uptime reported by XMRig.", xmrig.get("uptime", 0))
+
+    shares = snapshot.get("shares") or {}
+    windows = [(name, stats) for name, stats in shares.items() if isinstance(stats, dict)]
+    if windows:
+        page.family("xmrig_window_share_acceptance_ratio", "gauge", "Accepted / submitted shares in the window.",
+                    [({"window": w}, s["acceptance"]) for w, s in windows])
+        page.family("xmrig_window_shares_rejected", "gauge", "Rejected shares in the window.",
+                    [({"window": w}, s["rejected"]) for w, s in windows])
+        page.family("xmrig_window_shares_per_minute", "gauge", "Accepted shares per minute in the window.",
+                    [({"window": w}, s["shares_per_min"]) for w, s in windows])
+        page.family("xmrig_window_share_time_seconds", "gauge", "Mean time between accepted shares.",
+                    [({"window": w}, s["avg_share_time"]) for w, s in windows])
+        page.family("xmrig_window_pool_ping_seconds", "gauge", "Mean pool round trip in the window.",
+                    [({"window": w}, None if s["ping_avg"] is None else s["ping_avg"] / 1000) for w, s in windows])
+        page.family("xmrig_window_pool_ping_max_seconds", "gauge", "Slowest pool round trip in the window.",
+                    [({"window": w}, None if s["ping_max"] is None else s["ping_max"] / 1000) for w, s in windows])
+        page.family("xmrig_counter_resets_total", "counter", "Miner restarts seen as share counter resets.",
+                    [(None, shares.get("resets", 0))])
+
+    log = snapshot.get("xmrig_log")
+    if log:
+        page.family("xmrig_log_shares_total", "counter", "Share results logged in xmrig.log.",
+                    [({"result": "accepted"}, log["accepted"]), ({"result": "rejected"}, log["rejected"])])
+        page.family("xmrig_log_jobs_total", "counter", "New jobs received from the pool.", [(None, log["jobs"])])
+        page.family("xmrig_log_algo_switches_total", "counter", "Algorithm changes between jobs.",
+                    [(None, log["algo_switches"])])
+        page.family("xmrig_log_read_bytes_total", "counter", "Bytes of xmrig.log processed.", [(None, log["bytes"])])
+        page.family("xmrig_log_rotations_total", "counter", "Log rotations followed.", [(None, log["rotations"])])
+        if log["algo"]:
+            page.gauge("xmrig_log_algo_info", "Algorithm of the latest job.", 1, {"algo": log["algo"]})
+        if log["hashrate"]:
+            page.family("xmrig_log_hashrate_hs", "gauge", "Last speed line in xmrig.log.",
+                        [({"window": w}, rate) for w, rate in zip(("10s", "60s", "15m", "max"), log["hashrate"])])
+        page.gauge("xmrig_log_huge_pages_ratio", "Huge page coverage in the last allocation line.", log["huge_pages"])
+        if log["last_share"]:
+            page.gauge("xmrig_log_share_latency_seconds", "Submit round trip of the last accepted share.",
+                       log["last_share"]["latency_ms"] / 1000)
+
+    pool = snapshot.get("pool") or {}
+    # `ok` alone would hide outages: the collector keeps serving stale stats
+    pool_error = (cache_status or {}).get("pool", {}).get("error")
+    page.gauge("pool_up", "Whether the last pool API poll returned fresh stats.",
+               bool(pool.get("ok") and pool.get("fresh") and not pool_error))
+    if pool.get("age") is not None:
+        page.gauge("pool_stats_age_seconds", "Age of the pool stats at the last poll.", pool["age"])
+        page.gauge("pool_breaker_open", "Whether the MoneroOcean circuit breaker is open.",
+                   pool.get("breaker") == "open")
+        page.gauge("pool_hashrate_hs", "Hashrate credited by the pool.", pool.get("hashrate"))
+        page.gauge("pool_amount_due_xmr", "Unpaid balance.", (pool.get("amt_due") or 0) / PICONERO)
+        page.family("pool_amount_paid_xmr_total", "counter", "Total paid out.",
+                    [(None, (pool.get("amt_paid") or 0) / PICONERO)])
+
+    earnings = snapshot.get("earnings") or {}
+    if earnings.get("ok"):
+        page.family("earnings_projected_xmr_per_day", "gauge", "Projected earnings with the 90% band.",
+                    [({"band": "expected"}, earnings["xmr_day"]), ({"band": "low"}, earnings["xmr_day_low"]),
+                     ({"band": "high"}, earnings["xmr_day_high"])])
+        if earnings["payout_days"] is not None:
+            page.gauge("earnings_payout_eta_seconds", "Projected time to the minimum payout.",
+                       earnings["payout_days"] * 86400)
+        page.gauge("network_difficulty", "Monero network difficulty.", earnings["difficulty"])
+        page.gauge("network_block_reward_xmr", "Current block reward.", earnings["reward_xmr"])
+        page.gauge("pool_total_hashrate_hs", "Hashrate of the whole pool.", earnings["pool_hashrate"])
+
+    sync = snapshot.get("sync") or {}
+    page.gauge("monerod_up", "Whether monerod answered get_info.", bool(sync.get("available")))
+    if sync.get("available"):
+        page.gauge("monerod_height", "Local blockchain height.", sync.get("height"))
+        page.gauge("monerod_target_height", "Network height while syncing (0 once synced).", sync.get("target_height"))
+        page.gauge("monerod_synchronized", "Whether the node reports itself synchronized.", bool(sync.get("synchronized")))
+        page.gauge("monerod_sync_blocks_per_second", "Recent sync rate.", sync.get("blocks_per_sec"))
+
+    procs = [(name[:-5], info) for name, info in sorted(snapshot.items()) if name.endswith("_proc")]
+    page.family("process_up", "gauge", "Whether the mining process is running.",
+                [({"name": n}, bool(p.get("running"))) for n, p in procs])
+    page.family("process_uptime_seconds", "gauge", "Seconds since the process started.",
+                [({"name": n}, p.get("uptime") if p.get("running") else 0) for n, p in procs])
+    page.family("process_restarts_total", "counter", "Restarts seen since the collector started.",
+                [({"name": n}, p.get("restarts", 0)) for n, p in procs])
+    page.family("process_cpu_percent", "gauge", "CPU usage as a percentage of one core.",
+                [({"name": n}, p.get("cpu_percent", 0.0)) for n, p in procs])
+    page.family("process_resident_memory_bytes", "gauge", "Resident set size.",
+                [({"name": n}, (p.get("rss_kb") or 0) * 1024) for n, p in procs])
+
+    host = snapshot.get("host") or {}
+    if host:
+        page.gauge("host_cpu_percent", "Whole-machine CPU utilisation.", host.get("cpu_percent"))
+        page.gauge("host_memory_used_bytes", "Memory in use.", (host.get("mem_used_kb") or 0) * 1024)
+        page.gauge("host_memory_total_bytes", "Installed memory.", (host.get("mem_total_kb") or 0) * 1024)
+        page.gauge("host_cpu_temperature_celsius", "CPU package temperature.", host.get("cpu_temp"))
+
+    hugepages = snapshot.get("hugepages") or {}
+    if hugepages.get("status"):
+        page.gauge("hugepages_readiness_score", "Share (0-100) of RandomX memory on huge pages.", hugepages["score"])
+        page.gauge("hugepages_verified", "Whether the score was read from the running XMRig.", bool(hugepages["verified"]))
+        page.gauge("hugepages_required_bytes", "Memory RandomX wants on huge pages.", hugepages["required_kb"] * 1024)
+        if hugepages["used_kb"] is not None:
+            page.gauge("hugepages_used_bytes", "Huge page memory mapped by XMRig.", hugepages["used_kb"] * 1024)
+        page.family("hugepages_pool_pages", "gauge", "2 MB huge pages in the kernel pool.",
+                    [({"state": "total"}, hugepages["pages_total"]), ({"state": "free"}, hugepages["pages_free"])])
+        page.gauge("hugepages_fallback", "Whether XMRig is running on 4 KB pages.", bool(hugepages["alert"]))
+
+    fleet = snapshot.get("fleet") or {}
+    if fleet.get("count"):
+        page.gauge("fleet_rigs", "Rigs listed in rigs.json.", fleet["count"])
+        page.gauge("fleet_rigs_online", "Rigs that answered the last poll.", fleet["online"])
+        rigs = fleet.get("rigs") or []
+        page.family("fleet_rig_up", "gauge", "Whether the rig answered the last poll.",
+                    [({"rig": r["name"]}, bool(r["ok"])) for r in rigs])
+        page.family("fleet_rig_hashrate_hs", "gauge", "10s hashrate of each rig.",
+                    [({"rig": r["name"]}, r["hashrate_10s"]) for r in rigs])
+        page.family("fleet_rig_shares_good_total", "counter", "Accepted shares of each rig.",
+                    [({"rig": r["name"]}, r["shares_good"]) for r in rigs])
+
+    if upstream is not None and upstream.latency:
+        page.histogram("collector_upstream_duration_seconds", "Duration of each collector source refresh.",
+                       upstream.latency, "source")
+        page.family("collector_upstream_errors_total", "counter", "Failed source refreshes.",
+                    [({"source": name}, count) for name, count in sorted(upstream.errors.items())])
+    if cache_status:
+        page.family("collector_source_age_seconds", "gauge", "Seconds since each source was refreshed.",
+                    [({"source": name}, status["age"]) for name, status in sorted(cache_status.items())])
+    page.gauge("collector_rendered_timestamp_seconds", "When this page was rendered.", time.time())
+    return page.render()
+
+
+class MetricsHandler(KeepAliveHandler):
+    """Serves the page last stored in `body`; never renders on the request path."""
+
+    body = b""
+
+    def do_GET(self):  # noqa: N802
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_body(404, "text/plain", b"not found\n")
+            return
+        self.send_body(200, CONTENT_TYPE, type(self).body)
+
+    def log_message(self, format: str, *args) -> None:  # noqa: ANN001
+        return
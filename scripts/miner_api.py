@@ -0,0 +1,99 @@
+"""Shared access to the local XMRig API and the miner configuration.
+
+Used by the dashboards, the Telegram bot and the stats collector so they all
+agree on where the miner lives and how to authenticate against it.
+"""
+
+import json
+import os
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from http_serving import upstream_slot
+
+# Path to the miner configuration file
+dapp_root = Path("/home/dappy")
+MONERO_CONFIG = dapp_root / "monero-mining" / "config.json"
+
+# Local XMRig HTTP API (see "http" in config.json); the environment
+# overrides are for pointing the tools at stand-ins (scripts/standins.py)
+XMRIG_API = os.environ.get("XMRIG_API", "http://127.0.0.1:3001")
+XMRIG_TOKEN = os.environ.get("XMRIG_TOKEN", "mining-dashboard")
+XMRIG_SUMMARY_URL = f"{XMRIG_API}/1/summary"
+
+
+def read_wallet(config: Path = MONERO_CONFIG) -> str:
+    """Return the wallet of the first pool in the miner config, or ''."""
+    if not config.exists():
+        return ""
+    try:
+        with config.open("r", encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (json.JSONDecodeError, OSError):
+        return ""
+    pools = data.get("pools", [])
+    return pools[0].get("user", "") if pools else ""
+
+
+def read_log_file(config: Path = MONERO_CONFIG) -> Optional[Path]:
+    """XMRig's `log-file` from the miner config (XMRIG_LOG overrides), or None."""
+    if os.environ.get("XMRIG_LOG"):
+        return Path(os.environ["XMRIG_LOG"])
+    try:
+        with config.open("r", encoding="utf-8") as fh:
+            log_file = json.load(fh).get("log-file")
+    except (json.JSONDecodeError, OSError, AttributeError):
+        return None
+    return Path(log_file) if isinstance(log_file, str) and log_file else None
+
+
+def rx_entries(rx) -> List[Tuple[int, int]]:
+    """(intensity, affinity) per thread of a `cpu.rx` profile; -1 is unpinned.
+
+    Entries may be a bare affinity, [intensity, affinity] or
+    {"intensity": ..., "affinity": ...}.
+    """
+    if not isinstance(rx, list):
+        return []
+    entries = []
+    for entry in rx:
+        if isinstance(entry, list):
+            entry = (entry[0], entry[1] if len(entry) > 1 else -1)
+        elif isinstance(entry, dict):
+            entry = (entry.get("intensity", 1), entry.get("affinity", -1))
+        else:
+            entry = (1, entry)
+        entries.append((max(1, int(entry[0] or 1)), entry[1] if isinstance(entry[1], int) else -1))
+    return entries
+
+
+def read_rx_affinity(config: Path = MONERO_CONFIG) -> List[Optional[int]]:
+    """CPU each RandomX thread is pinned to, from `cpu.rx` in the miner config.
+
+    Unpinned threads (-1 or no affinity) are None; see rx_entries.
+    """
+    try:
+        with config.open("r", encoding="utf-8") as fh:
+            rx = json.load(fh).get("cpu", {}).get("rx", [])
+    except (json.JSONDecodeError, OSError, AttributeError):
+        return []
+    return [cpu if cpu >= 0 else None for _, cpu in rx_entries(rx)]
+
+
+def fetch_json(url: str, timeout: float = 8.0) -> dict:
+    """Return decoded JSON from a URL or {} on failure."""
+    try:
+        req = urllib.request.Request(url)
+        # Add access token for XMRig API
+        if url.startswith(XMRIG_API):
+            req.add_header("Authorization", f"Bearer {XMRIG_TOKEN}")
+        with upstream_slot(timeout) as acquired:
+            if not acquired:
+                return {}
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                text = resp.read().decode("utf-8")
+        return json.loads(text)
+    except (urllib.error.URLError, urllib.error.HTTPError, json.JSONDecodeError, TimeoutError, OSError):
+        return {}
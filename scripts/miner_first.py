@@ -0,0 +1,231 @@
+"""Miner-first mode: keep the monitoring tools out of XMRig's way.
+
+XMRig has a thread on every logical CPU of the i7-4790, so every cycle a
+dashboard or the bot spends comes out of the hashrate. With MINER_FIRST=1
+in the environment a tool
+
+- runs under SCHED_IDLE (falling back to nice 19), so the kernel only
+  gives it CPU time XMRig leaves unused; call `start()` before any thread
+  is created, since the policy is per thread and inherited,
+- keeps its own CPU use under a budget (MINER_FIRST_BUDGET, percent of one
+  core, default 2): background intervals are stretched by how far the last
+  minute went over it,
+- stretches background refreshes to IDLE_INTERVAL while no client has made
+  a request for IDLE_AFTER seconds (and no live stream is open), and
+  refreshes right away when one comes back.
+
+Whether or not the mode is on, SelfAccounting samples the tool's own
+/proc/self/stat and XMRig's 60 s hashrate once a minute and splits both
+by whether monitoring was active (clients around) or idle, so
+/api/debug/overhead (or /overhead in the bot) shows what watching the
+miner costs.
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+from miner_api import XMRIG_SUMMARY_URL, fetch_json
+from proc_sampler import read_pid_stat
+
+MINER_FIRST = os.environ.get("MINER_FIRST") == "1"
+CPU_BUDGET = float(os.environ.get("MINER_FIRST_BUDGET", "2.0"))
+IDLE_AFTER = 120.0
+IDLE_INTERVAL = 600.0
+# longest stretch the CPU budget may apply to an interval
+MAX_BUDGET_FACTOR = 10.0
+ACCOUNTING_INTERVAL = 60.0
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+
+def read_self_cpu() -> float:
+    """CPU seconds (user + system) this process has used, from /proc/self/stat."""
+    stat = read_pid_stat("self")  # type: ignore[arg-type]
+    return stat[0] / CLOCK_TICKS if stat else time.process_time()
+
+
+def enter_idle_priority(niceness: int = 19) -> str:
+    """Move the calling thread (and threads it creates later) to SCHED_IDLE, or nice it."""
+    try:
+        os.sched_setscheduler(0, os.SCHED_IDLE, os.sched_param(0))
+        return "SCHED_IDLE"
+    except (AttributeError, OSError):
+        pass
+    try:
+        os.nice(niceness - os.nice(0))
+        return f"nice {os.nice(0)}"
+    except OSError:
+        return "unchanged"
+
+
+def xmrig_hashrate(snapshot_reader=None) -> Optional[float]:
+    """XMRig's 60 s hashrate from the collector snapshot, else its HTTP API."""
+    snap = snapshot_reader.read() if snapshot_reader is not None else None
+    if snap:
+        return snap["xmrig"]["hashrate_60s"] if snap["xmrig"]["ok"] else None
+    data = fetch_json(XMRIG_SUMMARY_URL, timeout=3.0)
+    total = (data or {}).get("hashrate", {}).get("total") or []
+    return total[1] if len(total) > 1 else None
+
+
+class CpuBudget:
+    """Own CPU use over the last `window` seconds against `percent` of one core."""
+
+    def __init__(self, percent: float, window: float = 60.0, read: Callable[[], float] = read_self_cpu,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.percent = percent
+        self.window = window
+        self.read = read
+        self.clock = clock
+        self._mark = (clock(), read())
+        self._usage: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def usage(self) -> Optional[float]:
+        """Percent of one core used over the last completed window."""
+        with self._lock:
+            now = self.clock()
+            if now - self._mark[0] >= self.window:
+                cpu = self.read()
+                self._usage = 100.0 * (cpu - self._mark[1]) / (now - self._mark[0])
+                self._mark = (now, cpu)
+            return self._usage
+
+    def factor(self) -> float:
+        """How much to stretch intervals: 1 within budget, usage / budget above it."""
+        usage = self.usage()
+        if usage is None or usage <= self.percent:
+            return 1.0
+        return min(MAX_BUDGET_FACTOR, usage / self.percent)
+
+
+class SelfAccounting:
+    """Own CPU time and XMRig hashrate, split by active / idle monitoring."""
+
+    def __init__(self, hashrate: Callable[[], Optional[float]], idle: Callable[[], bool],
+                 read: Callable[[], float] = read_self_cpu, clock: Callable[[], float] = time.monotonic) -> None:
+        self.hashrate = hashrate
+        self.idle = idle
+        self.read = read
+        self.clock = clock
+        self.started = clock()
+        self._mark = (self.started, read())
+        # state -> [wall seconds, cpu seconds, hashrate sum, hashrate samples]
+        self.totals: Dict[str, list] = {"active": [0.0, 0.0, 0.0, 0], "idle": [0.0, 0.0, 0.0, 0]}
+        self._lock = threading.Lock()
+
+    def sample(self) -> None:
+        now, cpu = self.clock(), self.read()
+        try:
+            rate = self.hashrate()
+        except Exception:  # noqa: BLE001 - accounting must never take the tool down
+            rate = None
+        with self._lock:
+            (then, last_cpu), self._mark = self._mark, (now, cpu)
+            totals = self.totals["idle" if self.idle() else "active"]
+            totals[0] += now - then
+            totals[1] += cpu - last_cpu
+            if rate:
+                totals[2] += rate
+                totals[3] += 1
+
+    def run(self, stop: threading.Event, interval: float = ACCOUNTING_INTERVAL) -> None:
+        while not stop.wait(interval):
+            self.sample()
+
+    def report(self) -> dict:
+        with self._lock:
+            states = {}
+            for state, (wall, cpu, rate_sum, rate_n) in self.totals.items():
+                states[state] = {
+                    "seconds": round(wall, 1),
+                    "cpu_seconds": round(cpu, 3),
+                    "cpu_percent": round(100.0 * cpu / wall, 3) if wall else None,
+                    "hashrate": round(rate_sum / rate_n, 1) if rate_n else None,
+                    "samples": rate_n,
+                }
+        active, idle = states["active"]["hashrate"], states["idle"]["hashrate"]
+        return {
+            "uptime": round(self.clock() - self.started, 1),
+            "cpu_seconds": round(self.read(), 3),
+            "states": states,
+            # hashrate XMRig loses while the tool is being watched (negative: none measurable)
+            "hashrate_cost": round(idle - active, 1) if active and idle else None,
+        }
+
+
+class MinerFirst:
+    """Priority, CPU budget, idle pacing and self-accounting for one tool."""
+
+    def __init__(self, enabled: bool = MINER_FIRST, budget: float = CPU_BUDGET,
+                 hashrate: Callable[[], Optional[float]] = xmrig_hashrate,
+                 connected: Callable[[], int] = lambda: 0, always: Iterable[str] = (),
+                 idle_after: float = IDLE_AFTER, idle_interval: float = IDLE_INTERVAL,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """`connected()` counts open streams; names in `always` are only budget-paced."""
+        self.enabled = enabled
+        self.policy = "normal"
+        self.budget = CpuBudget(budget, clock=clock) if enabled else None
+        self.connected = connected
+        self.always = frozenset(always)
+        self.idle_after = idle_after
+        self.idle_interval = idle_interval
+        self.clock = clock
+        self.last_request = clock()
+        self.accounting = SelfAccounting(hashrate, lambda: self.idle, clock=clock)
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """Apply the scheduling policy and start accounting; call before other threads start."""
+        if self.enabled:
+            self.policy = enter_idle_priority()
+            print(f"Miner-first mode: {self.policy}, CPU budget {self.budget.percent:g}% of one core")
+        threading.Thread(target=self.accounting.run, args=(self._stop,), name="self-accounting",
+                         daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    @property
+    def idle(self) -> bool:
+        return self.clock() - self.last_request >= self.idle_after and not self.connected()
+
+    def touch(self) -> bool:
+        """Record a client request; True when it ends an idle period (refresh now)."""
+        was_idle = self.idle
+        self.last_request = self.clock()
+        return was_idle and self.enabled
+
+    def pace(self, name: str, interval: float) -> float:
+        """Seconds until source `name`, normally refreshed every `interval`, runs again."""
+        if not self.enabled:
+            return interval
+        if name not in self.always and self.idle:
+            interval = max(interval, self.idle_interval)
+        return interval * self.budget.factor()
+
+    def report(self) -> dict:
+        report = self.accounting.report()
+        report.update({
+            "miner_first": self.enabled,
+            "policy": self.policy,
+            "budget_percent": self.budget.percent if self.budget else None,
+            "budget_usage": None if self.budget is None or self.budget.usage() is None
+            else round(self.budget.usage(), 3),
+            "idle": self.idle,
+        })
+        return report
+
+
+def format_report(report: dict) -> str:
+    """A few lines for the bot / terminal."""
+    lines = [f"Miner-first: {'on' if report['miner_first'] else 'off'} ({report['policy']}), "
+             f"{report['cpu_seconds']:.1f} CPU s in {report['uptime'] / 3600:.1f} h"]
+    for state, stats in report["states"].items():
+        cpu = "n/a" if stats["cpu_percent"] is None else f"{stats['cpu_percent']:.2f}%"
+        rate = "n/a" if stats["hashrate"] is None else f"{stats['hashrate']:.1f} H/s"
+        lines.append(f"{state}: {stats['seconds'] / 60:.0f} min, tool CPU {cpu}, XMRig {rate}")
+    if report["hashrate_cost"] is not None:
+        lines.append(f"XMRig hashrate while watched: {-report['hashrate_cost']:+.1f} H/s vs unwatched")
+    return "\n".join(lines)
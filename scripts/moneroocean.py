@@ -0,0 +1,240 @@
+"""Shared MoneroOcean API client.
+
+Every dashboard view and /status used to open a fresh HTTPS connection (and
+TLS handshake) to api.moneroocean.stream with an 8 s timeout and no backoff,
+so a pool API outage turned each page view into an 8 s stall. This client:
+
+- keeps a small pool of persistent keep-alive connections,
+- rate-limits outgoing calls with a token bucket,
+- caches responses per endpoint for roughly the pool's update cadence and
+  revalidates them with If-None-Match / If-Modified-Since,
+- opens a circuit breaker after repeated failures, serving the last good
+  value until a trial request succeeds again.
+"""
+
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+import urllib.parse
+from typing import Dict, Optional, Tuple
+
+from http_serving import upstream_slot
+from rate_limit import TokenBucket
+
+MONEROOCEAN_API = os.environ.get("MONEROOCEAN_API", "https://api.moneroocean.stream")
+
+# Seconds a cached response is served without asking the pool again. The
+# pool recalculates miner stats about once a minute and network/pool stats
+# less often.
+ENDPOINT_TTLS = (
+    ("/miner/", 60.0),
+    ("/pool/stats", 120.0),
+    ("/network/stats", 120.0),
+)
+DEFAULT_TTL = 60.0
+
+
+def ttl_for(path: str) -> float:
+    for prefix, ttl in ENDPOINT_TTLS:
+        if path.startswith(prefix):
+            return ttl
+    return DEFAULT_TTL
+
+
+class CacheEntry:
+    def __init__(self, data: dict, etag: Optional[str], last_modified: Optional[str]) -> None:
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched = time.monotonic()
+
+
+class CircuitBreaker:
+    """Closed -> open after `threshold` failures; half-open after a cooldown.
+
+    The cooldown doubles on every failed trial, up to `max_cooldown`.
+    """
+
+    def __init__(self, threshold: int = 3, cooldown: float = 30.0, max_cooldown: float = 600.0) -> None:
+        self.threshold = threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.failures = 0
+        self.cooldown = cooldown
+        self.opened_at: Optional[float] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a request may go out now (one trial at a time when half-open)."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def release(self) -> None:
+        """Give back a half-open trial slot that ended without a request."""
+        with self._lock:
+            self._trial = False
+
+    def success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.cooldown = self.base_cooldown
+            self.opened_at = None
+            self._trial = False
+
+    def failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial:
+                self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+                self.opened_at = time.monotonic()
+                self._trial = False
+            elif self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class MoneroOceanClient:
+    """Pooled, cached, rate-limited client with a circuit breaker."""
+
+    def __init__(self, base_url: str = MONEROOCEAN_API, timeout: float = 5.0, pool_size: int = 2,
+                 rate: float = 1.0, burst: float = 5.0) -> None:
+        parts = urllib.parse.urlsplit(base_url)
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker()
+        self._pool: queue.LifoQueue = queue.LifoQueue(maxsize=pool_size)
+        self._cache: Dict[str, CacheEntry] = {}
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "cache_hits": 0, "not_modified": 0, "errors": 0, "short_circuited": 0}
+
+    def _connection(self) -> http.client.HTTPConnection:
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+            return cls(self.host, self.port, timeout=self.timeout)
+
+    def _release(self, conn: http.client.HTTPConnection) -> None:
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _request(self, path: str, entry: Optional[CacheEntry]) -> Tuple[int, dict, Optional[str], Optional[str]]:
+        headers = {"Accept": "application/json", "Connection": "keep-alive"}
+        if entry and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry and entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+
+        conn = self._connection()
+        for attempt in (1, 2):
+            try:
+                conn.request("GET", self.prefix + path, headers=headers)
+                resp = conn.getresponse()
+                body = resp.read()
+                break
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                # the server closed an idle keep-alive connection; retry once fresh
+                conn.close()
+                if attempt == 2:
+                    raise
+            except Exception:
+                conn.close()
+                raise
+        if resp.will_close:
+            conn.close()
+        else:
+            self._release(conn)
+
+        if resp.status == 304:
+            return 304, {}, None, None
+        if resp.status != 200:
+            raise OSError(f"HTTP {resp.status}")
+        return 200, json.loads(body.decode("utf-8")), resp.getheader("ETag"), resp.getheader("Last-Modified")
+
+    def get(self, path: str) -> Tuple[dict, bool]:
+        """Return (data, fresh) for an API path such as '/pool/stats'.
+
+        `fresh` is False when the value is the last good one served because
+        the pool is unreachable, rate limited or the breaker is open. Data is
+        {} if nothing was ever fetched.
+        """
+        entry = self._cache.get(path)
+        if entry and time.monotonic() - entry.fetched < ttl_for(path):
+            self.stats["cache_hits"] += 1
+            return entry.data, True
+
+        stale = (entry.data, False) if entry else ({}, False)
+        if not self.breaker.allow():
+            self.stats["short_circuited"] += 1
+            return stale
+        # with a cached value, never wait for a token: serving it is better
+        if not self.bucket.acquire(timeout=0 if entry else self.timeout):
+            self.breaker.release()
+            return stale
+
+        self.stats["requests"] += 1
+        try:
+            with upstream_slot(self.timeout) as acquired:
+                if not acquired:
+                    self.breaker.release()
+                    return stale
+                status, data, etag, last_modified = self._request(path, entry)
+        except (OSError, http.client.HTTPException, json.JSONDecodeError, ValueError):
+            self.stats["errors"] += 1
+            self.breaker.failure()
+            return stale
+
+        self.breaker.success()
+        with self._lock:
+            if status == 304 and entry:
+                self.stats["not_modified"] += 1
+                entry.fetched = time.monotonic()
+                return entry.data, True
+            self._cache[path] = CacheEntry(data, etag, last_modified)
+        return data, True
+
+    def age(self, path: str) -> Optional[float]:
+        """Seconds since `path` was last fetched or revalidated, or None if never."""
+        entry = self._cache.get(path)
+        return None if entry is None else time.monotonic() - entry.fetched
+
+    def miner_stats(self, wallet: str) -> dict:
+        """/miner/{wallet}/stats: hash, amtDue, amtPaid, ..."""
+        return self.get(f"/miner/{wallet}/stats")[0]
+
+    def pool_stats(self) -> dict:
+        return self.get("/pool/stats")[0]
+
+    def network_stats(self) -> dict:
+        return self.get("/network/stats")[0]
+
+    def status(self) -> dict:
+        """Breaker state and counters, for debug endpoints."""
+        return {"breaker": self.breaker.state, "failures": self.breaker.failures, **self.stats}
+
+
+# One client per process, shared by every caller
+MONEROOCEAN = MoneroOceanClient()
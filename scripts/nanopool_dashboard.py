@@ -1,27 +1,50 @@
 #!/usr/bin/env python3
 """Lightweight Monero mining dashboard server.
 
-Serves a single HTML page on port 8888 that combines:
+Serves a dashboard on port 8888 that combines:
 - Local XMRig miner status and hashrate
 - System CPU / memory utilisation
 - Pool stats from MoneroOcean API
 
+Collectors run in background threads (see stats_cache.py) and requests only
+read the latest snapshot, so a slow pool API never delays the page.
+
+The page itself is a static shell (nanopool_dashboard.html). It polls
+/api/snapshot with If-None-Match and patches only the fields that changed;
+the JSON is rebuilt after a collector refresh and only re-published when a
+displayed value changed, so quiet intervals are answered with a 304.
+
+With MINER_FIRST=1 the server runs under SCHED_IDLE with a CPU budget and
+slows its collectors to a crawl while nobody has the page open (see
+miner_first.py); /api/debug/overhead reports what it costs either way.
+
 All dependencies are from the Python standard library, so the service can be
 managed easily via systemd without extra packages.
 """
 
-from http.server import HTTPServer, BaseHTTPRequestHandler
 import json
 import os
-import subprocess
+import threading
 import time
-import urllib.error
-import urllib.request
+import urllib.parse
+from html import escape
 from pathlib import Path
-
-# Path to the miner configuration file
-dapp_root = Path("/home/dappy")
-MONERO_CONFIG = dapp_root / "monero-mining" / "config.json"
+from typing import Callable, Tuple
+
+from earnings import EarningsProjector, format_payout, format_projection
+from fleet import FleetPoller, format_fleet_line, load_rigs
+from history import DEFAULT_INTERVAL as HISTORY_INTERVAL, HashrateHistory, parse_summary
+from hugepages import HugePagesAuditor, format_readiness, summarize
+from http_serving import KeepAliveHandler, PooledHTTPServer, PreparedBody, StaticPage, serve_until_signalled
+from miner_api import XMRIG_SUMMARY_URL, fetch_json, read_rx_affinity, read_wallet
+from miner_first import MinerFirst, xmrig_hashrate
+from moneroocean import MONEROOCEAN
+from proc_sampler import ProcSampler, detect_gpu, human_kb, read_cpu_temp
+from process_tracker import ProcessTracker, format_uptime
+from shm_snapshot import SnapshotReader, as_earnings, as_fleet, as_hugepages, as_pool_stats, as_xmrig_summary
+from stats_cache import StatsCache
+from thread_analysis import alert_text, analyze_threads, heatmap
+from timings import PROFILING_ENABLED, TIMINGS, run_profile
 
 # Default value in case config cannot be read
 MONERO_WALLET = ""
@@ -30,92 +53,46 @@ MONERO_WALLET = ""
 def load_wallet() -> None:
     """Load Monero wallet from the miner config."""
     global MONERO_WALLET
-
-    if MONERO_CONFIG.exists():
-        try:
-            with MONERO_CONFIG.open("r", encoding="utf-8") as fh:
-                data = json.load(fh)
-            pools = data.get("pools", [])
-            if pools:
-                MONERO_WALLET = pools[0].get("user", "")
-        except (json.JSONDecodeError, OSError):
-            MONERO_WALLET = ""
+    MONERO_WALLET = read_wallet()
 
 
 load_wallet()
 
 
-def fetch_json(url: str, timeout: float = 8.0) -> dict:
-    """Return decoded JSON from a URL or {} on failure."""
-    try:
-        req = urllib.request.Request(url)
-        # Add access token for XMRig API
-        if "127.0.0.1:3001" in url:
-            req.add_header("Authorization", "Bearer mining-dashboard")
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            text = resp.read().decode("utf-8")
-        return json.loads(text)
-    except (urllib.error.URLError, urllib.error.HTTPError, json.JSONDecodeError, TimeoutError):
-        return {}
+SAMPLER = ProcSampler()
+TRACKER = ProcessTracker()
+# Snapshot published by collector.py; every collector below prefers it and
+# only polls upstream itself when the collector is not running.
+SNAPSHOT = SnapshotReader()
+# Fleet mode: only when rigs.json lists rigs
+FLEET_RIGS = load_rigs()
+FLEET = FleetPoller(FLEET_RIGS) if FLEET_RIGS else None
+# Priority, CPU budget and idle pacing when MINER_FIRST=1; self-accounting always
+MINER = MinerFirst(hashrate=lambda: xmrig_hashrate(SNAPSHOT))
 
 
 def get_system_stats() -> dict:
     """Return CPU and memory utilisation as simple strings."""
-    cpu_usage = subprocess.getoutput(
-        "top -bn1 | grep 'Cpu(s)' | sed 's/.*, *\\([0-9.]*\\)%* id.*/\\1/' | awk '{print 100 - $1}'"
-    ).strip()
-    if cpu_usage:
-        try:
-            cpu_usage = f"{float(cpu_usage):.1f}%"
-        except ValueError:
-            cpu_usage = f"{cpu_usage}%"
-    else:
-        cpu_usage = "N/A"
-
-    mem_line = subprocess.getoutput("free -h | grep Mem").split()
-    mem_percent = subprocess.getoutput("free | grep Mem | awk '{printf \"%.1f\", $3/$2 * 100.0}'").strip()
-    if len(mem_line) >= 3:
-        mem_used, mem_total = mem_line[2], mem_line[1]
+    with TIMINGS.stage("system.snapshot"):
+        snap = SNAPSHOT.read()
+    if snap:
+        host = snap["host"]
+        system = {
+            "cpu_percent": host["cpu_percent"] or 0.0,
+            "mem_used_kb": host["mem_used_kb"],
+            "mem_total_kb": host["mem_total_kb"],
+            "mem_percent": 100.0 * host["mem_used_kb"] / host["mem_total_kb"] if host["mem_total_kb"] else 0.0,
+        }
     else:
-        mem_used, mem_total = "N/A", "N/A"
-    if mem_percent:
-        mem_percent = f"{mem_percent}%"
-    else:
-        mem_percent = "N/A"
-
-    # Detect GPU
-    gpu_detected = False
-    gpu_info = "No GPU detected"
-    
-    # Check for NVIDIA GPU
-    nvidia_check = subprocess.getoutput("which nvidia-smi 2>/dev/null")
-    if nvidia_check:
-        nvidia_gpu = subprocess.getoutput("nvidia-smi --query-gpu=name --format=csv,noheader 2>/dev/null")
-        if nvidia_gpu and "NVIDIA" in nvidia_gpu:
-            gpu_detected = True
-            gpu_info = nvidia_gpu.strip()
-    
-    # Check for AMD GPU via lspci
-    if not gpu_detected:
-        amd_check = subprocess.getoutput("lspci | grep -i 'vga\\|3d\\|display' | grep -i 'amd\\|radeon' 2>/dev/null")
-        if amd_check:
-            gpu_detected = True
-            gpu_info = "AMD GPU detected"
-    
-    # Fallback: check any GPU via lspci
-    if not gpu_detected:
-        any_gpu = subprocess.getoutput("lspci | grep -i 'vga\\|3d\\|display' 2>/dev/null")
-        if any_gpu:
-            # Extract first GPU line
-            first_line = any_gpu.split('\n')[0] if any_gpu else ""
-            if "Intel" not in first_line or "AMD" in any_gpu or "NVIDIA" in any_gpu:
-                gpu_info = "Integrated GPU (CPU mining only)"
-
+        with TIMINGS.stage("system.proc"):
+            system = SAMPLER.system()
+    with TIMINGS.stage("system.gpu"):
+        gpu_detected, gpu_info = detect_gpu()
     return {
-        "cpu_usage": cpu_usage,
-        "mem_used": mem_used,
-        "mem_total": mem_total,
-        "mem_percent": mem_percent,
+        "cpu_usage": f"{system['cpu_percent']:.1f}%",
+        "mem_used": human_kb(system["mem_used_kb"]),
+        "mem_total": human_kb(system["mem_total_kb"]),
+        "mem_percent": f"{system['mem_percent']:.1f}%",
         "gpu_detected": gpu_detected,
         "gpu_info": gpu_info,
     }
@@ -123,15 +100,39 @@ def get_system_stats() -> dict:
 
 def get_process_snapshot(name: str) -> dict:
     """Return basic process info (running flag, CPU%, MEM%)."""
-    snapshot = {"running": False, "cpu": "0", "mem": "0"}
-    output = subprocess.getoutput(f"ps aux | grep '{name}' | grep -v grep | sort -k3 -nr | head -1")
-    if output:
-        parts = output.split()
-        if len(parts) >= 11:
-            snapshot["running"] = True
-            snapshot["cpu"] = parts[2]  # %CPU
-            snapshot["mem"] = parts[3]  # %MEM
-    return snapshot
+    with TIMINGS.stage("process.snapshot"):
+        snap = SNAPSHOT.read()
+    if snap and f"{name}_proc" in snap:
+        proc = dict(snap[f"{name}_proc"])
+        mem_total = snap["host"]["mem_total_kb"]
+        proc["cpu_percent"] = proc["cpu_percent"] or 0.0
+        proc["mem_percent"] = 100.0 * proc["rss_kb"] / mem_total if mem_total else 0.0
+    else:
+        with TIMINGS.stage("process.tracker"):
+            pids = TRACKER.pids()
+        with TIMINGS.stage("process.proc"):
+            proc = SAMPLER.processes(pids).get(name)
+    if not proc:
+        return {"running": False, "cpu": "0", "mem": "0"}
+    return {
+        "running": proc["running"],
+        "cpu": f"{proc['cpu_percent']:.1f}",
+        "mem": f"{proc['mem_percent']:.1f}",
+    }
+
+
+HUGEPAGES = HugePagesAuditor()
+
+
+def get_hugepages() -> dict:
+    """Huge-pages readiness from the collector, or audited here."""
+    with TIMINGS.stage("hugepages.snapshot"):
+        snap = SNAPSHOT.read()
+    hugepages = as_hugepages(snap) if snap else None
+    if hugepages is None:
+        with TIMINGS.stage("hugepages.audit"):
+            hugepages = summarize(HUGEPAGES.audit(TRACKER.poll()["xmrig"]))
+    return hugepages
 
 
 def get_monero_pool_stats() -> dict:
@@ -139,8 +140,16 @@ def get_monero_pool_stats() -> dict:
     if not MONERO_WALLET:
         return {"wallet": "Not set", "hashrate": "N/A", "balance": "0", "paid": "0", "workers": "0", "pool": "N/A"}
 
-    # Try XMRig API first for local hashrate
-    xmrig_data = fetch_json("http://127.0.0.1:3001/1/summary")
+    with TIMINGS.stage("pool.snapshot"):
+        snap = SNAPSHOT.read()
+    if snap:
+        xmrig_data, stats = as_xmrig_summary(snap), as_pool_stats(snap)
+    else:
+        # Try XMRig API first for local hashrate
+        with TIMINGS.stage("pool.xmrig_api"):
+            xmrig_data = fetch_json(XMRIG_SUMMARY_URL)
+        with TIMINGS.stage("pool.moneroocean"):
+            stats = MONEROOCEAN.miner_stats(MONERO_WALLET)
     local_hashrate = "0"
     workers = "1"
     pool_name = "MoneroOcean"
@@ -157,8 +166,7 @@ def get_monero_pool_stats() -> dict:
         if "moneroocean" in pool_url.lower():
             pool_name = "MoneroOcean"
 
-    # Get pool stats from MoneroOcean API
-    stats = fetch_json(f"https://api.moneroocean.stream/miner/{MONERO_WALLET}/stats")
+    # Pool stats from MoneroOcean API
     pool_hashrate = local_hashrate  # Default to local
     balance = "0"
     paid = "0"
@@ -183,286 +191,371 @@ def get_monero_pool_stats() -> dict:
     }
 
 
-class DashboardHandler(BaseHTTPRequestHandler):
-    def do_GET(self):  # noqa: N802
-        stats = get_system_stats()
-        monero = get_monero_pool_stats()
-        xmrig_proc = get_process_snapshot("xmrig")
-
-        monero_status = "🟢 ONLINE" if xmrig_proc["running"] else "🔴 OFFLINE"
-
-        try:
-            balance_xmr = float(monero["balance"])
-        except ValueError:
-            balance_xmr = 0.0
-        try:
-            paid_xmr = float(monero["paid"])
-        except ValueError:
-            paid_xmr = 0.0
-        try:
-            hashrate_float = float(monero["hashrate"])
-        except ValueError:
-            hashrate_float = 0.0
-
-        timestamp = time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime())
-
-        html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>⚡ ELITE MONERO MINING CENTER ⚡</title>
-            <meta charset="utf-8" />
-            <meta name="viewport" content="width=device-width, initial-scale=1.0" />
-            <style>
-                * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-                body {{ 
-                    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; 
-                    background: linear-gradient(135deg, #0078D4 0%, #0063B1 25%, #004B8D 50%, #003666 75%, #002952 100%);
-                    background-attachment: fixed;
-                    color: #fff; 
-                    padding: 20px;
-                    min-height: 100vh;
-                }}
-                .container {{ 
-                    max-width: 1200px; 
-                    margin: 0 auto; 
-                }}
-                .header {{
-                    background: rgba(255, 255, 255, 0.1);
-                    backdrop-filter: blur(10px);
-                    border-radius: 15px;
-                    padding: 25px 35px;
-                    margin-bottom: 25px;
-                    box-shadow: 0 8px 32px rgba(0, 0, 0, 0.3);
-                    border: 1px solid rgba(255, 255, 255, 0.18);
-                }}
-                h1 {{ 
-                    font-size: 2.5em; 
-                    font-weight: 300; 
-                    letter-spacing: 2px;
-                    text-shadow: 2px 2px 4px rgba(0, 0, 0, 0.5);
-                    margin-bottom: 8px;
-                }}
-                .subtitle {{
-                    font-size: 1.1em;
-                    color: #E1F5FF;
-                    font-weight: 300;
-                    opacity: 0.9;
-                }}
-                .grid {{ 
-                    display: grid; 
-                    grid-template-columns: repeat(auto-fit, minmax(350px, 1fr)); 
-                    gap: 20px; 
-                    margin-bottom: 20px;
-                }}
-                .card {{ 
-                    background: rgba(255, 255, 255, 0.12); 
-                    backdrop-filter: blur(10px);
-                    border: 1px solid rgba(255, 255, 255, 0.2); 
-                    border-radius: 15px; 
-                    padding: 25px; 
-                    box-shadow: 0 8px 32px rgba(0, 0, 0, 0.3);
-                    transition: transform 0.2s ease, box-shadow 0.2s ease;
-                }}
-                .card:hover {{
-                    transform: translateY(-5px);
-                    box-shadow: 0 12px 40px rgba(0, 0, 0, 0.4);
-                }}
-                .card.xmr {{ 
-                    border-left: 4px solid #FF6B35;
-                }}
-                .card.system {{
-                    border-left: 4px solid #4FC3F7;
-                }}
-                .card-header {{
-                    display: flex;
-                    align-items: center;
-                    margin-bottom: 20px;
-                    padding-bottom: 15px;
-                    border-bottom: 1px solid rgba(255, 255, 255, 0.2);
-                }}
-                .card-icon {{
-                    font-size: 2.5em;
-                    margin-right: 15px;
-                }}
-                h2 {{ 
-                    font-size: 1.4em; 
-                    font-weight: 400;
-                }}
-                .status-badge {{
-                    display: inline-block;
-                    padding: 8px 16px;
-                    border-radius: 20px;
-                    font-size: 0.9em;
-                    font-weight: 600;
-                    margin: 10px 0;
-                    box-shadow: 0 2px 8px rgba(0, 0, 0, 0.2);
-                }}
-                .status-online {{
-                    background: linear-gradient(135deg, #4CAF50, #45A049);
-                }}
-                .status-offline {{
-                    background: linear-gradient(135deg, #F44336, #D32F2F);
-                }}
-                .stat-row {{
-                    display: flex;
-                    justify-content: space-between;
-                    align-items: center;
-                    padding: 12px 0;
-                    border-bottom: 1px solid rgba(255, 255, 255, 0.1);
-                }}
-                .stat-row:last-child {{
-                    border-bottom: none;
-                }}
-                .label {{ 
-                    text-transform: uppercase; 
-                    font-size: 0.75em; 
-                    letter-spacing: 1.5px; 
-                    color: #B3E5FC;
-                    font-weight: 600;
-                }}
-                .value {{ 
-                    font-size: 1.3em; 
-                    font-weight: 600;
-                    color: #FFFFFF;
-                    text-align: right;
-                }}
-                .value-large {{
-                    font-size: 2em;
-                    font-weight: 300;
-                    color: #FFF;
-                    text-shadow: 1px 1px 2px rgba(0, 0, 0, 0.3);
-                }}
-                .wallet-address {{
-                    font-family: 'Courier New', monospace;
-                    font-size: 0.75em;
-                    background: rgba(0, 0, 0, 0.3);
-                    padding: 8px;
-                    border-radius: 5px;
-                    word-break: break-all;
-                    margin: 8px 0;
-                }}
-                footer {{ 
-                    text-align: center; 
-                    margin-top: 25px;
-                    padding: 20px;
-                    background: rgba(255, 255, 255, 0.08);
-                    backdrop-filter: blur(10px);
-                    border-radius: 15px;
-                    color: #E1F5FF;
-                    font-size: 0.9em;
-                    border: 1px solid rgba(255, 255, 255, 0.15);
-                }}
-                .pulse {{
-                    animation: pulse 2s infinite;
-                }}
-                @keyframes pulse {{
-                    0%, 100% {{ opacity: 1; }}
-                    50% {{ opacity: 0.7; }}
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>⚡ ELITE MONERO MINING CENTER ⚡</h1>
-                    <div class="subtitle">High-Performance CPU Mining Dashboard</div>
-                </div>
-
+def get_fleet_stats() -> dict:
+    """Per-rig and total hashrate / shares / uptime across the fleet."""
+    snap = SNAPSHOT.read()
+    fleet = as_fleet(snap) if snap else None
+    if fleet:
+        return fleet
+    with TIMINGS.stage("fleet.poll"):
+        return FLEET.poll()
+
+
+def render_fleet(fleet: dict, age: str) -> str:
+    """Fleet card: totals plus one row per rig, down rigs first."""
+    if not fleet or not fleet["count"]:
+        return ""
+    rows = []
+    for rig in sorted(fleet["rigs"], key=lambda r: (r["ok"], r["name"])):
+        if rig["ok"]:
+            state = f"{rig['hashrate_10s']:.1f} H/s • {rig['shares_good']}/{rig['shares_total']} shares • up {format_uptime(rig['uptime'])}"
+        else:
+            state = f"🔴 DOWN ({rig['error']})"
+        rows.append(f"""
+                        <div class="stat-row">
+                            <div class="label">{escape(rig['name'])}</div>
+                            <div class="value" style="font-size: 0.85em;">{state}</div>
+                        </div>""")
+    return f"""
                 <div class="grid">
                     <div class="card xmr">
                         <div class="card-header">
-                            <div class="card-icon">🔷</div>
-                            <h2>Monero Miner (XMRig)</h2>
-                        </div>
-                        <div class="status-badge {'status-online' if xmrig_proc['running'] else 'status-offline'} pulse">
-                            {monero_status}
-                        </div>
-                        <div class="stat-row">
-                            <div class="label">Hashrate (10s avg)</div>
-                            <div class="value-large">{monero['hashrate']} H/s</div>
-                        </div>
-                        <div class="stat-row">
-                            <div class="label">Active Threads</div>
-                            <div class="value">{monero.get('workers', '0')} / 8</div>
-                        </div>
-                        <div class="stat-row">
-                            <div class="label">CPU Usage</div>
-                            <div class="value">{xmrig_proc['cpu']}%</div>
-                        </div>
-                        <div class="stat-row">
-                            <div class="label">Memory Usage</div>
-                            <div class="value">{xmrig_proc['mem']}%</div>
-                        </div>
-                        <div class="stat-row">
-                            <div class="label">Mining Pool</div>
-                            <div class="value" style="font-size: 0.9em;">{monero.get('pool', 'MoneroOcean')}</div>
-                        </div>
-                        <div class="stat-row">
-                            <div class="label">Balance</div>
-                            <div class="value">{balance_xmr:.6f} XMR</div>
+                            <div class="card-icon">🖧</div>
+                            <h2>Fleet</h2>
+                            <div class="age">{age}</div>
                         </div>
                         <div class="stat-row">
-                            <div class="label">Total Paid</div>
-                            <div class="value">{paid_xmr:.6f} XMR</div>
+                            <div class="label">Total Hashrate</div>
+                            <div class="value-large">{format_fleet_line(fleet)}</div>
                         </div>
                         <div class="stat-row">
-                            <div class="label">Payout Minimum</div>
-                            <div class="value" style="font-size: 0.9em;">0.003 XMR</div>
-                        </div>
-                        <div class="label" style="margin-top: 15px;">Wallet Address</div>
-                        <div class="wallet-address">{monero['wallet'] or 'Not configured'}</div>
+                            <div class="label">Shares</div>
+                            <div class="value">{fleet['shares_good']} / {fleet['shares_total']}</div>
+                        </div>{''.join(rows)}
                     </div>
+                </div>
+"""
+
+
+HISTORY = HashrateHistory(interval=HISTORY_INTERVAL)
 
+# Most points a single /api/history response may contain
+HISTORY_MAX_POINTS = 2000
+
+
+_last_sample = {"xmrig_updated_at": None}
+
+
+def record_history() -> dict:
+    """Sample XMRig's summary into the hashrate history ring buffer."""
+    snap = SNAPSHOT.read()
+    if snap:
+        # the collector refreshes XMRig on its own schedule; skip repeats
+        if snap["xmrig"]["updated_at"] == _last_sample["xmrig_updated_at"]:
+            return {"samples": HISTORY.count}
+        _last_sample["xmrig_updated_at"] = snap["xmrig"]["updated_at"]
+        summary, cpu_temp = as_xmrig_summary(snap), snap["host"]["cpu_temp"]
+    else:
+        with TIMINGS.stage("history.xmrig_api"):
+            summary = fetch_json(XMRIG_SUMMARY_URL, timeout=HISTORY_INTERVAL)
+        cpu_temp = read_cpu_temp()
+    parsed = parse_summary(summary)
+    if parsed:
+        hashrate, threads, accepted, rejected = parsed
+        HISTORY.append(time.time(), hashrate, threads, accepted, rejected, cpu_temp)
+    return {"samples": HISTORY.count}
+
+
+def history_query(params: dict) -> dict:
+    """Resolve from/to/step query parameters and downsample the history."""
+    now = time.time()
+    end = float(params.get("to", [now])[0])
+    start = float(params.get("from", [end - 3600])[0])
+    if start >= end:
+        raise ValueError("'from' must be before 'to'")
+    default_step = max(HISTORY_INTERVAL, (end - start) / 500)
+    step = float(params.get("step", [default_step])[0])
+    # keep responses bounded whatever the caller asks for
+    step = max(step, HISTORY_INTERVAL, (end - start) / HISTORY_MAX_POINTS)
+    return HISTORY.downsample(start, end, step)
+
+
+EARNINGS = EarningsProjector(HISTORY)
+
+
+def get_earnings() -> dict:
+    """Earnings projection from the collector, or from this dashboard's history."""
+    snap = SNAPSHOT.read()
+    earnings = as_earnings(snap) if snap else None
+    if earnings is None:
+        with TIMINGS.stage("earnings.project"):
+            monero = STATS.get("monero")
+            earnings = EARNINGS.project(_to_float(monero["balance"]), _to_float(monero["hashrate"]) or None)
+    return earnings
+
+
+# Window and resolution of the per-thread analysis shown on the page
+THREAD_WINDOW = 3600.0
+THREAD_HEATMAP_BUCKETS = 60
+THREAD_AFFINITY = read_rx_affinity()
+
+
+def thread_query(params: dict) -> dict:
+    """Per-thread statistics and heatmap for from/to/step query parameters."""
+    end = float(params.get("to", [time.time()])[0])
+    start = float(params.get("from", [end - THREAD_WINDOW])[0])
+    if start >= end:
+        raise ValueError("'from' must be before 'to'")
+    step = float(params.get("step", [(end - start) / THREAD_HEATMAP_BUCKETS])[0])
+    step = max(step, HISTORY_INTERVAL, (end - start) / HISTORY_MAX_POINTS)
+    analysis = analyze_threads(HISTORY, start, end, THREAD_AFFINITY)
+    analysis["alert"] = alert_text(analysis)
+    analysis["heatmap"] = heatmap(HISTORY, start, end, step)
+    return analysis
+
+
+def get_thread_analysis() -> dict:
+    """Analyse the last hour for the heatmap card.
+
+    Alerting on underperforming threads is done by the collector, which
+    publishes threads.alert for the alert rules (alert_rules.py).
+    """
+    return thread_query({})
+
+
+def render_threads(analysis: dict) -> str:
+    """Per-core heatmap card; cells are shaded by hashrate relative to the median thread."""
+    if not analysis.get("threads"):
+        return ""
+    relative = analysis["heatmap"]["relative"]
+    rows = []
+    for s in analysis["threads"]:
+        cells = []
+        for value in relative[s["thread"]]:
+            if value is None:
+                cells.append('<td style="background: rgba(0,0,0,0.2);"></td>')
+                continue
+            # 100% and above is green, 80% and below fully red
+            shortfall = min(1.0, max(0.0, (1.0 - value) / 0.2))
+            color = f"rgb({int(76 + 168 * shortfall)}, {int(175 - 108 * shortfall)}, {int(80 - 26 * shortfall)})"
+            cells.append(f'<td title="{value * 100:.0f}%" style="background: {color};"></td>')
+        cpu = f" / cpu {s['cpu']}" if s["cpu"] is not None else ""
+        mark = " ⚠️" if s["flagged"] else ""
+        rows.append(f"""
+                            <tr><th class="label" style="text-align: left; padding-right: 10px;">T{s['thread']}{cpu}{mark}</th>{''.join(cells)}
+                                <td class="value" style="font-size: 0.8em; padding-left: 10px;">{s['mean']:.1f} H/s</td></tr>""")
+    alert = analysis.get("alert")
+    banner = f'<div class="status-badge status-offline">⚠️ {alert}</div>' if alert else ""
+    return f"""
+                <div class="grid">
                     <div class="card system">
                         <div class="card-header">
-                            <div class="card-icon">⚙️</div>
-                            <h2>System Resources</h2>
-                        </div>
-                        <div class="stat-row">
-                            <div class="label">Total CPU Usage</div>
-                            <div class="value-large">{stats['cpu_usage']}</div>
-                        </div>
-                        <div class="stat-row">
-                            <div class="label">Memory Usage</div>
-                            <div class="value">{stats['mem_percent']}</div>
-                        </div>
-                        <div class="stat-row">
-                            <div class="label">Memory Details</div>
-                            <div class="value">{stats['mem_used']} / {stats['mem_total']}</div>
-                        </div>
-                        <div class="stat-row">
-                            <div class="label">GPU Hardware</div>
-                            <div class="value" style="font-size: 0.85em;">{'✅ ' + stats['gpu_info'] if stats.get('gpu_detected') else '❌ ' + stats['gpu_info']}</div>
-                        </div>
-                        <div class="stat-row">
-                            <div class="label">Hostname</div>
-                            <div class="value">{os.uname().nodename}</div>
-                        </div>
-                        <div class="stat-row">
-                            <div class="label">Platform</div>
-                            <div class="value">Linux</div>
+                            <div class="card-icon">🌡️</div>
+                            <h2>Per-Thread Hashrate (last hour)</h2>
+                            <div class="age">{analysis['samples']} samples</div>
                         </div>
+                        {banner}
+                        <table style="width: 100%; border-collapse: collapse; table-layout: auto;">{''.join(rows)}
+                        </table>
                     </div>
                 </div>
+"""
 
-                <footer>
-                    <div>🔄 Last updated: {timestamp}</div>
-                    <div style="margin-top: 8px; opacity: 0.8;">
-                        Auto-refresh every 30 seconds • Pool: MoneroOcean (0% fee, 0.003 XMR minimum)
-                    </div>
-                </footer>
-            </div>
-            <script>setTimeout(() => window.location.reload(), 30000);</script>
-        </body>
-        </html>
-        """
-
-        self.send_response(200)
-        self.send_header("Content-Type", "text/html")
-        self.send_header("Cache-Control", "no-store, must-revalidate")
-        self.end_headers()
-        self.wfile.write(html.encode("utf-8"))
+
+# Refresh interval (seconds) of each background source. The pool API only
+# updates about once a minute, so polling it faster is wasted work.
+REFRESH_INTERVALS = {
+    "system": 5.0,
+    "xmrig_proc": 5.0,
+    "monero": 30.0,
+    "history": HISTORY_INTERVAL,
+    "fleet": 5.0,
+    "threads": 60.0,
+    "hugepages": 30.0,
+    "earnings": 60.0,
+}
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def page_fields() -> dict:
+    """Everything the page shows, formatted, keyed by the shell's data-field names."""
+    stats = STATS.get("system")
+    monero = STATS.get("monero")
+    xmrig_proc = STATS.get("xmrig_proc")
+    hugepages = STATS.get("hugepages")
+    earnings = STATS.get("earnings")
+    gpu_mark = "✅ " if stats.get("gpu_detected") else "❌ "
+    return {
+        "miner_running": xmrig_proc["running"],
+        "miner_status": "🟢 ONLINE" if xmrig_proc["running"] else "🔴 OFFLINE",
+        "hashrate": f"{monero['hashrate']} H/s",
+        "workers": f"{monero.get('workers', '0')} / 8",
+        "miner_cpu": f"{xmrig_proc['cpu']}%",
+        "miner_mem": f"{xmrig_proc['mem']}%",
+        "pool": monero.get("pool", "MoneroOcean"),
+        "balance": f"{_to_float(monero['balance']):.6f} XMR",
+        "paid": f"{_to_float(monero['paid']):.6f} XMR",
+        "earnings": format_projection(earnings),
+        "payout_eta": format_payout(earnings),
+        "wallet": monero["wallet"] or "Not configured",
+        "cpu_usage": stats["cpu_usage"],
+        "mem_percent": stats["mem_percent"],
+        "mem_details": f"{stats['mem_used']} / {stats['mem_total']}",
+        "gpu": gpu_mark + stats["gpu_info"],
+        "hugepages": format_readiness(hugepages) if hugepages else "N/A",
+        "hugepages_note": (hugepages.get("alert") or hugepages.get("problem")) if hugepages else "",
+        "hostname": os.uname().nodename,
+        "threads_html": render_threads(STATS.get("threads")),
+        # the shell keeps data-age elements ticking client-side
+        "fleet_html": render_fleet(STATS.get("fleet"), '<span data-age="fleet"></span>') if FLEET else "",
+    }
+
+
+def page_sources() -> dict:
+    """Wall-clock refresh time and last error of each source, for the page's age labels."""
+    now = time.time()
+    return {
+        name: {"updated_at": round(now - status["age"], 3) if status["age"] is not None else None,
+               "error": status["error"]}
+        for name, status in STATS.status().items()
+    }
+
+
+class PageSnapshot:
+    """The page's fields as prepared JSON, re-published only when they change.
+
+    `version` counts publications. The ETag comes from PreparedBody, so a
+    client polling with a current If-None-Match gets a bodiless 304.
+    Refresh times alone do not count as a change: the page works out ages
+    from the `updated_at` of the last published version.
+    """
+
+    HEADERS = {"Cache-Control": "no-cache"}
+
+    def __init__(self, build: Callable[[], Tuple[dict, dict]]) -> None:
+        self.build = build
+        self.version = 0
+        self._key = None
+        self._lock = threading.Lock()
+        self.body = PreparedBody(b'{"version": 0, "fields": {}, "sources": {}}', "application/json", self.HEADERS)
+
+    def update(self) -> bool:
+        """Rebuild the fields; publish a new version if anything visible changed."""
+        # built under the lock so a slower refresher can never publish older values
+        with self._lock, TIMINGS.stage("snapshot.publish"):
+            fields, sources = self.build()
+            key = (fields, {name: source["error"] for name, source in sources.items()})
+            if key == self._key:
+                return False
+            self._key = key
+            self.version += 1
+            payload = {"version": self.version, "generated_at": time.time(), "fields": fields, "sources": sources}
+            self.body = PreparedBody(json.dumps(payload).encode("utf-8"), "application/json", self.HEADERS)
+            return True
+
+
+PAGE = StaticPage(Path(__file__).with_suffix(".html"), headers={"Cache-Control": "no-cache"})
+PAGE_SNAPSHOT = PageSnapshot(lambda: (page_fields(), page_sources()))
+
+
+def on_refresh(name: str, entry) -> None:  # noqa: ANN001 - stats_cache.Entry
+    """StatsCache hook: the history sampler feeds no page field."""
+    if name != "history":
+        PAGE_SNAPSHOT.update()
+
+
+STATS = StatsCache(on_refresh=on_refresh, pace=MINER.pace)
+
+
+def register_sources(cache: StatsCache) -> None:
+    """Register the dashboard collectors with the background cache."""
+    cache.register(
+        "system",
+        get_system_stats,
+        REFRESH_INTERVALS["system"],
+        default={
+            "cpu_usage": "N/A",
+            "mem_used": "N/A",
+            "mem_total": "N/A",
+            "mem_percent": "N/A",
+            "gpu_detected": False,
+            "gpu_info": "N/A",
+        },
+    )
+    cache.register(
+        "xmrig_proc",
+        lambda: get_process_snapshot("xmrig"),
+        REFRESH_INTERVALS["xmrig_proc"],
+        default={"running": False, "cpu": "0", "mem": "0"},
+    )
+    cache.register(
+        "monero",
+        get_monero_pool_stats,
+        REFRESH_INTERVALS["monero"],
+        default={"wallet": MONERO_WALLET, "hashrate": "N/A", "balance": "0", "paid": "0", "workers": "0", "pool": "N/A"},
+    )
+    cache.register("history", record_history, REFRESH_INTERVALS["history"], default={"samples": 0})
+    cache.register("threads", get_thread_analysis, REFRESH_INTERVALS["threads"], default={"threads": []})
+    cache.register("hugepages", get_hugepages, REFRESH_INTERVALS["hugepages"], default={})
+    cache.register("earnings", get_earnings, REFRESH_INTERVALS["earnings"], default={"ok": False})
+    if FLEET:
+        cache.register("fleet", get_fleet_stats, REFRESH_INTERVALS["fleet"], default={"count": 0, "rigs": []})
+
+
+class DashboardHandler(KeepAliveHandler):
+    def send_json(self, payload: dict, status: int = 200) -> None:
+        self.send_body(status, "application/json", json.dumps(payload).encode("utf-8"),
+                       {"Cache-Control": "no-store"})
+
+    def do_GET(self):  # noqa: N802
+        url = urllib.parse.urlsplit(self.path)
+        if MINER.touch():
+            # back from idle: the collectors were slowed down, catch up now
+            STATS.wake()
+        if url.path == "/api/history":
+            try:
+                self.send_json(history_query(urllib.parse.parse_qs(url.query)))
+            except ValueError as exc:
+                self.send_json({"error": str(exc)}, 400)
+            return
+        if url.path == "/api/debug/timings":
+            self.send_json({"stages": TIMINGS.summary(), "sources": STATS.status()})
+            return
+        if url.path == "/api/debug/overhead":
+            self.send_json(MINER.report())
+            return
+        if url.path == "/api/debug/profile" and PROFILING_ENABLED:
+            targets = {name: (lambda name=name: STATS.refresh(name)) for name in STATS.status()}
+            try:
+                report = run_profile(urllib.parse.parse_qs(url.query), targets)
+            except ValueError as exc:
+                self.send_json({"error": str(exc)}, 400)
+                return
+            if report is None:
+                self.send_json({"error": "a profile is already running"}, 409)
+                return
+            self.send_body(200, "text/plain; charset=utf-8", report.encode("utf-8"), {"Cache-Control": "no-store"})
+            return
+        if url.path == "/api/threads":
+            try:
+                self.send_json(thread_query(urllib.parse.parse_qs(url.query)))
+            except ValueError as exc:
+                self.send_json({"error": str(exc)}, 400)
+            return
+
+        if url.path == "/api/snapshot":
+            # a prepared body swap, so a 304 costs no collector or JSON work
+            self.send_prepared(PAGE_SNAPSHOT.body)
+            return
+        if url.path == "/":
+            self.send_prepared(PAGE.current())
+            return
+        self.send_json({"error": "not found"}, 404)
 
     def log_message(self, format: str, *args) -> None:  # noqa: D401, ANN001
         """Silence default request logging to keep logs clean."""
@@ -472,9 +565,17 @@ class DashboardHandler(BaseHTTPRequestHandler):
 def main() -> None:
     host = "0.0.0.0"
     port = 8888
-    httpd = HTTPServer((host, port), DashboardHandler)
+    register_sources(STATS)
+    # before any thread starts: they inherit the scheduling policy
+    MINER.start()
+    STATS.start()
+    httpd = PooledHTTPServer((host, port), DashboardHandler)
     print(f"Dashboard running on http://{host}:{port}")
-    httpd.serve_forever()
+    try:
+        serve_until_signalled(httpd)
+    finally:
+        STATS.stop()
+        MINER.stop()
 
 
 if __name__ == "__main__":
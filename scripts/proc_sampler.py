@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""Pure-Python system sampler built on /proc and /sys.
+
+Replaces the `top`, `free`, `ps` and `lspci` pipelines the dashboards used to
+fork on every refresh. Each of those subprocesses competes with the XMRig
+threads pinned to every core, while reading a handful of /proc files costs a
+few hundred microseconds and forks nothing.
+
+CPU percentages are computed from the jiffy deltas between two calls, so the
+first call after construction reports 0.0.
+
+Run directly for a one-off reading, or with --bench to measure the cost per
+sample:
+
+    python3 scripts/proc_sampler.py --bench 2000
+"""
+
+import argparse
+import functools
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Processes the mining tools care about, matched against /proc/<pid>/comm.
+MINING_PROCESSES = ("xmrig", "monerod", "p2pool")
+
+PAGE_SIZE_KB = os.sysconf("SC_PAGE_SIZE") // 1024
+CPU_COUNT = os.cpu_count() or 1
+
+# PCI vendor ids used for GPU detection
+PCI_VENDOR_NVIDIA = "0x10de"
+PCI_VENDOR_AMD = "0x1002"
+PCI_VENDOR_INTEL = "0x8086"
+
+
+def read_cpu_times(proc: Path = Path("/proc")) -> Tuple[int, int]:
+    """Return (total, idle) jiffies summed over all CPUs from /proc/stat."""
+    with (proc / "stat").open("rb") as fh:
+        fields = fh.readline().split()
+    values = [int(v) for v in fields[1:9]]
+    # idle + iowait count as idle time, the same way top does it
+    return sum(values), values[3] + values[4]
+
+
+def read_meminfo(proc: Path = Path("/proc")) -> Dict[str, int]:
+    """Return /proc/meminfo as a dict of kB values."""
+    info = {}
+    with (proc / "meminfo").open("rb") as fh:
+        for line in fh:
+            key, _, rest = line.partition(b":")
+            parts = rest.split()
+            if parts:
+                info[key.decode()] = int(parts[0])
+    return info
+
+
+def read_pid_stat(pid: int, proc: Path = Path("/proc")) -> Optional[Tuple[int, int, int]]:
+    """Return (utime + stime ticks, rss kB, start time ticks) or None if gone."""
+    try:
+        with (proc / str(pid) / "stat").open("rb") as fh:
+            data = fh.read()
+    except OSError:
+        return None
+    # comm may contain spaces or parentheses, so split after the last ')'
+    fields = data[data.rfind(b")") + 2:].split()
+    # fields[0] is field 3 (state) of proc(5)
+    utime, stime = int(fields[11]), int(fields[12])
+    start_time = int(fields[19])
+    rss_pages = int(fields[21])
+    return utime + stime, rss_pages * PAGE_SIZE_KB, start_time
+
+
+def find_pids(names: Iterable[str], proc: Path = Path("/proc")) -> Dict[str, List[int]]:
+    """Map each process name to the PIDs whose comm matches it exactly."""
+    wanted = {name: [] for name in names}
+    for entry in os.scandir(proc):
+        if not entry.name.isdigit():
+            continue
+        try:
+            with open(os.path.join(entry.path, "comm"), "rb") as fh:
+                comm = fh.read().strip().decode(errors="replace")
+        except OSError:
+            continue
+        if comm in wanted:
+            wanted[comm].append(int(entry.name))
+    return wanted
+
+
+def read_cpu_temp(sys_root: str = "/sys") -> Optional[float]:
+    """Return the CPU package temperature in °C, or None without a sensor.
+
+    Prefers the coretemp "Package id" hwmon input and falls back to the
+    x86_pkg_temp thermal zone.
+    """
+    for hwmon in Path(sys_root, "class", "hwmon").glob("hwmon*"):
+        try:
+            if (hwmon / "name").read_text().strip() != "coretemp":
+                continue
+        except OSError:
+            continue
+        for label in sorted(hwmon.glob("temp*_label")):
+            try:
+                if label.read_text().startswith("Package id"):
+                    raw = Path(str(label).replace("_label", "_input")).read_text()
+                    return int(raw) / 1000.0
+            except (OSError, ValueError):
+                continue
+    for zone in Path(sys_root, "class", "thermal").glob("thermal_zone*"):
+        try:
+            if (zone / "type").read_text().strip() == "x86_pkg_temp":
+                return int((zone / "temp").read_text()) / 1000.0
+        except (OSError, ValueError):
+            continue
+    return None
+
+
+def human_kb(kb: float) -> str:
+    """Format a kB amount the way `free -h` does (e.g. 5.1Gi)."""
+    value = float(kb)
+    for unit in ("Ki", "Mi", "Gi", "Ti"):
+        if value < 1024 or unit == "Ti":
+            return f"{value:.1f}{unit}" if value < 10 else f"{value:.0f}{unit}"
+        value /= 1024
+    return f"{value:.1f}Ti"
+
+
+@functools.lru_cache(maxsize=1)
+def detect_gpu(sys_root: str = "/sys") -> Tuple[bool, str]:
+    """Return (gpu_detected, description) from the PCI class/vendor files.
+
+    Hardware does not change while the dashboard runs, so the answer is
+    computed once per process.
+    """
+    vendors = []
+    for dev in sorted(Path(sys_root, "bus", "pci", "devices").glob("*")):
+        try:
+            pci_class = (dev / "class").read_text().strip()
+            vendor = (dev / "vendor").read_text().strip()
+        except OSError:
+            continue
+        # PCI base class 0x03 is "display controller" (VGA, 3D, other)
+        if pci_class.startswith("0x03"):
+            vendors.append(vendor)
+
+    if PCI_VENDOR_NVIDIA in vendors:
+        return True, nvidia_gpu_name() or "NVIDIA GPU detected"
+    if PCI_VENDOR_AMD in vendors:
+        return True, "AMD GPU detected"
+    if vendors and any(v != PCI_VENDOR_INTEL for v in vendors):
+        return False, "Integrated GPU (CPU mining only)"
+    return False, "No GPU detected"
+
+
+def nvidia_gpu_name() -> str:
+    """Return the NVIDIA model name exposed by the driver, if loaded."""
+    for info in Path("/proc/driver/nvidia/gpus").glob("*/information"):
+        try:
+            for line in info.read_text().splitlines():
+                if line.startswith("Model:"):
+                    return line.split(":", 1)[1].strip()
+        except OSError:
+            continue
+    return ""
+
+
+class ProcSampler:
+    """Delta-based CPU/memory sampler for the host and named processes.
+
+    `system()` and `processes()` keep separate previous readings, so callers
+    refreshing them on different schedules each get the average over their
+    own interval.
+    """
+
+    def __init__(self, names: Iterable[str] = MINING_PROCESSES, proc: str = "/proc") -> None:
+        self.names = tuple(names)
+        self.proc = Path(proc)
+        self._prev_system: Optional[Tuple[int, int]] = None
+        self._prev_total = 0
+        self._prev_ticks: Dict[int, Tuple[int, int]] = {}  # pid -> (ticks, start time)
+
+    def system(self) -> dict:
+        """Return host CPU% since the previous call and memory usage."""
+        total, idle = read_cpu_times(self.proc)
+        cpu_percent = 0.0
+        if self._prev_system:
+            d_total = total - self._prev_system[0]
+            d_idle = idle - self._prev_system[1]
+            if d_total > 0:
+                cpu_percent = 100.0 * (d_total - d_idle) / d_total
+        self._prev_system = (total, idle)
+
+        mem = read_meminfo(self.proc)
+        mem_total = mem.get("MemTotal", 0)
+        mem_available = mem.get("MemAvailable", mem.get("MemFree", 0))
+        mem_used = mem_total - mem_available
+        return {
+            "cpu_percent": round(cpu_percent, 1),
+            "mem_total_kb": mem_total,
+            "mem_used_kb": mem_used,
+            "mem_available_kb": mem_available,
+            "mem_percent": round(100.0 * mem_used / mem_total, 1) if mem_total else 0.0,
+        }
+
+    def processes(self, pids: Optional[Dict[str, List[int]]] = None) -> Dict[str, dict]:
+        """Return per-name running flag, CPU% (of one core, like ps) and RSS.
+
+        `pids` may be supplied by a caller that already tracks them; otherwise
+        /proc is scanned for matching comm names.
+        """
+        if pids is None:
+            pids = find_pids(self.names, self.proc)
+        total, _ = read_cpu_times(self.proc)
+        d_total = total - self._prev_total if self._prev_total else 0
+        self._prev_total = total
+        # jiffies elapsed on one CPU during the interval
+        d_wall = d_total / CPU_COUNT
+
+        mem_total = read_meminfo(self.proc).get("MemTotal", 0)
+        ticks_now: Dict[int, Tuple[int, int]] = {}
+        result = {}
+        for name in self.names:
+            cpu = 0.0
+            rss = 0
+            alive = []
+            for pid in pids.get(name, []):
+                stat = read_pid_stat(pid, self.proc)
+                if stat is None:
+                    continue
+                ticks, rss_kb, start = stat
+                alive.append(pid)
+                rss += rss_kb
+                ticks_now[pid] = (ticks, start)
+                prev = self._prev_ticks.get(pid)
+                # a different start time means the PID was reused
+                if prev and prev[1] == start and d_wall > 0:
+                    cpu += 100.0 * (ticks - prev[0]) / d_wall
+            result[name] = {
+                "running": bool(alive),
+                "pids": alive,
+                "cpu_percent": round(cpu, 1),
+                "rss_kb": rss,
+                "mem_percent": round(100.0 * rss / mem_total, 1) if mem_total else 0.0,
+            }
+        self._prev_ticks = ticks_now
+        return result
+
+
+def benchmark(iterations: int) -> dict:
+    """Measure wall and CPU time per full sample (system + processes)."""
+    sampler = ProcSampler()
+    sampler.system()
+    sampler.processes()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    for _ in range(iterations):
+        sampler.system()
+        sampler.processes()
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    return {
+        "iterations": iterations,
+        "wall_us_per_sample": round(wall / iterations * 1e6, 1),
+        "cpu_us_per_sample": round(cpu / iterations * 1e6, 1),
+        "subprocesses_per_sample": 0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bench", type=int, metavar="N", help="time N samples and print the cost per sample")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between the two readings")
+    args = parser.parse_args()
+
+    if args.bench:
+        print(json.dumps(benchmark(args.bench), indent=2))
+        return
+
+    sampler = ProcSampler()
+    sampler.system()
+    sampler.processes()
+    time.sleep(args.interval)
+    gpu_detected, gpu_info = detect_gpu()
+    print(json.dumps({
+        "system": sampler.system(),
+        "processes": sampler.processes(),
+        "gpu": {"detected": gpu_detected, "info": gpu_info},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Shared PID tracker for the mining processes.
+
+The dashboards and the Telegram bot used to run `pgrep -f` for every
+component on every request. The tracker finds the xmrig, monerod and p2pool
+PIDs once and afterwards only checks that /proc/<pid> still exists with the
+same start time (which also catches PID reuse). /proc is rescanned only when
+a tracked PID disappears, or at most every `rescan_interval` seconds while a
+component is down, so a freshly started process is still picked up.
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from proc_sampler import MINING_PROCESSES, find_pids, read_pid_stat
+
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+
+
+def read_boot_time(proc: Path = Path("/proc")) -> float:
+    """Return the system boot time (epoch seconds) from /proc/stat."""
+    with (proc / "stat").open("rb") as fh:
+        for line in fh:
+            if line.startswith(b"btime "):
+                return float(line.split()[1])
+    return 0.0
+
+
+class Component:
+    """Liveness state of one named process."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.pid: Optional[int] = None
+        self.start_ticks = 0
+        self.restarts = 0
+        self.seen = False  # whether any instance has been seen yet
+
+    def as_dict(self, boot_time: float, now: float) -> dict:
+        uptime = None
+        if self.pid is not None:
+            uptime = max(0.0, now - (boot_time + self.start_ticks / CLK_TCK))
+        return {
+            "running": self.pid is not None,
+            "pid": self.pid,
+            "uptime": round(uptime, 1) if uptime is not None else None,
+            "restarts": self.restarts,
+        }
+
+
+class ProcessTracker:
+    """Cheap, shared liveness checks for the mining processes."""
+
+    def __init__(self, names: Iterable[str] = MINING_PROCESSES, proc: str = "/proc", rescan_interval: float = 5.0) -> None:
+        self.proc = Path(proc)
+        self.rescan_interval = rescan_interval
+        self.components: Dict[str, Component] = {name: Component(name) for name in names}
+        self.boot_time = read_boot_time(self.proc)
+        self.scans = 0
+        self._last_scan = 0.0
+        self._lock = threading.Lock()
+
+    def _alive(self, comp: Component) -> bool:
+        stat = read_pid_stat(comp.pid, self.proc)
+        return stat is not None and stat[2] == comp.start_ticks
+
+    def _scan(self) -> None:
+        self.scans += 1
+        self._last_scan = time.monotonic()
+        found = find_pids(self.components, self.proc)
+        for name, comp in self.components.items():
+            # with several matches, track the oldest one (the parent)
+            candidates = []
+            for pid in found.get(name, []):
+                stat = read_pid_stat(pid, self.proc)
+                if stat is not None:
+                    candidates.append((stat[2], pid))
+            if not candidates:
+                comp.pid = None
+                continue
+            start_ticks, pid = min(candidates)
+            if comp.seen and (pid, start_ticks) != (comp.pid, comp.start_ticks):
+                comp.restarts += 1
+            comp.pid, comp.start_ticks, comp.seen = pid, start_ticks, True
+
+    def poll(self) -> Dict[str, dict]:
+        """Return running flag, PID, uptime and restart count per component."""
+        with self._lock:
+            rescan = False
+            for comp in self.components.values():
+                if comp.pid is None:
+                    if time.monotonic() - self._last_scan >= self.rescan_interval:
+                        rescan = True
+                elif not self._alive(comp):
+                    comp.pid = None
+                    rescan = True
+            if rescan or not self.scans:
+                self._scan()
+            now = time.time()
+            return {name: comp.as_dict(self.boot_time, now) for name, comp in self.components.items()}
+
+    def is_running(self, name: str) -> bool:
+        """Return whether the named component is currently alive."""
+        return self.poll()[name]["running"]
+
+    def pids(self) -> Dict[str, List[int]]:
+        """Return the tracked PID of each running component, for ProcSampler."""
+        status = self.poll()
+        return {name: [info["pid"]] if info["running"] else [] for name, info in status.items()}
+
+
+def format_uptime(seconds: Optional[float]) -> str:
+    """Render an uptime in seconds as e.g. '2d 3h', '3h 12m' or '45s'."""
+    if seconds is None:
+        return "N/A"
+    seconds = int(seconds)
+    if seconds >= 86400:
+        return f"{seconds // 86400}d {seconds % 86400 // 3600}h"
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60}s"
+    return f"{seconds}s"
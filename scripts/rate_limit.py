@@ -0,0 +1,44 @@
+"""Token-bucket rate limiting shared by the upstream clients."""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """Allows `rate` operations per second with bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: float = 1.0) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take `tokens` if available right now."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1.0, timeout: float = None) -> bool:
+        """Block until `tokens` are available; False if that exceeds `timeout`.
+
+        The tokens are taken before sleeping, so concurrent callers queue up
+        in arrival order without holding the lock while they wait.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            wait = 0.0 if self._tokens >= tokens else (tokens - self._tokens) / self.rate
+            if timeout is not None and wait > timeout:
+                return False
+            self._tokens -= tokens
+        if wait:
+            time.sleep(wait)
+        return True
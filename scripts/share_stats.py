@@ -0,0 +1,146 @@
+"""Rolling share and pool-latency analytics from XMRig summary deltas.
+
+XMRig only reports counters since the miner started (shares_good,
+shares_total), so a recent burst of rejected shares or a slow pool hides
+behind hours of good history. ShareAnalytics turns successive /1/summary
+samples into deltas and keeps them in rolling windows (5 min, 1 h, 24 h):
+
+- acceptance rate and rejected shares,
+- accepted shares per minute and the average time between them,
+- mean and maximum `connection.ping`.
+
+Each window is a ring of fixed time buckets with running totals; a sample
+touches one bucket and expired buckets are subtracted as the window moves,
+so updates and reads are O(1) amortised however long the window is.
+
+A counter that goes backwards (or uptime that drops) means the miner
+restarted: the new counters are all new shares. A gap longer than MAX_GAP
+between samples cannot be placed in time, so it only re-baselines.
+"""
+
+import threading
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+# name -> (span, bucket width) in seconds
+WINDOWS: Dict[str, Tuple[float, float]] = {
+    "5m": (300.0, 10.0),
+    "1h": (3600.0, 60.0),
+    "24h": (86400.0, 900.0),
+}
+# Longest sample gap whose deltas are still attributed to the window
+MAX_GAP = 300.0
+
+class RollingWindow:
+    """Totals of the last `span` seconds, kept in `span / bucket` buckets."""
+
+    def __init__(self, span: float, bucket: float) -> None:
+        self.span = span
+        self.bucket = bucket
+        self.size = max(1, int(span // bucket))
+        # accepted, rejected, seconds covered, ping sum, ping count
+        self.slots = [[0.0] * 5 for _ in range(self.size)]
+        self.totals = [0.0] * 5
+        self.current: Optional[int] = None  # bucket number of the newest slot
+        # (bucket number, ping) with decreasing pings: the front is the max
+        self._ping_max: deque = deque()
+
+    def _advance(self, when: float) -> int:
+        number = int(when // self.bucket)
+        if self.current is None:
+            self.current = number
+        elif number > self.current:
+            # clear the slots the window moved past (at most a full turn)
+            for n in range(max(self.current + 1, number - self.size + 1), number + 1):
+                slot = self.slots[n % self.size]
+                for i in range(5):
+                    self.totals[i] -= slot[i]
+                    slot[i] = 0.0
+            self.current = number
+        oldest = self.current - self.size + 1
+        while self._ping_max and self._ping_max[0][0] < oldest:
+            self._ping_max.popleft()
+        return self.current
+
+    def add(self, when: float, accepted: int, rejected: int, seconds: float, ping: Optional[float]) -> None:
+        number = self._advance(when)
+        slot = self.slots[number % self.size]
+        values = (accepted, rejected, seconds, ping or 0.0, 1 if ping else 0)
+        for i, value in enumerate(values):
+            slot[i] += value
+            self.totals[i] += value
+        if ping:
+            while self._ping_max and self._ping_max[-1][1] <= ping:
+                self._ping_max.pop()
+            self._ping_max.append((number, ping))
+
+    def stats(self, now: float) -> dict:
+        """Window statistics as of `now`; rates are None until there is data."""
+        self._advance(now)
+        accepted, rejected, seconds, ping_sum, ping_count = self.totals
+        # exact for counts; clamps float drift of the subtracted sums
+        accepted, rejected = round(accepted), round(rejected)
+        submitted = accepted + rejected
+        return {
+            "accepted": accepted,
+            "rejected": rejected,
+            "acceptance": round(accepted / submitted, 4) if submitted else None,
+            "shares_per_min": round(accepted * 60 / seconds, 3) if seconds > 0 else None,
+            "avg_share_time": round(seconds / accepted, 1) if accepted else None,
+            "ping_avg": round(ping_sum / ping_count, 1) if ping_count else None,
+            "ping_max": self._ping_max[0][1] if self._ping_max else None,
+            "covered": round(max(0.0, seconds), 1),
+        }
+
+
+class ShareAnalytics:
+    """Feeds summary deltas into every window; thread-safe."""
+
+    def __init__(self, windows: Dict[str, Tuple[float, float]] = WINDOWS, max_gap: float = MAX_GAP) -> None:
+        self.windows = {name: RollingWindow(span, bucket) for name, (span, bucket) in windows.items()}
+        self.max_gap = max_gap
+        self.resets = 0
+        self._last: Optional[Tuple[float, int, int, float]] = None
+        self._lock = threading.Lock()
+
+    def observe(self, when: float, shares_good: int, shares_total: int, uptime: float, ping: Optional[float]) -> None:
+        """Record one summary sample (counters since miner start, ping in ms)."""
+        shares_good, shares_total = int(shares_good or 0), int(shares_total or 0)
+        uptime = uptime or 0
+        with self._lock:
+            last, self._last = self._last, (when, shares_good, shares_total, uptime)
+            if last is not None and when <= last[0]:
+                self._last = last  # duplicate or out-of-order sample
+                return
+            accepted = rejected = 0
+            seconds = 0.0
+            if last is not None and when - last[0] <= self.max_gap:
+                _, last_good, last_total, last_uptime = last
+                if shares_good < last_good or shares_total < last_total or uptime < last_uptime:
+                    # miner restarted since the last sample
+                    self.resets += 1
+                    last_good = last_total = 0
+                accepted = shares_good - last_good
+                rejected = max(0, (shares_total - last_total) - accepted)
+                seconds = when - last[0]
+            for window in self.windows.values():
+                window.add(when, accepted, rejected, seconds, ping)
+
+    def snapshot(self, now: float) -> dict:
+        """{'5m': {...}, '1h': {...}, '24h': {...}, 'resets': n}"""
+        with self._lock:
+            result = {name: window.stats(now) for name, window in self.windows.items()}
+            result["resets"] = self.resets
+        return result
+
+
+def format_window(stats: dict) -> str:
+    """One-line summary such as '99.1% of 212 accepted • 2.3/min • ping 48 ms (max 95)'."""
+    if stats.get("acceptance") is None:
+        return "no shares yet"
+    parts = [f"{stats['acceptance'] * 100:.1f}% of {stats['accepted'] + stats['rejected']} accepted"]
+    if stats.get("shares_per_min") is not None:
+        parts.append(f"{stats['shares_per_min']:.1f}/min")
+    if stats.get("ping_avg") is not None:
+        parts.append(f"ping {stats['ping_avg']:.0f} ms (max {stats['ping_max']:.0f})")
+    return " • ".join(parts)
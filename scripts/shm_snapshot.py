@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""Fixed-layout stats snapshot in shared memory.
+
+The collector daemon (collector.py) is the only process that talks to XMRig,
+MoneroOcean, monerod and /proc. It publishes the results into a
+`multiprocessing.shared_memory` segment; the dashboards, the Telegram bot and
+the shell scripts read from there instead of polling upstream themselves.
+
+Writes are guarded by a seqlock: the writer bumps the sequence number to an
+odd value, writes the body, then bumps it back to even. Readers retry if the
+sequence was odd or changed while they read, so they never block the writer.
+
+Shell usage:
+
+    python3 scripts/shm_snapshot.py get xmrig.hashrate_10s
+    eval "$(python3 scripts/shm_snapshot.py env)"   # XMRIG_HASHRATE_10S=...
+    python3 scripts/shm_snapshot.py dump            # JSON
+"""
+
+import argparse
+import json
+import math
+import os
+import shlex
+import struct
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Dict, Optional
+
+from earnings import WINDOWS as EARNINGS_WINDOWS
+from share_stats import WINDOWS as SHARE_WINDOWS
+
+SEGMENT_NAME = os.environ.get("STATS_SEGMENT", "monerominer-stats")
+MAGIC = b"XMRS"
+LAYOUT_VERSION = 7
+MAX_THREADS = 64
+# Fleet mode (fleet.py) rows; the fleet totals live in FIELDS.
+MAX_RIGS = 256
+# A snapshot older than this is treated as "collector not running".
+DEFAULT_MAX_AGE = 30.0
+
+# magic, layout version, body size, sequence number
+HEADER = struct.Struct("<4sHIQ")
+
+# (dotted key, struct format) in body order. Append new fields at the end and
+# bump LAYOUT_VERSION; readers refuse layouts they do not know.
+FIELDS = (
+    ("written_at", "d"),
+    ("xmrig.ok", "?"),
+    ("xmrig.updated_at", "d"),
+    ("xmrig.hashrate_10s", "d"),
+    ("xmrig.hashrate_60s", "d"),
+    ("xmrig.hashrate_15m", "d"),
+    ("xmrig.shares_good", "Q"),
+    ("xmrig.shares_total", "Q"),
+    ("xmrig.uptime", "Q"),
+    ("xmrig.ping", "I"),
+    ("xmrig.diff", "Q"),
+    ("xmrig.pool", "64s"),
+    ("xmrig.algo", "16s"),
+    ("xmrig.thread_count", "H"),
+    ("pool.ok", "?"),
+    ("pool.updated_at", "d"),
+    ("pool.hashrate", "d"),
+    ("pool.amt_due", "Q"),
+    ("pool.amt_paid", "Q"),
+    ("host.cpu_percent", "d"),
+    ("host.mem_used_kb", "Q"),
+    ("host.mem_total_kb", "Q"),
+    ("host.cpu_temp", "d"),
+    ("xmrig_proc.running", "?"),
+    ("xmrig_proc.pid", "I"),
+    ("xmrig_proc.uptime", "d"),
+    ("xmrig_proc.restarts", "I"),
+    ("xmrig_proc.cpu_percent", "d"),
+    ("xmrig_proc.rss_kb", "Q"),
+    ("monerod_proc.running", "?"),
+    ("monerod_proc.pid", "I"),
+    ("monerod_proc.uptime", "d"),
+    ("monerod_proc.restarts", "I"),
+    ("monerod_proc.cpu_percent", "d"),
+    ("monerod_proc.rss_kb", "Q"),
+    ("p2pool_proc.running", "?"),
+    ("p2pool_proc.pid", "I"),
+    ("p2pool_proc.uptime", "d"),
+    ("p2pool_proc.restarts", "I"),
+    ("p2pool_proc.cpu_percent", "d"),
+    ("p2pool_proc.rss_kb", "Q"),
+    ("sync.available", "?"),
+    ("sync.height", "Q"),
+    ("sync.target_height", "Q"),
+    ("sync.synchronized", "?"),
+    ("sync.blocks_per_sec", "d"),
+    ("sync.eta_seconds", "d"),
+    ("fleet.count", "H"),
+    ("fleet.online", "H"),
+    ("fleet.updated_at", "d"),
+    ("fleet.hashrate_10s", "d"),
+    ("fleet.hashrate_60s", "d"),
+    ("fleet.hashrate_15m", "d"),
+    ("fleet.shares_good", "Q"),
+    ("fleet.shares_total", "Q"),
+    ("shares.resets", "I"),
+    ("hugepages.score", "d"),
+    ("hugepages.status", "16s"),
+    ("hugepages.verified", "?"),
+    ("hugepages.required_kb", "Q"),
+    ("hugepages.used_kb", "d"),
+    ("hugepages.pages_total", "I"),
+    ("hugepages.pages_free", "I"),
+    ("hugepages.recommended", "I"),
+    ("hugepages.problem", "160s"),
+    ("hugepages.alert", "128s"),
+    ("earnings.ok", "?"),
+    ("earnings.updated_at", "d"),
+    ("earnings.basis", "8s"),
+    ("earnings.hashrate", "d"),
+    ("earnings.hashrate_stdev", "d"),
+    ("earnings.amt_due", "d"),
+    ("earnings.threshold", "d"),
+    ("earnings.xmr_day", "d"),
+    ("earnings.xmr_day_low", "d"),
+    ("earnings.xmr_day_high", "d"),
+    ("earnings.payout_days", "d"),
+    ("earnings.payout_days_low", "d"),
+    ("earnings.payout_days_high", "d"),
+    ("earnings.pool_blocks_day", "d"),
+    ("earnings.difficulty", "d"),
+    ("earnings.reward_xmr", "d"),
+    ("earnings.network_hashrate", "d"),
+    ("earnings.pool_hashrate", "d"),
+    ("earnings.inputs_fresh", "?"),
+)
+FIELDS += tuple((f"earnings.windows.{window}.{key}", fmt) for window, _ in EARNINGS_WINDOWS
+                for key, fmt in (("hashrate", "d"), ("samples", "Q"), ("xmr_day", "d")))
+
+# Rolling share windows (share_stats.py), one block per window
+SHARE_FIELDS = (
+    ("accepted", "Q"),
+    ("rejected", "Q"),
+    ("acceptance", "d"),
+    ("shares_per_min", "d"),
+    ("avg_share_time", "d"),
+    ("ping_avg", "d"),
+    ("ping_max", "d"),
+    ("covered", "d"),
+)
+FIELDS += tuple((f"shares.{window}.{key}", fmt) for window in SHARE_WINDOWS for key, fmt in SHARE_FIELDS)
+# Staleness of the pool stats during MoneroOcean outages (layout 6)
+FIELDS += (
+    ("pool.fresh", "?"),
+    ("pool.breaker", "12s"),
+    ("pool.age", "d"),
+)
+# Underperforming mining threads from the collector's last-hour analysis (layout 7)
+FIELDS += (
+    ("threads.flagged", "H"),
+    ("threads.alert", "320s"),
+)
+
+# One row per rig, in fleet.rigs order
+RIG_FIELDS = (
+    ("name", "32s"),
+    ("ok", "?"),
+    ("error", "16s"),
+    ("hashrate_10s", "d"),
+    ("hashrate_60s", "d"),
+    ("hashrate_15m", "d"),
+    ("shares_good", "Q"),
+    ("shares_total", "Q"),
+    ("uptime", "Q"),
+    ("latency_ms", "d"),
+)
+
+SCALARS = struct.Struct("<" + "".join(fmt for _, fmt in FIELDS))
+THREADS = struct.Struct(f"<{MAX_THREADS}d")
+RIG = struct.Struct("<" + "".join(fmt for _, fmt in RIG_FIELDS))
+RIGS_OFFSET = SCALARS.size + THREADS.size
+BODY_SIZE = RIGS_OFFSET + MAX_RIGS * RIG.size
+SEGMENT_SIZE = HEADER.size + BODY_SIZE
+SEQ_OFFSET = 4 + 2 + 4  # offset of the sequence number inside HEADER
+SEQ = struct.Struct("<Q")
+FIELD_INDEX = {key: i for i, (key, _) in enumerate(FIELDS)}
+
+
+def _encode(fmt: str, value):
+    if fmt.endswith("s"):
+        return (value or "").encode("utf-8")[: int(fmt[:-1])]
+    if fmt == "d":
+        return math.nan if value is None else float(value)
+    if fmt == "?":
+        return bool(value)
+    return int(value or 0)
+
+
+def _decode(fmt: str, value):
+    if fmt.endswith("s"):
+        return value.rstrip(b"\0").decode("utf-8", errors="replace")
+    if fmt == "d" and value != value:
+        return None
+    return value
+
+
+def flatten(nested: dict) -> Dict[str, object]:
+    """Turn {'xmrig': {'ok': True}} into {'xmrig.ok': True}."""
+    flat = {}
+    for key, value in nested.items():
+        if isinstance(value, dict):
+            for sub, inner in flatten(value).items():
+                flat[f"{key}.{sub}"] = inner
+        else:
+            flat[key] = value
+    return flat
+
+
+def unflatten(flat: Dict[str, object]) -> dict:
+    nested: dict = {}
+    for key, value in flat.items():
+        node = nested
+        *parents, leaf = key.split(".")
+        for part in parents:
+            node = node.setdefault(part, {})
+        node[leaf] = value
+    return nested
+
+
+# Segments created by a SnapshotWriter in this process
+_OWNED = set()
+
+
+def _unregister(shm: shared_memory.SharedMemory) -> None:
+    # Before Python 3.13 attaching registers the segment with this process's
+    # resource tracker, which would unlink it when a reader exits. A writer in
+    # the same process (benchmarks) shares that registration; leave it alone.
+    if shm.name in _OWNED:
+        return
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")  # noqa: SLF001
+    except Exception:  # noqa: BLE001
+        pass
+
+
+class SnapshotWriter:
+    """Owns the segment and publishes snapshots into it."""
+
+    def __init__(self, name: str = SEGMENT_NAME) -> None:
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=SEGMENT_SIZE)
+        except FileExistsError:
+            # left behind by a collector that died; take it over
+            old = shared_memory.SharedMemory(name=name)
+            old.close()
+            old.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=SEGMENT_SIZE)
+        _OWNED.add(self.shm.name)
+        self.seq = 0
+        HEADER.pack_into(self.shm.buf, 0, MAGIC, LAYOUT_VERSION, BODY_SIZE, self.seq)
+
+    def write(self, snapshot: dict) -> None:
+        """Publish a nested snapshot dict (missing fields become 0/None)."""
+        flat = flatten(snapshot)
+        flat.setdefault("written_at", time.time())
+        values = [_encode(fmt, flat.get(key)) for key, fmt in FIELDS]
+        threads = list(flat.get("xmrig.threads") or [])[:MAX_THREADS]
+        values[FIELD_INDEX["xmrig.thread_count"]] = len(threads)
+        threads += [math.nan] * (MAX_THREADS - len(threads))
+        rigs = list(flat.get("fleet.rigs") or [])[:MAX_RIGS]
+        values[FIELD_INDEX["fleet.count"]] = len(rigs)
+        rows = [[_encode(fmt, rig.get(key)) for key, fmt in RIG_FIELDS] for rig in rigs]
+
+        buf = self.shm.buf
+        self.seq += 1  # odd: write in progress
+        SEQ.pack_into(buf, SEQ_OFFSET, self.seq)
+        SCALARS.pack_into(buf, HEADER.size, *values)
+        THREADS.pack_into(buf, HEADER.size + SCALARS.size, *threads)
+        for i, row in enumerate(rows):
+            RIG.pack_into(buf, HEADER.size + RIGS_OFFSET + i * RIG.size, *row)
+        self.seq += 1  # even: consistent
+        SEQ.pack_into(buf, SEQ_OFFSET, self.seq)
+
+    def close(self) -> None:
+        self.shm.close()
+        self.shm.unlink()
+        _OWNED.discard(self.shm.name)
+
+
+class SnapshotReader:
+    """Seqlock reader; attaches lazily and re-attaches after restarts.
+
+    Readers never block the writer. The in-process lock only stops threads
+    sharing one reader from detaching the segment under each other.
+    """
+
+    def __init__(self, name: str = SEGMENT_NAME) -> None:
+        self.name = name
+        self.shm: Optional[shared_memory.SharedMemory] = None
+        self._lock = threading.Lock()
+
+    def _attach(self) -> bool:
+        try:
+            shm = shared_memory.SharedMemory(name=self.name)
+        except (FileNotFoundError, OSError):
+            return False
+        _unregister(shm)
+        magic, version, size, _ = HEADER.unpack_from(shm.buf, 0)
+        if magic != MAGIC or version != LAYOUT_VERSION or size != BODY_SIZE:
+            shm.close()
+            return False
+        self.shm = shm
+        return True
+
+    def read_flat(self, retries: int = 100) -> Optional[Dict[str, object]]:
+        """Return a consistent flat snapshot, or None if unavailable."""
+        if self.shm is None and not self._attach():
+            return None
+        buf = self.shm.buf
+        for _ in range(retries):
+            seq1 = SEQ.unpack_from(buf, SEQ_OFFSET)[0]
+            if seq1 & 1:
+                continue
+            values = SCALARS.unpack_from(buf, HEADER.size)
+            threads = THREADS.unpack_from(buf, HEADER.size + SCALARS.size)
+            start = HEADER.size + RIGS_OFFSET
+            rows = bytes(buf[start:start + min(values[FIELD_INDEX["fleet.count"]], MAX_RIGS) * RIG.size])
+            if SEQ.unpack_from(buf, SEQ_OFFSET)[0] == seq1:
+                break
+        else:
+            return None
+        flat = {key: _decode(fmt, value) for (key, fmt), value in zip(FIELDS, values)}
+        flat["xmrig.threads"] = list(threads[: flat["xmrig.thread_count"]])
+        flat["fleet.rigs"] = [
+            {key: _decode(fmt, value) for (key, fmt), value in zip(RIG_FIELDS, row)}
+            for row in RIG.iter_unpack(rows)
+        ]
+        flat["seq"] = seq1
+        return flat
+
+    def read(self, max_age: float = DEFAULT_MAX_AGE) -> Optional[dict]:
+        """Return the nested snapshot if the collector wrote it recently."""
+        with self._lock:
+            flat = self.read_flat()
+            if flat is None:
+                return None
+            if time.time() - (flat["written_at"] or 0) > max_age:
+                # stale: the collector may have been replaced, so re-attach next time
+                self.shm.close()
+                self.shm = None
+                return None
+        return unflatten(flat)
+
+
+def as_xmrig_summary(snapshot: dict) -> dict:
+    """Rebuild the subset of XMRig's /1/summary the tools use, or {}."""
+    xmrig = snapshot.get("xmrig", {})
+    if not xmrig.get("ok"):
+        return {}
+    return {
+        "hashrate": {
+            "total": [xmrig["hashrate_10s"], xmrig["hashrate_60s"], xmrig["hashrate_15m"]],
+            "threads": [[rate] for rate in xmrig["threads"]],
+        },
+        "results": {"shares_good": xmrig["shares_good"], "shares_total": xmrig["shares_total"]},
+        "connection": {"pool": xmrig["pool"], "ping": xmrig["ping"], "diff": xmrig["diff"], "algo": xmrig["algo"]},
+        "uptime": xmrig["uptime"],
+    }
+
+
+def as_pool_stats(snapshot: dict) -> dict:
+    """Rebuild MoneroOcean's /miner/{wallet}/stats fields (possibly stale), or {}."""
+    pool = snapshot.get("pool", {})
+    if pool.get("age") is None:
+        return {}
+    return {"hash": pool["hashrate"] or 0, "amtDue": pool["amt_due"], "amtPaid": pool["amt_paid"]}
+
+
+def as_hugepages(snapshot: dict) -> Optional[dict]:
+    """Rebuild hugepages.summarize() output, or None before the first audit."""
+    hugepages = snapshot.get("hugepages", {})
+    if not hugepages.get("status"):
+        return None
+    return hugepages
+
+
+def as_earnings(snapshot: dict) -> Optional[dict]:
+    """Rebuild EarningsProjector.project() output, or None before the first projection."""
+    earnings = snapshot.get("earnings", {})
+    if not earnings.get("updated_at"):
+        return None
+    return earnings
+
+
+def as_fleet(snapshot: dict) -> Optional[dict]:
+    """Rebuild FleetPoller.poll() output, or None when fleet mode is off."""
+    fleet = snapshot.get("fleet", {})
+    if not fleet.get("count"):
+        return None
+    return fleet
+
+
+def as_processes(snapshot: dict, names=("xmrig", "monerod", "p2pool")) -> dict:
+    """Rebuild ProcessTracker.poll() output from the snapshot."""
+    keys = ("running", "pid", "uptime", "restarts")
+    result = {}
+    for name in names:
+        proc = snapshot.get(f"{name}_proc", {})
+        result[name] = {key: proc.get(key) for key in keys}
+        if not result[name]["running"]:
+            result[name]["pid"] = result[name]["uptime"] = None
+    return result
+
+
+def as_sync(snapshot: dict) -> dict:
+    """Rebuild SyncProgress.poll() output from the snapshot."""
+    sync = dict(snapshot.get("sync", {}))
+    height, target = sync.get("height") or 0, sync.get("target_height") or 0
+    sync["percent"] = round(height * 100 / target, 1) if target else 0.0
+    sync["remaining"] = target - height if sync.get("available") else None
+    return sync
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Read the collector's shared-memory snapshot")
+    parser.add_argument("command", choices=("get", "env", "dump"))
+    parser.add_argument("key", nargs="?", help="dotted field name for 'get', e.g. xmrig.hashrate_10s")
+    parser.add_argument("--max-age", type=float, default=DEFAULT_MAX_AGE)
+    args = parser.parse_args()
+
+    reader = SnapshotReader()
+    snapshot = reader.read(args.max_age)
+    if snapshot is None:
+        print("collector snapshot not available", file=sys.stderr)
+        raise SystemExit(2)
+    flat = flatten(snapshot)
+
+    if args.command == "dump":
+        print(json.dumps(snapshot, indent=2))
+    elif args.command == "env":
+        for key, value in flat.items():
+            if key == "fleet.rigs":
+                continue  # per-rig rows are only in 'dump'
+            if isinstance(value, list):
+                value = ",".join(f"{v:.1f}" for v in value)
+            elif isinstance(value, bool):
+                value = int(value)
+            elif value is None:
+                value = ""
+            print(f"{key.upper().replace('.', '_')}={shlex.quote(str(value))}")
+    else:
+        if args.key not in flat:
+            print(f"unknown field: {args.key}", file=sys.stderr)
+            raise SystemExit(1)
+        value = flat[args.key]
+        print("" if value is None else value)
+
+
+if __name__ == "__main__":
+    main()
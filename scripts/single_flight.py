@@ -0,0 +1,50 @@
+"""Coalesce concurrent calls of an expensive function into one computation."""
+
+import threading
+import time
+from typing import Any, Callable, Optional
+
+
+class _Flight:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.finished = 0.0
+
+
+class SingleFlight:
+    """Share one call of `fn` between every caller within `window` seconds.
+
+    The first caller computes; callers arriving while it runs wait for and
+    receive the same result, and so do callers up to `window` seconds after
+    it finished. An exception is re-raised to every waiter of that flight.
+    """
+
+    def __init__(self, fn: Callable[[], Any], window: float = 2.0) -> None:
+        self.fn = fn
+        self.window = window
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._flight: Optional[_Flight] = None
+
+    def __call__(self) -> Any:
+        with self._lock:
+            flight = self._flight
+            expired = flight is not None and flight.done.is_set() and time.monotonic() - flight.finished >= self.window
+            leader = flight is None or expired
+            if leader:
+                flight = self._flight = _Flight()
+                self.calls += 1
+        if leader:
+            try:
+                flight.result = self.fn()
+            except Exception as exc:  # noqa: BLE001
+                flight.error = exc
+            flight.finished = time.monotonic()
+            flight.done.set()
+        else:
+            flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
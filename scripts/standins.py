@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+"""Local stand-in servers for the upstream APIs the mining tools talk to.
+
+They let the collectors be exercised without a running node or miner:
+
+    python3 scripts/standins.py monerod --port 18081 --height 3000000 --target 3100000 --rate 40
+    python3 scripts/standins.py moneroocean --port 8090 --latency 0.2 --fail-rate 0.3
+    python3 scripts/standins.py xmrig --port 3001 --count 20 --rigs-file /tmp/rigs.json
+    python3 scripts/standins.py xmrig --port 3001 --config config.json --warmup 2
+    python3 scripts/standins.py telegram --port 8081
+
+Every stand-in takes `latency` (seconds added to each response),
+`fail_rate` (fraction answered with a 503) and `down` (fail everything).
+
+Each stand-in can also be started in-process with `serve()`, which returns
+the running server (use `server.server_port` for the bound port).
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from miner_api import rx_entries
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """Common JSON plumbing and fault injection for the stand-in handlers."""
+
+    def inject_faults(self, fake) -> bool:
+        """Count the request, apply latency; True if a 503 was sent instead."""
+        fake.requests += 1
+        if fake.latency:
+            time.sleep(fake.latency)
+        if fake.down or (fake.fail_rate and random.random() < fake.fail_rate):
+            self.send_json({"error": "service unavailable"}, 503)
+            return True
+        return False
+
+    def send_json(self, payload: dict, status: int = 200) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            return {}
+
+    def log_message(self, format: str, *args) -> None:  # noqa: ANN001
+        return
+
+
+class FakeMonerod:
+    """monerod JSON-RPC whose height advances `rate` blocks/sec to `target`."""
+
+    def __init__(self, height: int = 3_000_000, target: int = 3_100_000, rate: float = 40.0,
+                 latency: float = 0.0, fail_rate: float = 0.0) -> None:
+        self.start_height = height
+        self.target = target
+        self.rate = rate
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.down = False
+        self.requests = 0
+        self.started = time.monotonic()
+
+    def height(self) -> int:
+        grown = int((time.monotonic() - self.started) * self.rate)
+        return min(self.start_height + grown, self.target)
+
+    def get_info(self) -> dict:
+        height = self.height()
+        synced = height >= self.target
+        return {
+            "height": height,
+            "target_height": 0 if synced else self.target,
+            "synchronized": synced,
+            "status": "OK",
+        }
+
+    def handler(self) -> type:
+        fake = self
+
+        class Handler(StandinHandler):
+            def do_POST(self):  # noqa: N802
+                request = self.read_json()
+                if self.inject_faults(fake):
+                    return
+                if self.path != "/json_rpc" or request.get("method") != "get_info":
+                    self.send_json({"error": {"code": -32601, "message": "Method not found"}}, 404)
+                    return
+                self.send_json({"jsonrpc": "2.0", "id": request.get("id"), "result": fake.get_info()})
+
+        return Handler
+
+
+class FakeMoneroOcean:
+    """MoneroOcean REST API with ETags and injectable latency / failures.
+
+    `fail_rate` is the fraction of requests answered with a 503; setting
+    `down` makes every request fail, to simulate an outage.
+    """
+
+    def __init__(self, latency: float = 0.0, fail_rate: float = 0.0, hashrate: float = 4500.0) -> None:
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.hashrate = hashrate
+        self.down = False
+        self.requests = 0
+        self.not_modified = 0
+        self.started = time.monotonic()
+
+    def miner_stats(self) -> dict:
+        # balances move once a minute, like the real pool's payment cycle
+        minutes = int((time.monotonic() - self.started) // 60)
+        return {
+            "hash": self.hashrate,
+            "identifier": "global",
+            "lastHash": int(time.time()),
+            "totalHashes": 10_000_000 + minutes * int(self.hashrate * 60),
+            "validShares": 1200 + minutes,
+            "invalidShares": 0,
+            "amtPaid": 0.0,
+            "amtDue": 0.000125 * (minutes + 1),
+            "txnCount": 0,
+        }
+
+    def route(self, path: str):
+        if path.startswith("/miner/") and path.endswith("/stats"):
+            return self.miner_stats()
+        if path == "/pool/stats":
+            return {"pool_statistics": {"hashRate": 180_000_000, "miners": 9000, "totalHashes": 0}}
+        if path == "/network/stats":
+            return {"difficulty": 350_000_000_000, "height": 3_100_000, "value": 600_000_000_000}
+        return None
+
+    def handler(self) -> type:
+        fake = self
+
+        class Handler(StandinHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):  # noqa: N802
+                if self.inject_faults(fake):
+                    return
+                payload = fake.route(self.path)
+                if payload is None:
+                    self.send_json({"error": "not found"}, 404)
+                    return
+                body = json.dumps(payload).encode("utf-8")
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+                if self.headers.get("If-None-Match") == etag:
+                    fake.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+class FakeXMRig:
+    """XMRig HTTP API (/1/summary) for one rig, with a slowly drifting hashrate.
+
+    Requests without the bearer `token` get a 401 like the real miner. Set
+    `down` to answer 503, or `latency` to delay every response.
+
+    Given a miner `config`, GET/PUT /2/config serve and replace it (403 when
+    `restricted`, like XMRig's read-only API) and the hashrate follows the
+    `cpu.rx` layout through a simple model of a 4-core / 8-thread CPU with
+    8 MB of L3 (see `layout_hashrate`). After every PUT the 10s hashrate is
+    null for `warmup` seconds, then ramps up over `settle` seconds with
+    `noise` (relative stdev) on every reading, so tuners have something
+    realistic to stabilize against. The model exists to exercise
+    scripts/autotune.py; it predicts nothing about real hardware.
+    """
+
+    # logical CPUs sharing each physical core (i7-4790 numbering)
+    SIBLINGS = [[0, 4], [1, 5], [2, 6], [3, 7]]
+    L3_MB = 8.0
+    SCRATCHPAD_MB = 2.0
+    # relative speed of each randomx.scratchpad_prefetch_mode
+    PREFETCH = {0: 0.97, 1: 1.0, 2: 1.015, 3: 0.99}
+
+    def __init__(self, name: str = "rig-001", hashrate: float = 4500.0, threads: int = 8,
+                 latency: float = 0.0, token: str = "mining-dashboard", fail_rate: float = 0.0,
+                 config: Optional[dict] = None, restricted: bool = False, warmup: float = 5.0,
+                 settle: float = 10.0, noise: float = 0.01) -> None:
+        self.name = name
+        self.hashrate = hashrate
+        self.threads = threads
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.token = token
+        self.config = config
+        self.restricted = restricted
+        self.warmup = warmup
+        self.settle = settle
+        self.noise = noise
+        self.down = False
+        self.requests = 0
+        self.config_updates = 0
+        self.started = time.monotonic()
+        self.reconfigured = self.started
+
+    def layout_hashrate(self, config: dict) -> float:
+        """Steady-state hashrate of `config`'s `cpu.rx` layout.
+
+        One thread per physical core earns hashrate / cores; a hyperthread
+        sibling adds 15 %, threads sharing a logical CPU add nothing and
+        unpinned threads lose 5 % to migrations. Scratchpads beyond L3 cost
+        (L3 / footprint) ** 0.35, each extra unit of intensity gains 3 %.
+        """
+        cpu = config.get("cpu", {})
+        entries = rx_entries(cpu.get("rx"))
+        if not entries or not cpu.get("enabled", True):
+            return 0.0
+        core_of = {logical: core for core, group in enumerate(self.SIBLINGS) for logical in group}
+        busy = set()
+        unpinned = 0
+        for _, affinity in entries:
+            if affinity in core_of:
+                busy.add(affinity)
+            else:
+                unpinned += 1
+        # the scheduler spreads unpinned threads over idle cores first
+        for logical in sorted(core_of, key=lambda c: (any(s in busy for s in self.SIBLINGS[core_of[c]]), c)):
+            if unpinned == 0:
+                break
+            if logical not in busy:
+                busy.add(logical)
+                unpinned -= 1
+        per_core = [sum(1 for logical in group if logical in busy) for group in self.SIBLINGS]
+        throughput = sum(0.0 if n == 0 else 1.0 + 0.15 * (n - 1) for n in per_core)
+        intensity = sum(i for i, _ in entries) / len(entries)
+        footprint = sum(i for i, _ in entries) * self.SCRATCHPAD_MB
+        rate = self.hashrate / len(self.SIBLINGS) * throughput
+        rate *= min(1.0, self.L3_MB / footprint) ** 0.35
+        rate *= 1 + 0.03 * (intensity - 1)
+        rate *= self.PREFETCH.get(config.get("randomx", {}).get("scratchpad_prefetch_mode", 1), 0.97)
+        if cpu.get("huge-pages-jit"):
+            rate *= 1.01
+        if any(affinity not in core_of for _, affinity in entries):
+            rate *= 0.95
+        return rate
+
+    def put_config(self, config: dict) -> None:
+        """Apply a new config; the workers restart and the hashrate warms up again."""
+        self.config = config
+        self.config_updates += 1
+        self.reconfigured = time.monotonic()
+
+    def summary(self) -> dict:
+        now = time.monotonic()
+        uptime = now - self.started
+        if self.config is None:
+            threads = self.threads
+            per_thread = [self.hashrate / threads * (1 + 0.02 * ((t + int(uptime)) % 5 - 2))
+                          for t in range(threads)]
+            total = sum(per_thread)
+            hashrate = {"total": [total, self.hashrate, self.hashrate], "threads": [[r, r, r] for r in per_thread]}
+        else:
+            steady = self.layout_hashrate(self.config)
+            threads = max(1, len(rx_entries(self.config.get("cpu", {}).get("rx"))))
+            running = now - self.reconfigured - self.warmup
+            if running < 0:
+                total = None
+            else:
+                ramp = min(1.0, 0.7 + 0.3 * running / self.settle) if self.settle else 1.0
+                total = steady * ramp * (1 + random.gauss(0.0, self.noise))
+            long_term = steady if running >= 60 else None
+            per_thread = None if total is None else total / threads
+            hashrate = {"total": [total, long_term, None],
+                        "threads": [[per_thread, long_term and long_term / threads, None]] * threads}
+        shares = int(uptime // 30)
+        return {
+            "worker_id": self.name,
+            "uptime": int(uptime),
+            "algo": "rx/0",
+            "hashrate": hashrate,
+            "results": {"shares_good": shares, "shares_total": shares, "diff_current": 120000},
+            "connection": {"pool": "gulf.moneroocean.stream:10128", "ping": 42, "diff": 120000, "algo": "rx/0"},
+        }
+
+    def handler(self) -> type:
+        fake = self
+
+        class Handler(StandinHandler):
+            protocol_version = "HTTP/1.1"
+
+            def authorized(self) -> bool:
+                if fake.token and self.headers.get("Authorization") != f"Bearer {fake.token}":
+                    self.send_json({"status": 401, "error": "Unauthorized"}, 401)
+                    return False
+                if self.path == "/2/config" and (fake.config is None or fake.restricted):
+                    self.send_json({"status": 403, "error": "Forbidden"}, 403)
+                    return False
+                return True
+
+            def do_GET(self):  # noqa: N802
+                if self.inject_faults(fake) or not self.authorized():
+                    return
+                if self.path == "/1/summary":
+                    self.send_json(fake.summary())
+                elif self.path == "/2/config":
+                    self.send_json(fake.config)
+                else:
+                    self.send_json({"status": 404, "error": "Not Found"}, 404)
+
+            def do_PUT(self):  # noqa: N802
+                config = self.read_json()
+                if self.inject_faults(fake) or not self.authorized():
+                    return
+                if self.path != "/2/config":
+                    self.send_json({"status": 404, "error": "Not Found"}, 404)
+                elif not isinstance(config.get("cpu"), dict):
+                    self.send_json({"status": 400, "error": "Bad Request"}, 400)
+                else:
+                    fake.put_config(config)
+                    self.send_response(204)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+
+        return Handler
+
+
+class FakeTelegram:
+    """Telegram Bot API: getUpdates long-polls a queue fed by `push()`,
+    sendMessage records what the bot sent in `sent`."""
+
+    def __init__(self, latency: float = 0.0, fail_rate: float = 0.0, max_wait: float = 1.0) -> None:
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.max_wait = max_wait
+        self.down = False
+        self.requests = 0
+        self.sent = []
+        self._updates = []
+        self._next_id = 1
+        self._cond = threading.Condition()
+
+    def push(self, chat_id: int, text: str) -> None:
+        """Queue an incoming message as if a user had sent it."""
+        with self._cond:
+            self._updates.append({
+                "update_id": self._next_id,
+                "message": {"message_id": self._next_id, "chat": {"id": chat_id, "type": "group"},
+                            "date": int(time.time()), "text": text},
+            })
+            self._next_id += 1
+            self._cond.notify_all()
+
+    def get_updates(self, offset: int, limit: int, timeout: float) -> list:
+        deadline = time.monotonic() + min(timeout, self.max_wait)
+        with self._cond:
+            while True:
+                pending = [u for u in self._updates if u["update_id"] >= offset]
+                remaining = deadline - time.monotonic()
+                if pending or remaining <= 0:
+                    # confirmed updates are forgotten, like the real API
+                    self._updates = pending
+                    return pending[:limit]
+                self._cond.wait(remaining)
+
+    def wait_sent(self, count: int, timeout: float = 10.0) -> bool:
+        """Block until at least `count` messages were sent."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while len(self.sent) < count:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def handler(self) -> type:
+        fake = self
+
+        class Handler(StandinHandler):
+            protocol_version = "HTTP/1.1"
+
+            def params(self) -> dict:
+                url = urllib.parse.urlsplit(self.path)
+                params = {k: v[0] for k, v in urllib.parse.parse_qs(url.query).items()}
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    body = self.rfile.read(length).decode("utf-8")
+                    if self.headers.get("Content-Type", "").startswith("application/json"):
+                        params.update(json.loads(body or "{}"))
+                    else:
+                        params.update({k: v[0] for k, v in urllib.parse.parse_qs(body).items()})
+                return params
+
+            def handle_method(self) -> None:
+                params = self.params()
+                if self.inject_faults(fake):
+                    return
+                method = urllib.parse.urlsplit(self.path).path.rsplit("/", 1)[-1]
+                if method == "getUpdates":
+                    updates = fake.get_updates(int(params.get("offset", 0)), int(params.get("limit", 100)),
+                                               float(params.get("timeout", 0)))
+                    self.send_json({"ok": True, "result": updates})
+                elif method == "sendMessage":
+                    with fake._cond:  # noqa: SLF001
+                        fake.sent.append({"chat_id": params.get("chat_id"), "text": params.get("text", "")})
+                        fake._cond.notify_all()  # noqa: SLF001
+                    self.send_json({"ok": True, "result": {"message_id": len(fake.sent)}})
+                else:
+                    self.send_json({"ok": False, "error_code": 404, "description": "Not Found"}, 404)
+
+            do_GET = handle_method
+            do_POST = handle_method
+
+        return Handler
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address) -> None:  # noqa: ANN001
+        # clients that gave up on an injected delay are expected; stay quiet
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def serve(fake, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Start `fake` on a background thread and return the server."""
+    server = StandinServer((host, port), fake.handler())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a stand-in upstream server")
+    sub = parser.add_subparsers(dest="kind", required=True)
+    monerod = sub.add_parser("monerod", help="monerod JSON-RPC get_info")
+    monerod.add_argument("--port", type=int, default=18081)
+    monerod.add_argument("--height", type=int, default=3_000_000)
+    monerod.add_argument("--target", type=int, default=3_100_000)
+    monerod.add_argument("--rate", type=float, default=40.0, help="blocks per second")
+    monerod.add_argument("--latency", type=float, default=0.0)
+    monerod.add_argument("--fail-rate", type=float, default=0.0)
+    pool = sub.add_parser("moneroocean", help="MoneroOcean REST API")
+    pool.add_argument("--port", type=int, default=8090)
+    pool.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    pool.add_argument("--fail-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    pool.add_argument("--hashrate", type=float, default=4500.0)
+    xmrig = sub.add_parser("xmrig", help="XMRig HTTP API; --count starts one per port")
+    xmrig.add_argument("--port", type=int, default=3001, help="first port")
+    xmrig.add_argument("--count", type=int, default=1)
+    xmrig.add_argument("--hashrate", type=float, default=4500.0)
+    xmrig.add_argument("--latency", type=float, default=0.0)
+    xmrig.add_argument("--fail-rate", type=float, default=0.0)
+    xmrig.add_argument("--rigs-file", help="write a fleet rigs.json for the started rigs")
+    xmrig.add_argument("--config", help="miner config.json to serve on /2/config (enables the layout model)")
+    xmrig.add_argument("--warmup", type=float, default=5.0, help="seconds without a 10s hashrate after a config PUT")
+    telegram = sub.add_parser("telegram", help="Telegram Bot API getUpdates/sendMessage")
+    telegram.add_argument("--port", type=int, default=8081)
+    telegram.add_argument("--latency", type=float, default=0.0)
+    telegram.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    if args.kind == "xmrig":
+        servers, rigs = [], []
+        config = None
+        if args.config:
+            with open(args.config, encoding="utf-8") as fh:
+                config = json.load(fh)
+        for i in range(args.count):
+            fake = FakeXMRig(f"rig-{i + 1:03d}", args.hashrate, latency=args.latency, fail_rate=args.fail_rate,
+                             config=copy.deepcopy(config), warmup=args.warmup)
+            servers.append(serve(fake, port=args.port + i))
+            rigs.append({"name": fake.name, "url": f"http://127.0.0.1:{args.port + i}", "token": fake.token})
+        if args.rigs_file:
+            with open(args.rigs_file, "w", encoding="utf-8") as fh:
+                json.dump(rigs, fh, indent=2)
+        print(f"{args.count} xmrig stand-in(s) listening on 127.0.0.1:{args.port}-{args.port + args.count - 1}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            for server in servers:
+                server.shutdown()
+        return
+
+    if args.kind == "monerod":
+        fake = FakeMonerod(args.height, args.target, args.rate, args.latency, args.fail_rate)
+    elif args.kind == "moneroocean":
+        fake = FakeMoneroOcean(args.latency, args.fail_rate, args.hashrate)
+    elif args.kind == "telegram":
+        fake = FakeTelegram(args.latency, args.fail_rate)
+    server = serve(fake, port=args.port)
+    print(f"{args.kind} stand-in listening on 127.0.0.1:{server.server_port}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Background refresher with a per-source TTL cache.
+
+Every registered source (a zero-argument callable) is refreshed by its own
+daemon thread on its own interval. Request handlers never call the sources
+directly: they read the last completed snapshot, so a slow upstream only
+makes that one value older instead of stalling the page.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+
+class Entry(NamedTuple):
+    """Immutable result of one refresh of a source."""
+
+    value: Any
+    updated: float  # time.monotonic() when the value was produced
+    duration: float  # seconds the refresh took
+    error: Optional[str]
+
+
+class StatsCache:
+    """Stale-while-revalidate cache of independently refreshed sources."""
+
+    def __init__(self, on_refresh: Optional[Callable[[str, Entry], None]] = None,
+                 pace: Optional[Callable[[str, float], float]] = None) -> None:
+        """`on_refresh(name, entry)` is called after every refresh (e.g. for metrics).
+
+        `pace(name, interval)` may return a longer wait than a source's
+        interval (see miner_first.py); `wake()` ends every wait early.
+        """
+        self._on_refresh = on_refresh
+        self._pace = pace
+        self._wake = threading.Condition()
+        self._sources: Dict[str, tuple] = {}
+        self._entries: Dict[str, Entry] = {}
+        self._refreshing: Dict[str, bool] = {}
+        self._threads: list = []
+        self._stop = threading.Event()
+
+    def register(self, name: str, fetch: Callable[[], Any], interval: float, default: Any = None) -> None:
+        """Add a source refreshed every `interval` seconds.
+
+        `default` is served until the first refresh completes.
+        """
+        self._sources[name] = (fetch, interval)
+        self._entries[name] = Entry(default, 0.0, 0.0, None)
+        self._refreshing[name] = False
+
+    def start(self) -> None:
+        """Start one refresher thread per registered source."""
+        for name in self._sources:
+            thread = threading.Thread(target=self._run, args=(name,), name=f"refresh-{name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 1.0) -> None:
+        """Ask refresher threads to exit and wait briefly for them."""
+        self._stop.set()
+        self.wake()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def refresh(self, name: str) -> Entry:
+        """Run one refresh of `name` in the calling thread."""
+        fetch, _ = self._sources[name]
+        self._refreshing[name] = True
+        started = time.monotonic()
+        try:
+            value, error = fetch(), None
+        except Exception as exc:  # noqa: BLE001 - a broken source must not kill its thread
+            value, error = self._entries[name].value, str(exc)
+        finally:
+            self._refreshing[name] = False
+        finished = time.monotonic()
+        # a failed refresh keeps the last value and when it was produced
+        updated = finished if error is None else self._entries[name].updated
+        # Replacing the whole tuple keeps reads lock-free.
+        entry = Entry(value, updated, finished - started, error)
+        self._entries[name] = entry
+        if self._on_refresh is not None:
+            self._on_refresh(name, entry)
+        return entry
+
+    def wake(self) -> None:
+        """Refresh every source now instead of at the end of its wait."""
+        with self._wake:
+            self._wake.notify_all()
+
+    def _run(self, name: str) -> None:
+        _, interval = self._sources[name]
+        while not self._stop.is_set():
+            entry = self.refresh(name)
+            wait = interval if self._pace is None else self._pace(name, interval)
+            with self._wake:
+                if not self._stop.is_set():
+                    self._wake.wait(max(0.0, wait - entry.duration))
+
+    def get(self, name: str) -> Any:
+        """Return the latest value of `name` without blocking."""
+        return self._entries[name].value
+
+    def age(self, name: str) -> Optional[float]:
+        """Seconds since `name` was last refreshed, or None if never."""
+        updated = self._entries[name].updated
+        if not updated:
+            return None
+        return time.monotonic() - updated
+
+    def status(self) -> Dict[str, dict]:
+        """Return age, last refresh duration and error for every source."""
+        now = time.monotonic()
+        result = {}
+        for name, entry in self._entries.items():
+            result[name] = {
+                "age": round(now - entry.updated, 3) if entry.updated else None,
+                "duration": round(entry.duration, 3),
+                "refreshing": self._refreshing[name],
+                "error": entry.error,
+            }
+        return result
+
+
+def format_age(age: Optional[float]) -> str:
+    """Human readable age such as '3s ago' or 'waiting for first sample'."""
+    if age is None:
+        return "waiting for first sample"
+    if age < 60:
+        return f"{age:.0f}s ago"
+    if age < 3600:
+        return f"{age // 60:.0f}m {age % 60:.0f}s ago"
+    return f"{age // 3600:.0f}h {(age % 3600) // 60:.0f}m ago"
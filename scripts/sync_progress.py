@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""Blockchain sync progress from monerod's JSON-RPC `get_info`.
+
+Replaces scraping `screen -X hardcopy` output for "Synced N" and dividing by a
+hardcoded chain height. monerod reports both its own height and the network
+target height, and a sliding window of recent heights gives a blocks/sec rate
+and an ETA.
+
+Shell scripts use the CLI:
+
+    eval "$(python3 scripts/sync_progress.py --format env)"
+    echo "$SYNC_HEIGHT / $SYNC_TARGET ($SYNC_PERCENT%)"
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from typing import Optional
+
+from http_serving import upstream_slot
+
+# monerod's default (unrestricted, loopback-only) RPC port
+MONEROD_RPC_URL = os.environ.get("MONEROD_RPC_URL", "http://127.0.0.1:18081/json_rpc")
+
+
+def rpc_get_info(url: str = MONEROD_RPC_URL, timeout: float = 2.0) -> dict:
+    """Call `get_info` on monerod and return its result, or {} on failure."""
+    body = json.dumps({"jsonrpc": "2.0", "id": "0", "method": "get_info"}).encode()
+    req = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    try:
+        with upstream_slot(timeout) as acquired:
+            if not acquired:
+                return {}
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                data = json.loads(resp.read().decode("utf-8"))
+    except (urllib.error.URLError, json.JSONDecodeError, TimeoutError, OSError):
+        return {}
+    return data.get("result") or {}
+
+
+class SyncProgress:
+    """Cached sync status with a rate-based ETA.
+
+    `poll()` queries monerod at most once per `ttl` seconds; heights seen over
+    the last `window` seconds are used to estimate blocks/sec.
+    """
+
+    def __init__(self, url: str = MONEROD_RPC_URL, ttl: float = 10.0, window: float = 300.0, timeout: float = 2.0) -> None:
+        self.url = url
+        self.ttl = ttl
+        self.window = window
+        self.timeout = timeout
+        self._samples: deque = deque()  # (monotonic time, height)
+        self._last: Optional[dict] = None
+        self._last_fetch = 0.0
+        self._lock = threading.Lock()
+
+    def _rate(self) -> Optional[float]:
+        if len(self._samples) < 2:
+            return None
+        (t0, h0), (t1, h1) = self._samples[0], self._samples[-1]
+        if t1 - t0 <= 0:
+            return None
+        return max(0.0, (h1 - h0) / (t1 - t0))
+
+    def record(self, info: dict, now: float) -> dict:
+        """Fold one `get_info` result into the window and return the status."""
+        if not info:
+            return {"available": False, "height": 0, "target_height": 0, "percent": 0.0,
+                    "remaining": None, "synchronized": False, "blocks_per_sec": None, "eta_seconds": None}
+
+        height = int(info.get("height", 0))
+        # target_height is 0 once monerod considers itself synchronized
+        target = max(int(info.get("target_height", 0)), height)
+        self._samples.append((now, height))
+        while self._samples and now - self._samples[0][0] > self.window:
+            self._samples.popleft()
+
+        remaining = target - height
+        rate = self._rate()
+        eta = None
+        if remaining <= 0:
+            eta = 0.0
+        elif rate:
+            eta = remaining / rate
+        return {
+            "available": True,
+            "height": height,
+            "target_height": target,
+            "percent": round(height * 100 / target, 1) if target else 0.0,
+            "remaining": remaining,
+            "synchronized": bool(info.get("synchronized", remaining <= 0)),
+            "blocks_per_sec": round(rate, 2) if rate is not None else None,
+            "eta_seconds": round(eta) if eta is not None else None,
+        }
+
+    def poll(self) -> dict:
+        """Return the sync status, querying monerod only when the cache expired.
+
+        While one caller is refreshing, concurrent callers get the previous
+        status instead of waiting on the RPC.
+        """
+        expired = self._last is None or time.monotonic() - self._last_fetch >= self.ttl
+        if not expired:
+            return self._last
+        if not self._lock.acquire(blocking=self._last is None):
+            return self._last
+        try:
+            now = time.monotonic()
+            if self._last is None or now - self._last_fetch >= self.ttl:
+                self._last = self.record(rpc_get_info(self.url, self.timeout), now)
+                self._last_fetch = now
+            return self._last
+        finally:
+            self._lock.release()
+
+
+def format_eta(seconds: Optional[float]) -> str:
+    """Render an ETA such as '3h 20m', or 'unknown' without a rate yet."""
+    if seconds is None:
+        return "unknown"
+    seconds = int(seconds)
+    if seconds <= 0:
+        return "done"
+    if seconds >= 86400:
+        return f"{seconds // 86400}d {seconds % 86400 // 3600}h"
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60}m"
+    return f"{seconds // 60}m {seconds % 60}s"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Print monerod sync progress")
+    parser.add_argument("--url", default=MONEROD_RPC_URL, help="monerod JSON-RPC endpoint")
+    parser.add_argument("--format", choices=("text", "env", "json"), default="text")
+    args = parser.parse_args()
+
+    status = SyncProgress(args.url).poll()
+    if args.format == "json":
+        print(json.dumps(status))
+    elif args.format == "env":
+        print(f"SYNC_AVAILABLE={1 if status['available'] else 0}")
+        print(f"SYNC_HEIGHT={status['height']}")
+        print(f"SYNC_TARGET={status['target_height']}")
+        print(f"SYNC_PERCENT={status['percent']}")
+        print(f"SYNC_REMAINING={status['remaining'] or 0}")
+        print(f"SYNC_SYNCHRONIZED={1 if status['synchronized'] else 0}")
+    elif status["available"]:
+        print(f"{status['height']} / {status['target_height']} ({status['percent']}%)")
+    else:
+        print("monerod RPC not reachable")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
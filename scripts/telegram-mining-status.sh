@@ -27,13 +27,30 @@ fetch_json() {
     curl -s "$1" 2>/dev/null || echo "{}"
 }
 
+# Prefer the collector daemon's shared-memory snapshot (scripts/collector.py)
+have_snapshot=0
+if snapshot=$(python3 "$SCRIPT_DIR/shm_snapshot.py" env 2>/dev/null); then
+    eval "$snapshot"
+    have_snapshot=1
+fi
+
 # Check if processes are running
-xmrig_running=$(pgrep -x xmrig > /dev/null && echo "✅ ONLINE" || echo "❌ OFFLINE")
+if [[ $have_snapshot -eq 1 ]]; then
+    xmrig_running=$([[ "$XMRIG_PROC_RUNNING" = "1" ]] && echo "✅ ONLINE" || echo "❌ OFFLINE")
+else
+    xmrig_running=$(pgrep -x xmrig > /dev/null && echo "✅ ONLINE" || echo "❌ OFFLINE")
+fi
 nextgen_running=$(pgrep -x nextgen-miner > /dev/null && echo "✅ ONLINE" || echo "❌ OFFLINE")
 
 # Get system stats
-cpu_usage=$(top -bn1 | grep "Cpu(s)" | sed "s/.*, *\([0-9.]*\)%* id.*/\1/" | awk '{printf "%.1f%%", 100 - $1}')
-mem_stats=$(free -h | grep Mem | awk '{print $3 "/" $2}')
+if [[ $have_snapshot -eq 1 ]]; then
+    cpu_usage=$(printf "%.1f%%" "${HOST_CPU_PERCENT:-0}")
+    mem_stats=$(awk -v used="${HOST_MEM_USED_KB:-0}" -v total="${HOST_MEM_TOTAL_KB:-0}" \
+        'BEGIN {printf "%.1fGi/%.1fGi", used / 1048576, total / 1048576}')
+else
+    cpu_usage=$(top -bn1 | grep "Cpu(s)" | sed "s/.*, *\([0-9.]*\)%* id.*/\1/" | awk '{printf "%.1f%%", 100 - $1}')
+    mem_stats=$(free -h | grep Mem | awk '{print $3 "/" $2}')
+fi
 hostname=$(hostname)
 
 # Get Monero stats from config
@@ -45,7 +62,16 @@ else
 fi
 
 # Fetch Monero stats from MoneroOcean pool
-if [[ "$monero_wallet" != "N/A" ]]; then
+if [[ $have_snapshot -eq 1 ]]; then
+    monero_hashrate=$(printf "%.2f" "${XMRIG_HASHRATE_10S:-0}")
+    # Use pool hashrate if available, otherwise use local
+    if [[ "$POOL_OK" = "1" && -n "$POOL_HASHRATE" && "$POOL_HASHRATE" != "0.0" ]]; then
+        monero_hashrate="$POOL_HASHRATE"
+    fi
+    # Convert from piconero to XMR
+    monero_balance=$(awk -v v="${POOL_AMT_DUE:-0}" 'BEGIN {printf "%.8f", v / 1e12}')
+    monero_paid=$(awk -v v="${POOL_AMT_PAID:-0}" 'BEGIN {printf "%.8f", v / 1e12}')
+elif [[ "$monero_wallet" != "N/A" ]]; then
     # Try XMRig API first for real-time hashrate
     xmrig_api=$(fetch_json "http://127.0.0.1:3001/1/summary" | jq -r --arg token "mining-dashboard" \
         --arg auth "Authorization: Bearer mining-dashboard" '.')
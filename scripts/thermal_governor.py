@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""Thermal governor: trade peak hashrate for sustained hashrate.
+
+When the i7-4790 reaches its throttle point the clocks drop hard and the
+hashrate collapses until the package cools down, then it climbs back and
+heats up again. Fewer mining threads can earn more over an hour than all
+of them in that cycle. The governor watches
+
+- package and core temperatures (coretemp in /sys/class/hwmon),
+- the thermal throttle counters in
+  /sys/devices/system/cpu/cpu*/thermal_throttle/,
+- XMRig's 10s hashrate,
+
+and moves the miner between levels through PUT /2/config. Level 0 is the
+config it found; each level below drops one `cpu.rx` thread (the last one
+listed), or with --knob priority lowers `cpu.priority` by one.
+
+Hysteresis: a level is held for at least `dwell` seconds. It steps down when
+the package reaches `high` or the throttle counters move, and immediately at
+`critical`. It steps back up only once the package is at or below `low` and
+nothing has throttled for `cool_period` seconds. Each level keeps an EWMA of
+the hashrate it sustained (measured after `settle` seconds). If the level
+above sustained less than the current one, it is only re-probed after a
+backoff that doubles each time, so the governor settles on the level with
+the best sustained hashrate rather than the best peak.
+
+Every decision goes to stdout and to a JSON-lines decision log. On exit the
+original config is restored.
+
+    python3 scripts/thermal_governor.py [--high 85 --low 75 --dwell 120]
+    python3 scripts/thermal_governor.py --simulate --hours 6
+"""
+
+import argparse
+import copy
+import json
+import math
+import random
+import signal
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from autotune import REPO_CONFIG, TuneError, XMRigClient
+from miner_api import MONERO_CONFIG, XMRIG_API, XMRIG_TOKEN, rx_entries
+from proc_sampler import read_cpu_temp
+
+DECISION_LOG = MONERO_CONFIG.parent / "thermal-decisions.jsonl"
+INTERVAL = 10.0
+# weight of a new sample in a level's sustained-hashrate EWMA
+EWMA_ALPHA = 0.1
+MAX_BACKOFF = 16
+
+
+class Reading(NamedTuple):
+    package: Optional[float]  # °C
+    cores: Dict[str, float]  # "Core 0" -> °C
+    core_throttles: int  # sum of core_throttle_count over all CPUs
+    package_throttles: int  # package_throttle_count (shared by a package's CPUs)
+
+    @property
+    def hottest(self) -> Optional[float]:
+        values = [t for t in [self.package, *self.cores.values()] if t is not None]
+        return max(values) if values else None
+
+
+class Hysteresis(NamedTuple):
+    high: float = 85.0  # step down at or above (°C)
+    low: float = 75.0  # step up only at or below (°C)
+    critical: float = 95.0  # step down without waiting for the dwell
+    dwell: float = 120.0  # minimum seconds between changes
+    cool_period: float = 300.0  # seconds without throttling before stepping up
+    settle: float = 60.0  # seconds after a change before the hashrate counts
+    margin: float = 0.02  # gain the level above must have shown
+
+
+def _read_int(path: Path) -> Optional[int]:
+    try:
+        return int(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def read_sensors(sys_root: str = "/sys") -> Reading:
+    """coretemp temperatures and thermal throttle counters."""
+    package = None
+    cores = {}
+    for hwmon in Path(sys_root, "class", "hwmon").glob("hwmon*"):
+        try:
+            if (hwmon / "name").read_text().strip() != "coretemp":
+                continue
+        except OSError:
+            continue
+        for label in hwmon.glob("temp*_label"):
+            try:
+                name = label.read_text().strip()
+            except OSError:
+                continue
+            raw = _read_int(label.with_name(label.name.replace("_label", "_input")))
+            if raw is None:
+                continue
+            if name.startswith("Package id"):
+                package = max(package or -math.inf, raw / 1000.0)
+            elif name.startswith("Core"):
+                cores[name] = raw / 1000.0
+    if package is None and not cores:
+        package = read_cpu_temp(sys_root)
+    core_throttles = package_throttles = 0
+    for throttle in Path(sys_root, "devices", "system", "cpu").glob("cpu[0-9]*/thermal_throttle"):
+        core_throttles += _read_int(throttle / "core_throttle_count") or 0
+        package_throttles = max(package_throttles, _read_int(throttle / "package_throttle_count") or 0)
+    return Reading(package, cores, core_throttles, package_throttles)
+
+
+def build_levels(base: dict, knob: str = "threads", min_threads: Optional[int] = None,
+                 profile: str = "rx") -> List[dict]:
+    """Configs from the base (level 0) down to the least aggressive one."""
+    levels = [base]
+    cpu = base.get("cpu", {})
+    if knob == "priority":
+        for priority in range(int(cpu.get("priority", 2) or 0) - 1, -1, -1):
+            level = copy.deepcopy(base)
+            level["cpu"]["priority"] = priority
+            levels.append(level)
+        return levels
+    threads = cpu.get(profile)
+    if not isinstance(threads, list) or not threads:
+        raise ValueError(f"cpu.{profile} is not a thread list; the threads knob needs one")
+    floor = max(1, min_threads if min_threads is not None else len(threads) // 2)
+    for count in range(len(threads) - 1, floor - 1, -1):
+        level = copy.deepcopy(base)
+        level["cpu"][profile] = threads[:count]
+        levels.append(level)
+    return levels
+
+
+class Governor:
+    """Moves the miner between levels; call step() every INTERVAL seconds."""
+
+    def __init__(self, client, sensors: Callable[[], Reading], levels: List[dict],
+                 settings: Hysteresis = Hysteresis(), log_path: Optional[Path] = None,
+                 clock: Callable[[], float] = time.monotonic, wall: Callable[[], float] = time.time,
+                 knob: str = "threads", profile: str = "rx", quiet: bool = False) -> None:
+        self.client = client
+        self.sensors = sensors
+        self.levels = levels
+        self.settings = settings
+        self.log_path = log_path
+        self.clock = clock
+        self.wall = wall
+        self.knob = knob
+        self.profile = profile
+        self.quiet = quiet
+        self.level = 0
+        self.changed_at = clock()
+        self.last_throttle_at = -math.inf
+        self.sustained: Dict[int, float] = {}
+        self.backoff = 1
+        self.probe_at = -math.inf
+        self.decisions: List[dict] = []
+        self._last: Optional[Reading] = None
+
+    def describe(self, level: int) -> str:
+        cpu = self.levels[level].get("cpu", {})
+        if self.knob == "priority":
+            return f"priority {cpu.get('priority')}"
+        return f"{len(rx_entries(cpu.get(self.profile)))} threads"
+
+    def decide(self, action: str, reason: str, reading: Reading, rate: Optional[float], throttles: int) -> dict:
+        record = {
+            "time": round(self.wall(), 1),
+            "action": action,
+            "level": self.level,
+            "setting": self.describe(self.level),
+            "reason": reason,
+            "temp": reading.hottest,
+            "throttle_events": throttles,
+            "hashrate": None if rate is None else round(rate, 1),
+            "sustained": {self.describe(k): round(v, 1) for k, v in sorted(self.sustained.items())},
+        }
+        self.decisions.append(record)
+        if self.log_path is not None:
+            with open(self.log_path, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(record) + "\n")
+        if not self.quiet:
+            stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record["time"]))
+            print(f"[{stamp}] {action}: {record['setting']} ({reason})", flush=True)
+        return record
+
+    def move(self, level: int) -> None:
+        self.client.put_config(self.levels[level])
+        self.level = level
+        self.changed_at = self.clock()
+
+    def step(self) -> Optional[dict]:
+        """Take one sample; returns the decision record when the level changed or is held."""
+        s = self.settings
+        now = self.clock()
+        reading = self.sensors()
+        rate = self.client.hashrate()
+        last, self._last = self._last, reading
+        throttles = 0
+        if last is not None:
+            throttles = max(0, reading.core_throttles - last.core_throttles) + \
+                max(0, reading.package_throttles - last.package_throttles)
+        if throttles:
+            self.last_throttle_at = now
+        since_change = now - self.changed_at
+        if since_change >= s.settle and rate:
+            previous = self.sustained.get(self.level)
+            self.sustained[self.level] = rate if previous is None else previous + EWMA_ALPHA * (rate - previous)
+        temp = reading.hottest
+        if temp is None and not throttles:
+            return None
+        bottom = len(self.levels) - 1
+
+        if self.level < bottom and temp is not None and temp >= s.critical:
+            self.move(self.level + 1)
+            return self.decide("down", f"{temp:.0f}°C is critical", reading, rate, throttles)
+        hot = throttles or (temp is not None and temp >= s.high)
+        if hot and self.level < bottom and since_change >= s.dwell:
+            reason = f"{throttles} throttle events" if throttles else f"{temp:.0f}°C >= {s.high:.0f}°C"
+            self.move(self.level + 1)
+            return self.decide("down", reason, reading, rate, throttles)
+        cool = (temp is not None and temp <= s.low and now - self.last_throttle_at >= s.cool_period)
+        if not (cool and self.level > 0 and since_change >= s.dwell):
+            return None
+        above, here = self.sustained.get(self.level - 1), self.sustained.get(self.level)
+        if above is not None and here is not None and above < here * (1 + s.margin):
+            # the level above did not pay off last time: re-probe after a backoff
+            if now < self.probe_at:
+                return None
+            if self.probe_at == -math.inf or now - self.probe_at > s.dwell * self.backoff:
+                self.probe_at = now + s.dwell * self.backoff
+                self.backoff = min(self.backoff * 2, MAX_BACKOFF)
+                return self.decide("hold", f"{self.describe(self.level - 1)} sustained {above:.0f} H/s "
+                                   f"vs {here:.0f} H/s here; probing again in {s.dwell * self.backoff / 2:.0f}s",
+                                   reading, rate, throttles)
+            self.probe_at = -math.inf
+            self.move(self.level - 1)
+            return self.decide("up", "probe", reading, rate, throttles)
+        if above is not None and here is not None:
+            self.backoff = 1
+        self.move(self.level - 1)
+        return self.decide("up", f"{temp:.0f}°C <= {s.low:.0f}°C, no throttling for {s.cool_period:.0f}s",
+                           reading, rate, throttles)
+
+    def run(self, stop: threading.Event, interval: float = INTERVAL) -> None:
+        try:
+            while not stop.is_set():
+                try:
+                    self.step()
+                except TuneError as exc:
+                    print(f"XMRig API error: {exc}", flush=True)
+                stop.wait(interval)
+        finally:
+            if self.level:
+                self.move(0)
+                if not self.quiet:
+                    print(f"Restored {self.describe(0)}", flush=True)
+
+
+class ThermalSimulation:
+    """A rig on a virtual clock: XMRig API, coretemp and throttle counters.
+
+    The hashrate of a config comes from FakeXMRig.layout_hashrate. Each
+    busy core heats the package towards `ambient + rise * power`, with time
+    constant `tau`; ambient drifts over the day. At `throttle_at` the
+    clocks drop to `throttled_clock` (power and hashrate with them) until
+    the package is `recover` degrees cooler, and the counters advance once
+    per throttled second. Priority has no thermal effect here.
+    """
+
+    def __init__(self, config: dict, ambient: float = 25.0, swing: float = 3.0, rise: float = 14.0,
+                 tau: float = 90.0, throttle_at: float = 85.0, recover: float = 3.0,
+                 throttled_clock: float = 0.55, warmup: float = 10.0, seed: int = 1) -> None:
+        self.config = config
+        self.ambient = ambient
+        self.swing = swing
+        self.rise = rise
+        self.tau = tau
+        self.throttle_at = throttle_at
+        self.recover = recover
+        self.throttled_clock = throttled_clock
+        self.warmup = warmup
+        self.now = 0.0
+        self.temp = ambient
+        self.throttled = False
+        self.throttle_count = 0
+        self.reconfigured = -warmup
+        from standins import FakeXMRig  # the stand-in's layout model; only needed when simulating
+
+        self.model = FakeXMRig()
+        self.random = random.Random(seed)
+
+    def power(self) -> float:
+        busy = {cpu for _, cpu in rx_entries(self.config.get("cpu", {}).get("rx"))}
+        per_core = [sum(1 for cpu in group if cpu in busy) for group in self.model.SIBLINGS]
+        return sum(0.0 if n == 0 else 1.0 + 0.12 * (n - 1) for n in per_core)
+
+    def advance(self, seconds: float) -> None:
+        power = self.power()
+        for _ in range(int(seconds)):
+            self.now += 1.0
+            ambient = self.ambient + self.swing * math.sin(2 * math.pi * self.now / 86400.0)
+            clock = self.throttled_clock if self.throttled else 1.0
+            target = ambient + self.rise * power * clock
+            self.temp += (target - self.temp) / self.tau
+            if self.temp >= self.throttle_at:
+                self.throttled = True
+            elif self.temp <= self.throttle_at - self.recover:
+                self.throttled = False
+            if self.throttled:
+                self.throttle_count += 1
+
+    def clock(self) -> float:
+        return self.now
+
+    def wall(self) -> float:
+        return 1_700_000_000.0 + self.now
+
+    def read(self) -> Reading:
+        cores = {f"Core {i}": round(self.temp - 1.5 * i % 3, 1) for i in range(len(self.model.SIBLINGS))}
+        return Reading(round(self.temp, 1), cores, self.throttle_count, self.throttle_count)
+
+    def hashrate(self) -> Optional[float]:
+        if self.now - self.reconfigured < self.warmup:
+            return None
+        clock = self.throttled_clock if self.throttled else 1.0
+        return self.model.layout_hashrate(self.config) * clock * (1 + self.random.gauss(0.0, 0.01))
+
+    def get_config(self) -> dict:
+        return copy.deepcopy(self.config)
+
+    def put_config(self, config: dict) -> None:
+        self.config = copy.deepcopy(config)
+        self.reconfigured = self.now
+
+
+def simulate(base: dict, hours: float, settings: Hysteresis, governed: bool, knob: str = "threads",
+             min_threads: Optional[int] = None, interval: float = INTERVAL, log_path: Optional[Path] = None) -> dict:
+    """Run the simulated rig for `hours`, with or without the governor."""
+    sim = ThermalSimulation(copy.deepcopy(base))
+    governor = Governor(sim, sim.read, build_levels(base, knob, min_threads), settings, log_path,
+                        clock=sim.clock, wall=sim.wall, knob=knob, quiet=True)
+    total = samples = 0
+    peak = 0.0
+    while sim.now < hours * 3600:
+        sim.advance(interval)
+        if governed:
+            governor.step()
+        rate = sim.hashrate()
+        if rate:
+            total += rate
+            samples += 1
+        peak = max(peak, sim.temp)
+    return {
+        "mean_hashrate": round(total / samples, 1) if samples else 0.0,
+        "max_temp": round(peak, 1),
+        "throttled_seconds": sim.throttle_count,
+        "final": governor.describe(governor.level),
+        "decisions": governor.decisions,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Step XMRig down and up to keep the CPU out of thermal throttling")
+    parser.add_argument("--url", default=XMRIG_API, help="XMRig HTTP API")
+    parser.add_argument("--token", default=XMRIG_TOKEN, help="XMRig access token")
+    parser.add_argument("--knob", choices=("threads", "priority"), default="threads")
+    parser.add_argument("--min-threads", type=int, help="fewest threads to step down to (default: half)")
+    defaults = Hysteresis()
+    for name, help_text in (("high", "step down at this °C"), ("low", "step up only at or below this °C"),
+                            ("critical", "step down immediately at this °C"),
+                            ("dwell", "minimum seconds between changes"),
+                            ("cool-period", "seconds without throttling before stepping up"),
+                            ("settle", "seconds after a change before hashrate counts"),
+                            ("margin", "gain the level above must sustain")):
+        parser.add_argument(f"--{name}", type=float, default=getattr(defaults, name.replace("-", "_")), help=help_text)
+    parser.add_argument("--interval", type=float, default=INTERVAL, help="seconds between samples")
+    parser.add_argument("--log", type=Path, help=f"decision log (default {DECISION_LOG}; none when simulating)")
+    parser.add_argument("--simulate", action="store_true", help="run against a simulated rig on a virtual clock")
+    parser.add_argument("--hours", type=float, default=6.0, help="simulated time")
+    parser.add_argument("--config", type=Path, help="config the simulation starts from")
+    args = parser.parse_args()
+
+    settings = Hysteresis(args.high, args.low, args.critical, args.dwell, args.cool_period, args.settle, args.margin)
+    if args.low >= args.high:
+        parser.error("--low must be below --high")
+
+    if args.simulate:
+        source = args.config or (MONERO_CONFIG if MONERO_CONFIG.exists() else REPO_CONFIG)
+        with source.open("r", encoding="utf-8") as fh:
+            base = json.load(fh)
+        plain = simulate(base, args.hours, settings, False, args.knob, args.min_threads, args.interval)
+        governed = simulate(base, args.hours, settings, True, args.knob, args.min_threads, args.interval, args.log)
+        for record in governed["decisions"]:
+            print(f"  t+{record['time'] - 1_700_000_000:>7.0f}s {record['action']:<4} {record['setting']:<12} "
+                  f"{record['reason']}")
+        for name, result in (("ungoverned", plain), ("governed", governed)):
+            print(f"{name:<10} {result['mean_hashrate']:>8.1f} H/s mean, max {result['max_temp']:.1f}°C, "
+                  f"{result['throttled_seconds']}s throttled, ending at {result['final']}")
+        return
+
+    client = XMRigClient(args.url, args.token)
+    try:
+        levels = build_levels(client.get_config(), args.knob, args.min_threads)
+    except (TuneError, ValueError) as exc:
+        raise SystemExit(f"Cannot start: {exc}")
+    log_path = args.log or DECISION_LOG
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    governor = Governor(client, read_sensors, levels, settings, log_path, knob=args.knob)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stop.set())
+    print(f"Governing {governor.describe(0)} down to {governor.describe(len(levels) - 1)}; "
+          f"decisions in {log_path}")
+    governor.run(stop, args.interval)
+
+
+if __name__ == "__main__":
+    main()
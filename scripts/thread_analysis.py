@@ -0,0 +1,131 @@
+"""Per-thread hashrate analysis over the history window.
+
+XMRig reports a hashrate per mining thread, and with the `cpu.rx` affinity
+layout each thread is pinned to one core. A thread that is throttled or
+sharing its core with something else drags the total down without any
+obvious symptom, so this compares every thread against its siblings:
+
+- mean and variance of each thread over the window,
+- a leave-one-out z-score of its mean against the other threads' means,
+- the fraction of samples in which it ran more than `tolerance` below the
+  median of all threads at that instant; a thread below the median in at
+  least `persistence` of the samples is flagged.
+
+The work is done column-wise on the history's `array` columns with
+`map`/`sum`/`sorted`, so per-sample Python loops are avoided.
+"""
+
+import math
+import operator
+import statistics
+from typing import List, Optional
+
+from history import HashrateHistory
+
+# A thread counts as "below" when under (1 - TOLERANCE) x the sample median
+DEFAULT_TOLERANCE = 0.05
+# ...and is flagged when that holds for at least this fraction of samples
+DEFAULT_PERSISTENCE = 0.8
+# Fewer samples than this are not enough to judge a thread
+MIN_SAMPLES = 12
+
+
+def _clean(values) -> list:
+    """Drop NaN gaps (threads that did not exist yet)."""
+    return [v for v in values if v == v]
+
+
+def loo_zscores(means: List[float]) -> List[Optional[float]]:
+    """z-score of each value against the mean/stdev of the others."""
+    scores = []
+    for i, value in enumerate(means):
+        others = means[:i] + means[i + 1:]
+        if len(others) < 2:
+            scores.append(None)
+            continue
+        stdev = statistics.pstdev(others)
+        mean = statistics.fmean(others)
+        # identical siblings leave the score undefined
+        scores.append(round((value - mean) / stdev, 2) if stdev else None)
+    return scores
+
+
+def analyze_threads(history: HashrateHistory, start: float, end: float, affinity: Optional[List[int]] = None,
+                    tolerance: float = DEFAULT_TOLERANCE, persistence: float = DEFAULT_PERSISTENCE) -> dict:
+    """Per-thread statistics for [start, end); see the module docstring."""
+    with history._lock:  # noqa: SLF001 - one consistent view of all threads
+        columns = [history.thread_column(t, start, end) for t in range(history.threads)]
+    samples = len(columns[0]) if columns else 0
+    # threads that never reported in the window (fewer cores than slots)
+    active = [t for t, col in enumerate(columns) if samples and col[-1] == col[-1]]
+    if samples < MIN_SAMPLES or len(active) < 2:
+        return {"from": start, "to": end, "samples": samples, "threads": [], "flagged": []}
+
+    # per-sample median across threads, then "below median" counts per thread
+    rows = zip(*(columns[t] for t in active))
+    mid = len(active) // 2
+    if len(active) % 2:
+        medians = [row[mid] for row in map(sorted, rows)]
+    else:
+        medians = [(row[mid - 1] + row[mid]) / 2 for row in map(sorted, rows)]
+    thresholds = [m * (1 - tolerance) for m in medians]
+
+    stats = []
+    for t in active:
+        col = columns[t]
+        if sum(col) != sum(col):
+            col = _clean(col)
+        n = len(col)
+        mean = sum(col) / n
+        variance = max(0.0, sum(map(operator.mul, col, col)) / n - mean * mean)
+        below = sum(map(operator.lt, columns[t], thresholds))
+        stats.append({
+            "thread": t,
+            "cpu": affinity[t] if affinity and t < len(affinity) else None,
+            "mean": round(mean, 2),
+            "variance": round(variance, 2),
+            "stdev": round(math.sqrt(variance), 2),
+            "below_median_fraction": round(below / samples, 3),
+        })
+
+    median_of_means = statistics.median(s["mean"] for s in stats)
+    for s, z in zip(stats, loo_zscores([s["mean"] for s in stats])):
+        s["zscore"] = z
+        s["relative"] = round(s["mean"] / median_of_means, 3) if median_of_means else None
+        s["flagged"] = s["below_median_fraction"] >= persistence
+
+    return {
+        "from": start,
+        "to": end,
+        "samples": samples,
+        "median": round(median_of_means, 2),
+        "threads": stats,
+        "flagged": [s["thread"] for s in stats if s["flagged"]],
+    }
+
+
+def heatmap(history: HashrateHistory, start: float, end: float, step: float) -> dict:
+    """Thread x time matrix of mean hashrate, and of each cell relative to
+    the median thread in the same bucket (1.0 = typical)."""
+    down = history.downsample(start, end, step)
+    values = [thread["mean"] for thread in down["threads"]]
+    relative = [[None] * len(down["time"]) for _ in values]
+    for k in range(len(down["time"])):
+        bucket = [row[k] for row in values if row[k] is not None]
+        if not bucket:
+            continue
+        median = statistics.median(bucket)
+        for t, row in enumerate(values):
+            if row[k] is not None and median:
+                relative[t][k] = round(row[k] / median, 3)
+    return {"time": down["time"], "step": step, "hashrate": values, "relative": relative}
+
+
+def alert_text(analysis: dict) -> str:
+    """Human-readable alert for flagged threads, or '' when all is well."""
+    parts = []
+    for s in analysis["threads"]:
+        if s["flagged"]:
+            core = f" (cpu {s['cpu']})" if s["cpu"] is not None else ""
+            parts.append(f"thread {s['thread']}{core} at {s['relative'] * 100:.0f}% of median")
+    return "Underperforming " + ", ".join(parts) if parts else ""
@@ -0,0 +1,183 @@
+"""Hot-path stage timers and an on-demand profiler for the dashboards.
+
+Collector stages are wrapped in `TIMINGS.stage("pool.moneroocean")`; each
+keeps the durations of its last WINDOW runs in a deque, so recording costs
+one perf_counter() pair and an append. `/api/debug/timings` reports rolling
+percentiles per stage.
+
+`/api/debug/profile?seconds=5&mode=sample` runs a profiler and returns the
+sorted stats as text. It is only served when MINER_PROFILING=1 is set in the
+environment. Two modes:
+
+- sample: samples the stacks of every thread (sys._current_frames) every
+  few milliseconds; cheap, and sees the background refresher threads.
+- cprofile: runs the dashboard's collectors back to back under cProfile
+  in the request thread, for deterministic call counts.
+"""
+
+import cProfile
+import functools
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+WINDOW = 512
+PROFILING_ENABLED = os.environ.get("MINER_PROFILING") == "1"
+MAX_PROFILE_SECONDS = 30.0
+SAMPLE_INTERVAL = 0.005
+SORT_KEYS = ("cumulative", "tottime", "ncalls", "name")
+
+
+class StageTimings:
+    """Rolling per-stage durations."""
+
+    def __init__(self, window: int = WINDOW) -> None:
+        self.window = window
+        self._stages: Dict[str, deque] = {}
+        self._counts: Counter = Counter()
+
+    def record(self, name: str, seconds: float) -> None:
+        stage = self._stages.get(name)
+        if stage is None:
+            stage = self._stages.setdefault(name, deque(maxlen=self.window))
+        stage.append(seconds)
+        self._counts[name] += 1
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def timed(self, name: str) -> Callable:
+        """Decorator form of `stage()`."""
+        def wrap(fn: Callable) -> Callable:
+            @functools.wraps(fn)
+            def inner(*args, **kwargs):
+                with self.stage(name):
+                    return fn(*args, **kwargs)
+            return inner
+        return wrap
+
+    def summary(self) -> Dict[str, dict]:
+        """p50/p90/p99/max (ms) over each stage's window, plus lifetime count."""
+        result = {}
+        for name, stage in sorted(self._stages.items()):
+            values = sorted(stage)
+            if not values:
+                continue
+            n = len(values)
+
+            def pct(p: float) -> float:
+                return round(values[min(n - 1, int(p / 100 * n))] * 1000, 3)
+
+            result[name] = {
+                "count": self._counts[name],
+                "window": n,
+                "last_ms": round(stage[-1] * 1000, 3),
+                "mean_ms": round(sum(values) / n * 1000, 3),
+                "p50_ms": pct(50),
+                "p90_ms": pct(90),
+                "p99_ms": pct(99),
+                "max_ms": round(values[-1] * 1000, 3),
+            }
+        return result
+
+
+TIMINGS = StageTimings()
+_profile_lock = threading.Lock()
+
+
+def sample_profile(seconds: float, limit: int = 40, interval: float = SAMPLE_INTERVAL) -> str:
+    """Statistical profile of every other thread for `seconds`."""
+    own = threading.get_ident()
+    names = {t.ident: t.name for t in threading.enumerate()}
+    self_counts: Counter = Counter()
+    cum_counts: Counter = Counter()
+    thread_counts: Counter = Counter()
+    samples = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for ident, frame in sys._current_frames().items():  # noqa: SLF001
+            if ident == own:
+                continue
+            thread_counts[names.get(ident, str(ident))] += 1
+            key = (frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name)
+            self_counts[key] += 1
+            seen = set()
+            while frame is not None:
+                fn = (frame.f_code.co_filename, frame.f_code.co_firstlineno, frame.f_code.co_name)
+                if fn not in seen:
+                    cum_counts[fn] += 1
+                    seen.add(fn)
+                frame = frame.f_back
+        samples += 1
+        time.sleep(interval)
+
+    out = io.StringIO()
+    total = sum(thread_counts.values()) or 1
+    out.write(f"{samples} samples over {seconds:.1f}s, {total} thread stacks\n\n")
+    out.write("Top self (file:line function):\n")
+    for (filename, line, name), count in self_counts.most_common(limit):
+        out.write(f"{count * 100 / total:6.1f}%  {count:6d}  {filename}:{line} {name}\n")
+    out.write("\nTop cumulative (file:line function):\n")
+    for (filename, line, name), count in cum_counts.most_common(limit):
+        out.write(f"{count * 100 / total:6.1f}%  {count:6d}  {filename}:{line} {name}\n")
+    out.write("\nThreads:\n")
+    for name, count in thread_counts.most_common():
+        out.write(f"{count * 100 / total:6.1f}%  {name}\n")
+    return out.getvalue()
+
+
+def cprofile_calls(targets: Dict[str, Callable[[], object]], seconds: float,
+                   sort: str = "cumulative", limit: int = 40) -> str:
+    """Call every target back to back under cProfile for `seconds`."""
+    profiler = cProfile.Profile()
+    rounds = 0
+    deadline = time.monotonic() + seconds
+    profiler.enable()
+    try:
+        while time.monotonic() < deadline:
+            for fn in targets.values():
+                fn()
+            rounds += 1
+    finally:
+        profiler.disable()
+    out = io.StringIO()
+    out.write(f"{rounds} rounds of {', '.join(targets)}\n")
+    pstats.Stats(profiler, stream=out).sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+def run_profile(params: dict, targets: Dict[str, Callable[[], object]]) -> Optional[str]:
+    """Handle /api/debug/profile query parameters; None if one is already running.
+
+    `targets` are the collectors cprofile mode calls. Raises ValueError for
+    bad parameters.
+    """
+    seconds = min(float(params.get("seconds", ["5"])[0]), MAX_PROFILE_SECONDS)
+    if seconds <= 0:
+        raise ValueError("'seconds' must be positive")
+    mode = params.get("mode", ["sample"])[0]
+    limit = int(params.get("limit", ["40"])[0])
+    if mode not in ("sample", "cprofile"):
+        raise ValueError("'mode' must be 'sample' or 'cprofile'")
+    sort = params.get("sort", ["cumulative"])[0]
+    if sort not in SORT_KEYS:
+        raise ValueError(f"'sort' must be one of {', '.join(SORT_KEYS)}")
+    if not _profile_lock.acquire(blocking=False):
+        return None
+    try:
+        if mode == "sample":
+            return sample_profile(seconds, limit)
+        return cprofile_calls(targets, seconds, sort, limit)
+    finally:
+        _profile_lock.release()
@@ -12,17 +12,12 @@ fi
 # Load config
 source "$CONFIG_FILE"
 
-# Get current sync status
-screen -r monerod -X hardcopy /tmp/sync_status.log 2>/dev/null
-CURRENT=$(grep "Synced" /tmp/sync_status.log | tail -1 | grep -oP 'Synced \K[0-9]+' | head -1)
-TOTAL=3536707
-
-if [ -z "$CURRENT" ]; then
-    CURRENT=0
-fi
-
-PERCENT=$(echo "scale=1; $CURRENT * 100 / $TOTAL" | bc)
-REMAINING=$((TOTAL - CURRENT))
+# Get current sync status from monerod's get_info RPC
+eval "$(python3 ~/monero-mining/scripts/sync_progress.py --format env)"
+CURRENT=$SYNC_HEIGHT
+TOTAL=$SYNC_TARGET
+PERCENT=$SYNC_PERCENT
+REMAINING=$SYNC_REMAINING
 
 # Check processes
 MONEROD_OK=$(pgrep -f monerod > /dev/null && echo "Yes" || echo "No")
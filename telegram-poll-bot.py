@@ -1,15 +1,52 @@
 #!/usr/bin/env python3
 """
 Telegram Bot Polling Handler for Mining Status
-Continuously polls for /start and /status commands
+Continuously polls for /start, /status and /overhead commands
+Set MINER_FIRST=1 to run it under SCHED_IDLE with a CPU budget (scripts/miner_first.py)
 """
 import os
+import sys
 import json
-import subprocess
 import time
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from alert_rules import AlertEngine, load_rules
+from earnings import EarningsProjector, PICONERO, format_payout, format_projection
+from fleet import FleetPoller, format_fleet_line, load_rigs
+from hugepages import HugePagesAuditor, format_readiness, summarize
+from miner_api import XMRIG_SUMMARY_URL, fetch_json
+from miner_first import MinerFirst, format_report, xmrig_hashrate
+from moneroocean import MONEROOCEAN
+from process_tracker import ProcessTracker, format_uptime
+from rate_limit import TokenBucket
+from share_stats import WINDOWS as SHARE_WINDOWS, format_window
+from shm_snapshot import SnapshotReader, as_earnings, as_fleet, as_hugepages, as_pool_stats, as_processes, as_sync, as_xmrig_summary
+from single_flight import SingleFlight
+from sync_progress import SyncProgress, format_eta
+
+# PIDs are found once and re-checked cheaply on every /status
+TRACKER = ProcessTracker()
+SYNC = SyncProgress()
+# Published by scripts/collector.py; used instead of polling when fresh
+SNAPSHOT = SnapshotReader()
+# Fleet mode: only when rigs.json lists rigs
+FLEET_RIGS = load_rigs()
+FLEET = FleetPoller(FLEET_RIGS) if FLEET_RIGS else None
+# Huge-pages audit when the collector is not running
+HUGEPAGES = HugePagesAuditor()
+# Priority and CPU budget when MINER_FIRST=1; alerts keep their pace while nobody asks
+MINER = MinerFirst(hashrate=lambda: xmrig_hashrate(SNAPSHOT), always=('alerts',))
+# Earnings from the current hashrate when the collector is not running
+EARNINGS = EarningsProjector()
+# Alert rules are evaluated on every collector sample (published about
+# once a second); without the collector the bot samples every ALERT_INTERVAL
+SAMPLE_POLL = 1
+ALERT_INTERVAL = 60
+
 # Load config
 config_file = Path.home() / "monero-mining" / "telegram.conf"
 config = {}
@@ -24,52 +61,95 @@ if config_file.exists():
 
 BOT_TOKEN = config.get('BOT_TOKEN', '')
 CHAT_ID = config.get('CHAT_ID', '')
+TELEGRAM_API = os.environ.get("TELEGRAM_API", "https://api.telegram.org")
+API_URL = f"{TELEGRAM_API}/bot{BOT_TOKEN}"
+
+# Replies are sent from a small pool over one keep-alive session
+SEND_WORKERS = 8
+SESSION = requests.Session()
+SESSION.mount("https://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=SEND_WORKERS + 1))
+SENDER = ThreadPoolExecutor(max_workers=SEND_WORKERS, thread_name_prefix="send")
+
+# Telegram allows about 1 message/s per chat and 30/s overall
+GLOBAL_LIMIT = TokenBucket(rate=30, burst=30)
+CHAT_LIMITS = {}
+CHAT_LIMITS_LOCK = threading.Lock()
+
+def get_hugepages(snap):
+    """Huge-pages summary from the collector snapshot, or audited here"""
+    hugepages = as_hugepages(snap) if snap else None
+    return hugepages or summarize(HUGEPAGES.audit(TRACKER.poll()['xmrig']))
 
 def get_mining_status():
     """Get current mining status"""
     try:
-        xmrig = subprocess.run(['pgrep', '-f', 'xmrig'], capture_output=True).returncode == 0
+        snap = SNAPSHOT.read()
+        procs = as_processes(snap) if snap else TRACKER.poll()
+        xmrig = procs['xmrig']['running']
         xmrig_str = "✅ ONLINE" if xmrig else "❌ OFFLINE"
+        if xmrig:
+            xmrig_str += f" (up {format_uptime(procs['xmrig']['uptime'])})"
         
         # Get hashrate and pool info from XMRig API
         hashrate = "N/A"
+        hr = None
         pool = "Unknown"
         shares = "0"
         balance = "0"
         
-        try:
-            import urllib.request
-            req = urllib.request.Request("http://127.0.0.1:3001/1/summary")
-            req.add_header("Authorization", "Bearer mining-dashboard")
-            with urllib.request.urlopen(req, timeout=3) as response:
-                data = json.loads(response.read().decode())
-                hr = data.get('hashrate', {}).get('total', [0])[0]
-                hashrate = f"{hr:.1f} H/s" if hr else "N/A"
-                pool_url = data.get('connection', {}).get('pool', '')
-                if 'moneroocean' in pool_url.lower():
-                    pool = "MoneroOcean"
-                shares = str(data.get('results', {}).get('shares_good', 0))
-        except:
-            pass
-        
-        # Get balance from MoneroOcean
-        try:
+        if snap:
+            # the collector daemon already polled XMRig and MoneroOcean
+            data, pool_data = as_xmrig_summary(snap), as_pool_stats(snap)
+        else:
+            data = fetch_json(XMRIG_SUMMARY_URL, timeout=3)
+            
+            # Get balance from MoneroOcean (cached; last good value during outages)
             wallet = "49KKJwFdsu2SVtXSKQ3XDe2Ly2qsnjniFZhSyCQHiw7rMZo5VUzEy3YWueLK5siepaWpRKzL8vxVT9Dkbpok3kv62EdzT8c"
-            resp = requests.get(f"https://api.moneroocean.stream/miner/{wallet}/stats", timeout=3)
-            if resp.status_code == 200:
-                pool_data = resp.json()
-                balance_val = float(pool_data.get('amtDue', 0)) / 1e12
-                balance = f"{balance_val:.6f} XMR"
-        except:
-            pass
+            pool_data = MONEROOCEAN.miner_stats(wallet)
+        
+        if data:
+            hr = data.get('hashrate', {}).get('total', [0])[0]
+            hashrate = f"{hr:.1f} H/s" if hr else "N/A"
+            pool_url = data.get('connection', {}).get('pool', '')
+            if 'moneroocean' in pool_url.lower():
+                pool = "MoneroOcean"
+            shares = str(data.get('results', {}).get('shares_good', 0))
+        if pool_data:
+            balance_val = float(pool_data.get('amtDue', 0)) / 1e12
+            balance = f"{balance_val:.6f} XMR"
         
         msg = f"⛏️ *MONERO MINING STATUS*\n\n"
         msg += f"*XMRig Miner:* {xmrig_str}\n"
         msg += f"*Pool:* {pool} (0% fee)\n"
         msg += f"*Hashrate:* {hashrate}\n"
         msg += f"*Shares:* {shares} accepted\n"
+        if snap and snap['xmrig']['ok']:
+            # rolling windows from the collector, so recent rejects and ping spikes show
+            for window in SHARE_WINDOWS:
+                msg += f"*Shares {window}:* {format_window(snap['shares'][window])}\n"
         msg += f"*Balance:* {balance}\n"
-        msg += f"*Min Payout:* 0.003 XMR\n\n"
+        msg += f"*Min Payout:* 0.003 XMR\n"
+        earnings = (as_earnings(snap) if snap else None) or \
+            EARNINGS.project(float((pool_data or {}).get('amtDue', 0) or 0) / PICONERO, hr)
+        msg += f"*Projected:* {format_projection(earnings)}\n"
+        msg += f"*Next Payout:* {format_payout(earnings)}\n"
+        sync = as_sync(snap) if snap else SYNC.poll()
+        if sync['available']:
+            msg += f"*Node Sync:* {sync['percent']}% ({sync['height']}/{sync['target_height']})"
+            if not sync['synchronized']:
+                msg += f", ETA {format_eta(sync['eta_seconds'])}"
+            msg += "\n"
+        if FLEET:
+            fleet = (as_fleet(snap) if snap else None) or FLEET.poll()
+            msg += f"*Fleet:* {format_fleet_line(fleet)}\n"
+            down = [rig['name'] for rig in fleet['rigs'] if not rig['ok']]
+            if down:
+                msg += f"*Down:* {', '.join(down[:10])}" + (f" (+{len(down) - 10} more)" if len(down) > 10 else "") + "\n"
+        hugepages = get_hugepages(snap)
+        msg += f"*Huge Pages:* {format_readiness(hugepages)}\n"
+        if hugepages['alert']:
+            msg += f"⚠️ {hugepages['alert']}\n"
+        msg += f"*Restarts:* xmrig {procs['xmrig']['restarts']}, monerod {procs['monerod']['restarts']}, p2pool {procs['p2pool']['restarts']}\n\n"
         
         if xmrig:
             msg += "⚡ *STATUS: ACTIVELY MINING*"
@@ -80,45 +160,100 @@ def get_mining_status():
     except Exception as e:
         return f"⚠️ Error getting status: {str(e)}"
 
+# Every /status within 2 s shares one status computation
+current_status = SingleFlight(get_mining_status, window=2.0)
+
+def chat_limit(chat_id):
+    with CHAT_LIMITS_LOCK:
+        if chat_id not in CHAT_LIMITS:
+            CHAT_LIMITS[chat_id] = TokenBucket(rate=1, burst=1)
+        return CHAT_LIMITS[chat_id]
+
 def send_message(chat_id, text):
-    """Send message to Telegram"""
+    """Send message to Telegram, waiting for the per-chat and global limits"""
     try:
-        url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
+        chat_limit(chat_id).acquire()
+        GLOBAL_LIMIT.acquire()
         data = {
             'chat_id': chat_id,
             'text': text,
             'parse_mode': 'Markdown'
         }
-        resp = requests.post(url, data=data, timeout=5)
+        resp = SESSION.post(f"{API_URL}/sendMessage", data=data, timeout=5)
+        if resp.status_code == 429:
+            # flood control: honour retry_after once
+            retry = resp.json().get('parameters', {}).get('retry_after', 1)
+            time.sleep(retry)
+            resp = SESSION.post(f"{API_URL}/sendMessage", data=data, timeout=5)
         return resp.status_code == 200
     except Exception as e:
         print(f"Error sending message: {e}")
         return False
 
+def reply_status(chat_id):
+    """Build (or reuse) the status and send it; runs on the SENDER pool"""
+    if send_message(chat_id, current_status()):
+        print(f"[{time.strftime('%H:%M:%S')}] ✅ Status sent to {chat_id}")
+    else:
+        print(f"[{time.strftime('%H:%M:%S')}] ❌ Failed to send to {chat_id}")
+
+def local_sample():
+    """The snapshot fields the alert rules use, polled here when the collector is down"""
+    data = fetch_json(XMRIG_SUMMARY_URL, timeout=3)
+    total = (data or {}).get('hashrate', {}).get('total') or []
+    return {
+        'xmrig_proc': {'running': TRACKER.poll()['xmrig']['running']},
+        'xmrig': {'ok': bool(data), 'hashrate_60s': total[1] if len(total) > 1 else None},
+        'sync': SYNC.poll(),
+        'hugepages': get_hugepages(None),
+    }
+
+def notify_chat(text):
+    """Alert delivery; queued on the SENDER pool so rule evaluation never waits"""
+    print(f"[{time.strftime('%H:%M:%S')}] {text}")
+    if CHAT_ID:
+        SENDER.submit(send_message, CHAT_ID, text)
+
+def watch_alerts():
+    """Evaluate the alert rules on each new collector sample and push changes to CHAT_ID"""
+    engine = AlertEngine(load_rules(), notify=notify_chat)
+    last_seq = None
+    while True:
+        interval = SAMPLE_POLL
+        try:
+            snap = SNAPSHOT.read()
+            if snap is None:
+                engine.evaluate(local_sample())
+                interval = ALERT_INTERVAL
+            elif snap['seq'] != last_seq:
+                last_seq = snap['seq']
+                engine.evaluate(snap)
+        except Exception as e:
+            print(f"[{time.strftime('%H:%M:%S')}] Alert check failed: {e}")
+        time.sleep(MINER.pace('alerts', interval))
+
 def poll_updates():
     """Poll for new messages"""
     offset = 0
     # On first start, clear the backlog
-    url_init = f"https://api.telegram.org/bot{BOT_TOKEN}/getUpdates"
     try:
-        resp = requests.get(url_init, params={'limit': 1}, timeout=5)
+        resp = SESSION.get(f"{API_URL}/getUpdates", params={'limit': 1}, timeout=5)
         if resp.json().get('result'):
             offset = resp.json()['result'][-1]['update_id'] + 1
     except:
         pass
     
-    print(f"🤖 Bot ready! Listening for /start and /status commands...")
+    print(f"🤖 Bot ready! Listening for /start, /status and /overhead commands...")
     
     while True:
         try:
-            url = f"https://api.telegram.org/bot{BOT_TOKEN}/getUpdates"
             params = {
                 'offset': offset,
                 'timeout': 30,
                 'allowed_updates': ['message']
             }
             
-            resp = requests.get(url, params=params, timeout=35)
+            resp = SESSION.get(f"{API_URL}/getUpdates", params=params, timeout=35)
             updates = resp.json()
             
             if updates.get('ok'):
@@ -132,14 +267,16 @@ def poll_updates():
                         
                         if text in ['/start', '/status']:
                             print(f"[{time.strftime('%H:%M:%S')}] Received: {text} from {chat_id}")
-                            status = get_mining_status()
-                            if send_message(chat_id, status):
-                                print(f"[{time.strftime('%H:%M:%S')}] ✅ Status sent!")
-                            else:
-                                print(f"[{time.strftime('%H:%M:%S')}] ❌ Failed to send")
+                            MINER.touch()
+                            # one reply per command; SingleFlight shares the status between them
+                            SENDER.submit(reply_status, chat_id)
+                        elif text == '/overhead':
+                            MINER.touch()
+                            SENDER.submit(send_message, chat_id, f"📉 *MONITORING OVERHEAD*\n\n```\n{format_report(MINER.report())}\n```")
         
         except KeyboardInterrupt:
             print("\nShutting down...")
+            SENDER.shutdown(wait=True)
             break
         except Exception as e:
             print(f"[{time.strftime('%H:%M:%S')}] Error: {e}")
@@ -147,4 +284,7 @@ def poll_updates():
 
 if __name__ == '__main__':
     print("🤖 Telegram Mining Bot polling started...")
+    # before any thread starts: they inherit the scheduling policy
+    MINER.start()
+    threading.Thread(target=watch_alerts, name="alerts", daemon=True).start()
     poll_updates()
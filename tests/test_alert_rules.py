@@ -0,0 +1,110 @@
+"""AlertEngine rule evaluation and message formatting."""
+
+import json
+import re
+
+import pytest
+
+from alert_rules import DEFAULT_RULES, AlertEngine, Rule, escape_markdown, load_rules
+
+
+def well_formed(text: str) -> bool:
+    """Whether Telegram's legacy Markdown can parse `text`: every entity closed."""
+    plain = re.sub(r"\\.", "", text)
+    return "[" not in plain and all(plain.count(char) % 2 == 0 for char in "_*`")
+
+
+def kinds(events) -> list:
+    return [event.kind for event in events]
+
+
+@pytest.mark.parametrize("rule", DEFAULT_RULES, ids=lambda rule: rule.name)
+def test_default_rule_messages_are_valid_markdown(rule):
+    engine = AlertEngine([rule._replace(metric="flag", op="true", for_=0.0, requires=None, unless=None)])
+    firing = engine.evaluate({"flag": 1.0}, now=0.0)
+    resolved = engine.evaluate({"flag": False}, now=60.0)
+    assert kinds(firing) == ["firing"] and kinds(resolved) == ["resolved"]
+    assert well_formed(firing[0].text) and well_formed(resolved[0].text)
+    assert rule.name.replace("_", "\\_") in resolved[0].text
+
+
+def test_default_message_escapes_name_metric_and_value():
+    engine = AlertEngine([Rule("disk_full", "host.mount_point", "true")])
+    event, = engine.evaluate({"host": {"mount_point": "/var/lib_monero"}}, now=0.0)
+    assert event.text == "⚠️ *ALERT* disk\\_full: host.mount\\_point is /var/lib\\_monero"
+    assert escape_markdown(1.5) == 1.5
+
+
+def test_fires_after_for_and_resolves_once():
+    engine = AlertEngine([Rule("hot", "temp", ">", 80.0, for_=60.0, message="{current:.0f}°C for {duration}")])
+    assert engine.evaluate({"temp": 85.0}, now=0.0) == []
+    assert engine.evaluate({"temp": 79.0}, now=30.0) == []  # the condition restarts
+    assert engine.evaluate({"temp": 85.0}, now=40.0) == []
+    event, = engine.evaluate({"temp": 90.0}, now=100.0)
+    assert event.text == "⚠️ *ALERT* 90°C for 60s"
+    assert engine.evaluate({"temp": 91.0}, now=110.0) == []  # de-duplicated while firing
+    assert engine.status()["hot"]["firing"]
+    event, = engine.evaluate({"temp": 70.0}, now=200.0)
+    assert event.text == "✅ *RESOLVED* hot after 2 min"
+    assert engine.evaluate({"temp": None}, now=210.0) == []
+
+
+def test_cooldown_suppresses_refiring_and_its_resolve():
+    notified = []
+    engine = AlertEngine([Rule("flap", "down", "true", cooldown=600.0)], notify=notified.append)
+    assert kinds(engine.evaluate({"down": True}, now=0.0)) == ["firing"]
+    assert kinds(engine.evaluate({"down": False}, now=10.0)) == ["resolved"]
+    assert engine.evaluate({"down": True}, now=20.0) == []
+    assert engine.evaluate({"down": False}, now=30.0) == []
+    assert kinds(engine.evaluate({"down": True}, now=700.0)) == ["firing"]
+    assert len(notified) == 3
+
+
+def test_requires_and_unless_leave_the_state_untouched():
+    rule = Rule("stalled", "height", "unchanged", for_=100.0, requires="available", unless="synced")
+    engine = AlertEngine([rule])
+    assert engine.evaluate({"available": True, "height": 5}, now=0.0) == []
+    assert engine.evaluate({"available": True, "height": 5}, now=50.0) == []
+    # skipped samples neither fire nor reset the running condition
+    assert engine.evaluate({"available": False, "height": 5}, now=120.0) == []
+    assert engine.evaluate({"available": True, "synced": True, "height": 5}, now=130.0) == []
+    assert kinds(engine.evaluate({"available": True, "height": 5}, now=150.0)) == ["firing"]
+    assert kinds(engine.evaluate({"available": True, "height": 6}, now=160.0)) == ["resolved"]
+
+
+def test_below_ewma_waits_for_warmup():
+    engine = AlertEngine([Rule("drop", "rate", "below_ewma", 0.8, tau=600.0, warmup=300.0,
+                               message="{current:.0f} vs {ewma:.0f}")])
+    for t in range(0, 300, 10):
+        engine.evaluate({"rate": 1000.0 if t < 200 else 500.0}, now=float(t))
+    event, = engine.evaluate({"rate": 500.0}, now=300.0)
+    assert event.text.startswith("⚠️ *ALERT* 500 vs ")
+
+
+def test_load_rules(tmp_path):
+    path = tmp_path / "alert-rules.json"
+    assert load_rules(path) is DEFAULT_RULES
+    path.write_text(json.dumps([{"name": "hot", "metric": "temp", "op": ">", "value": 80, "for": 60}]))
+    assert load_rules(path) == (Rule("hot", "temp", ">", 80, for_=60),)
+    path.write_text(json.dumps([{"name": "bad", "metric": "temp", "op": "above"}]))
+    with pytest.raises(ValueError):
+        load_rules(path)
+
+
+def test_pool_api_down_fires_when_the_pool_was_never_reached():
+    engine = AlertEngine([rule for rule in DEFAULT_RULES if rule.name == "pool_api_down"])
+    assert engine.evaluate({}, now=0.0) == []  # no collector: no pool entry, nothing to judge
+    down = {"pool": {"ok": False, "age": None}}
+    assert engine.evaluate(down, now=0.0) == []
+    assert engine.evaluate(down, now=900.0) == []
+    event, = engine.evaluate(down, now=960.0)
+    assert event.text == "⚠️ *ALERT* MoneroOcean API unreachable: no fresh pool stats for 16 min"
+    assert kinds(engine.evaluate({"pool": {"ok": True, "age": 1.0}}, now=970.0)) == ["resolved"]
+
+
+def test_pool_api_down_fires_on_stats_gone_stale():
+    engine = AlertEngine([rule for rule in DEFAULT_RULES if rule.name == "pool_api_down"])
+    assert engine.evaluate({"pool": {"ok": True, "age": 30.0}}, now=0.0) == []
+    assert engine.evaluate({"pool": {"ok": False, "age": 900.0}}, now=870.0) == []
+    event, = engine.evaluate({"pool": {"ok": False, "age": 1830.0}}, now=1800.0)
+    assert event.text.endswith("no fresh pool stats for 30 min")
@@ -0,0 +1,78 @@
+"""Autotuner decisions against the FakeXMRig stand-in's layout model."""
+
+import pytest
+
+from autotune import Autotuner, Candidate, Settings, XMRigClient, apply_candidate
+from standins import FakeXMRig, serve
+
+SETTINGS = Settings(interval=0.01, window=3, max_samples=20, warmup_timeout=2.0)
+GRID = dict(threads=[4, 8], layouts=["cores", "sequential", "unpinned"], intensities=[1], prefetch=[1, 2])
+
+
+def base_config(candidate: Candidate) -> dict:
+    return apply_candidate({"cpu": {"enabled": True}, "randomx": {}}, candidate, FakeXMRig.SIBLINGS)
+
+
+@pytest.fixture
+def miner():
+    def start(config: dict, noise: float = 0.0):
+        fake = FakeXMRig(config=config, warmup=0.0, settle=0.0, noise=noise)
+        server = servers.append(serve(fake)) or servers[-1]
+        return fake, XMRigClient(f"http://127.0.0.1:{server.server_port}", fake.token)
+
+    servers = []
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_staged_search_applies_the_fastest_layout(miner):
+    base = base_config(Candidate(4, "unpinned", 1, 0))
+    fake, client = miner(base)
+    tuner = Autotuner(client, base, FakeXMRig.SIBLINGS, SETTINGS, results_log=None)
+    result = tuner.run(**GRID)
+
+    # one thread per physical core fits the 8 MB L3; prefetch mode 2 is the fastest
+    assert result["best"] == Candidate(4, "cores", 1, 2)._asdict()
+    assert result["applied"]
+    assert result["rx"] == [[1, 0], [1, 1], [1, 2], [1, 3]]
+    assert fake.config == result["config"]
+    expected = fake.layout_hashrate(result["config"])
+    assert result["hashrate"] == pytest.approx(expected, rel=0.01)
+    assert result["gain"] > 0.05
+    # sequential pins the same CPUs as cores at 4 and 8 threads; neither is measured twice
+    assert result["measured"] == 4 + 1
+
+
+def test_original_config_is_kept_without_enough_gain(miner):
+    base = base_config(Candidate(4, "cores", 1, 2))
+    fake, client = miner(base)
+    tuner = Autotuner(client, base, FakeXMRig.SIBLINGS, SETTINGS._replace(min_gain=0.01), results_log=None)
+    result = tuner.run(**GRID)
+
+    assert result["best"] is None and not result["applied"]
+    assert fake.config == base
+
+
+def test_measure_needs_a_window_within_tolerance(miner):
+    base = base_config(Candidate(4, "cores", 1, 1))
+    fake, client = miner(base, noise=0.2)
+    tuner = Autotuner(client, base, FakeXMRig.SIBLINGS, SETTINGS, results_log=None)
+    result = tuner.measure(base, 5)
+    assert result["status"] == "unstable" and result["samples"] == SETTINGS.max_samples
+
+    fake.noise = 0.0
+    result = tuner.measure(base, 5)
+    assert result["status"] == "stable" and result["samples"] == 5
+
+
+def test_clearly_slower_candidate_is_pruned(miner):
+    base = base_config(Candidate(4, "cores", 1, 1))
+    fake, client = miner(base)
+    tuner = Autotuner(client, base, FakeXMRig.SIBLINGS, SETTINGS._replace(window=4), results_log=None)
+    tuner.evaluate("baseline", "current config", base)
+    slow = base_config(Candidate(8, "unpinned", 1, 0))
+    record = tuner.evaluate("layout", "slow", slow)
+    assert record["status"] == "pruned" and record["samples"] == 2
+    assert tuner.best == pytest.approx(fake.layout_hashrate(base))
@@ -0,0 +1,81 @@
+"""FleetPoller against FakeXMRig stand-ins."""
+
+import json
+import threading
+import time
+
+import pytest
+
+from fleet import FleetPoller, Rig, format_fleet_line, load_rigs
+from standins import FakeXMRig, serve
+
+DEADLINE = 0.3
+
+
+@pytest.fixture
+def fleet():
+    fakes = [
+        FakeXMRig("rig-up", hashrate=4000.0),
+        FakeXMRig("rig-up-2", hashrate=5000.0),
+        FakeXMRig("rig-down"),
+        FakeXMRig("rig-slow", latency=DEADLINE * 4),
+        FakeXMRig("rig-locked", token="other-token"),
+    ]
+    fakes[2].down = True
+    servers = [serve(fake) for fake in fakes]
+    rigs = [Rig(fake.name, f"http://127.0.0.1:{server.server_port}", "mining-dashboard")
+            for fake, server in zip(fakes, servers)]
+    poller = FleetPoller(rigs, deadline=DEADLINE)
+    yield poller, fakes
+    poller.close()
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_load_rigs(tmp_path):
+    path = tmp_path / "rigs.json"
+    assert load_rigs(path) == []
+    path.write_text("not json")
+    assert load_rigs(path) == []
+    path.write_text(json.dumps([
+        {"name": "a", "url": "http://10.0.0.11:3001/", "token": "t"},
+        {"url": "http://10.0.0.12:3001"},
+        {"name": "no-url"},
+    ]))
+    rigs = load_rigs(path)
+    assert rigs[0] == Rig("a", "http://10.0.0.11:3001", "t")
+    assert [rig.name for rig in rigs] == ["a", "rig-2"]
+
+
+def test_down_slow_and_unauthorized_rigs_are_reported_at_the_deadline(fleet):
+    poller, _ = fleet
+    result = poller.poll()
+    rigs = {rig["name"]: rig for rig in result["rigs"]}
+    assert [rig["name"] for rig in result["rigs"]] == [rig.name for rig in poller.rigs]
+    assert rigs["rig-up"]["ok"] and rigs["rig-up"]["hashrate_60s"] == 4000.0
+    assert rigs["rig-down"]["error"] == "HTTP 503"
+    # whichever comes first: the poll deadline or the socket timeout it also sets
+    assert rigs["rig-slow"]["error"] in ("timeout", "TimeoutError")
+    assert rigs["rig-locked"]["error"] == "HTTP 401"
+    # totals only count the rigs that answered
+    assert (result["count"], result["online"], result["hashrate_60s"]) == (5, 2, 9000.0)
+    assert format_fleet_line(result).startswith("2/5 rigs online, ")
+
+
+def test_outstanding_request_is_skipped_and_connections_are_reused(fleet):
+    poller, fakes = fleet
+    first = threading.Thread(target=poller.poll)
+    first.start()
+    time.sleep(DEADLINE / 3)
+    result = poller.poll()
+    first.join()
+    rigs = {rig["name"]: rig for rig in result["rigs"]}
+    # the slow rig's request from the concurrent poll is still running: not queued twice
+    assert rigs["rig-slow"]["error"] == "busy"
+    assert rigs["rig-up"]["ok"] and fakes[3].requests == 1
+
+    conn = poller._connections["rig-up"]
+    time.sleep(DEADLINE)
+    assert poller.poll()["online"] == 2
+    assert poller._connections["rig-up"] is conn and fakes[0].requests == 3
@@ -0,0 +1,62 @@
+"""HashrateHistory ring buffers and downsampling."""
+
+import math
+
+import pytest
+
+from history import HashrateHistory, parse_summary
+
+
+def filled(history: HashrateHistory, samples: int, interval: float = 5.0) -> HashrateHistory:
+    for i in range(samples):
+        history.append(i * interval, 1000.0 + i, [100.0 + i, 200.0 + i], i, 0, None if i % 2 else 50.0)
+    return history
+
+
+def test_default_footprint_stays_under_four_megabytes():
+    assert HashrateHistory().memory_bytes() < 4_000_000
+    assert HashrateHistory(threads=0).thread_capacity == 0
+
+
+def test_ring_keeps_the_newest_samples_in_order():
+    history = filled(HashrateHistory(retention=50.0, interval=5.0, threads=2), 25)
+    assert history.count == history.capacity == 10
+    assert list(history.column("time", 0.0, 1e9)) == [i * 5.0 for i in range(15, 25)]
+    assert list(history.column("accepted", 100.0, 110.0)) == [20, 21]
+    assert history.span() == (75.0, 120.0)
+
+
+def test_thread_columns_keep_a_shorter_window():
+    history = filled(HashrateHistory(retention=100.0, interval=5.0, threads=2, thread_retention=25.0), 30)
+    assert len(history.column("hashrate", 0.0, 1e9)) == 20
+    assert list(history.thread_time_column(0.0, 1e9)) == [125.0, 130.0, 135.0, 140.0, 145.0]
+    assert list(history.thread_column(1, 0.0, 1e9)) == [225.0, 226.0, 227.0, 228.0, 229.0]
+    # a missing thread is a NaN gap
+    history.append(150.0, 1.0, [1.0], 0, 0, None)
+    assert math.isnan(history.thread_column(1, 150.0, 151.0)[0])
+
+
+def test_downsample_buckets_scalar_and_thread_columns_separately():
+    history = filled(HashrateHistory(retention=100.0, interval=5.0, threads=2, thread_retention=20.0), 20)
+    down = history.downsample(50.0, 100.0, 25.0)
+    assert down["time"] == [50.0, 75.0] and down["samples"] == [5, 5]
+    assert down["columns"]["hashrate"] == {"min": [1010.0, 1015.0], "mean": [1012.0, 1017.0],
+                                           "max": [1014.0, 1019.0]}
+    # only every other sample has a temperature; the NaN gaps are skipped
+    assert down["columns"]["cpu_temp"]["mean"] == [50.0, 50.0]
+    # thread rows only reach back 20 s: the first bucket has none
+    assert down["threads"][0] == {"min": [None, 116.0], "mean": [None, 117.5], "max": [None, 119.0]}
+
+
+def test_parse_summary():
+    summary = {"hashrate": {"total": [4500.0, None], "threads": [[2250.0], None]},
+               "results": {"shares_good": 9, "shares_total": 10}}
+    assert parse_summary(summary) == (4500.0, [2250.0, 0.0], 9, 1)
+    assert parse_summary({}) is None
+
+
+@pytest.mark.parametrize("threads", [0, 8])
+def test_append_without_thread_rates(threads):
+    history = HashrateHistory(retention=60.0, interval=5.0, threads=threads)
+    history.append(0.0, 10.0, (), 0, 0, None)
+    assert history.count == 1 and len(history.thread_time_column(0.0, 1.0)) == (1 if threads else 0)
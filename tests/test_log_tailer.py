@@ -0,0 +1,93 @@
+"""LogTailer: partial lines, rotation, truncation and persisted offsets."""
+
+import os
+
+from log_tailer import LogTailer
+
+JOB = b"[2024-05-01 12:00:00.000]  net      new job from gulf.moneroocean.stream:10128 diff 120000 algo rx/0 height 1\n"
+SPEED = b"[2024-05-01 12:00:01.000]  miner    speed 10s/60s/15m 4500.0 4400.0 n/a H/s max 4600.0 H/s\n"
+STARTUP = b" * ABOUT        XMRig/6.21.0 gcc/11.4.0\n"
+
+
+def share(good: int, bad: int, accepted: bool = True) -> bytes:
+    kind = "accepted" if accepted else "rejected"
+    return f"[2024-05-01 12:00:02.000]  cpu      {kind} ({good}/{bad}) diff 120000 (42 ms)\n".encode()
+
+
+def append(path, data: bytes) -> None:
+    with open(path, "ab") as fh:
+        fh.write(data)
+
+
+def test_only_complete_lines_are_consumed(tmp_path):
+    log = tmp_path / "xmrig.log"
+    log.write_bytes(JOB + SPEED + share(1, 0)[:20])
+    tailer = LogTailer(log)
+    assert tailer.poll() == len(JOB + SPEED)
+    assert tailer.stats.jobs == 1 and tailer.stats.hashrate == [4500.0, 4400.0, None, 4600.0]
+    assert tailer.stats.accepted == 0
+    append(log, share(1, 0)[20:] + share(2, 0) + share(2, 1, accepted=False))
+    tailer.poll()
+    stats = tailer.snapshot()
+    assert (stats["accepted"], stats["rejected"]) == (2, 1)
+    assert stats["last_share"] == {"accepted": 2, "rejected": 0, "diff": 120000, "latency_ms": 42}
+    assert stats["offset"] == log.stat().st_size
+
+
+def test_share_totals_follow_the_miner_counters_across_a_restart(tmp_path):
+    log = tmp_path / "xmrig.log"
+    log.write_bytes(share(5, 0))
+    tailer = LogTailer(log)
+    tailer.poll()
+    append(log, share(8, 0))
+    tailer.poll()
+    assert tailer.stats.accepted == 1 + 3
+    append(log, STARTUP + share(1, 0) + share(2, 0))
+    tailer.poll()
+    assert tailer.stats.accepted == 4 + 2
+
+
+def test_rotation_finishes_the_old_file_first(tmp_path):
+    log = tmp_path / "xmrig.log"
+    log.write_bytes(JOB)
+    tailer = LogTailer(log)
+    tailer.poll()
+    append(log, JOB)  # written just before the rotation
+    os.rename(log, tmp_path / "xmrig.log.1")
+    log.write_bytes(JOB + JOB)
+    tailer.poll()
+    assert tailer.stats.jobs == 4 and tailer.rotations == 1
+    assert tailer.offset == len(JOB) * 2
+
+
+def test_copytruncate_rereads_from_the_start(tmp_path):
+    log = tmp_path / "xmrig.log"
+    log.write_bytes(JOB * 3)
+    tailer = LogTailer(log)
+    tailer.poll()
+    with open(log, "r+b") as fh:
+        fh.truncate(0)
+    append(log, JOB)
+    tailer.poll()
+    assert tailer.stats.jobs == 4 and tailer.offset == len(JOB) and tailer.rotations == 0
+
+
+def test_offset_and_counters_survive_a_restart(tmp_path):
+    log = tmp_path / "xmrig.log"
+    state = tmp_path / "offset.json"
+    log.write_bytes(JOB + share(1, 0))
+    first = LogTailer(log, state)
+    first.poll()
+    first.save_state()
+
+    append(log, share(2, 0))
+    second = LogTailer(log, state)
+    assert second.poll() == len(share(2, 0))
+    assert second.stats.jobs == 1 and second.stats.accepted == 2
+
+    # a different file at the path: the saved offset does not apply
+    os.rename(log, tmp_path / "xmrig.log.1")
+    log.write_bytes(JOB)
+    third = LogTailer(log, state)
+    third.poll()
+    assert third.stats.jobs == 2 and third.rotations == 1
@@ -0,0 +1,106 @@
+"""MoneroOceanClient against the FakeMoneroOcean stand-in."""
+
+import pytest
+
+import moneroocean
+from moneroocean import MoneroOceanClient
+from standins import FakeMoneroOcean, serve
+
+PATH = "/miner/wallet/stats"
+
+
+class Clock:
+    """Stands in for the `time` module so cache ages and cooldowns can be stepped."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def fake():
+    fake = FakeMoneroOcean()
+    server = serve(fake)
+    yield fake, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(moneroocean, "time", clock)
+    return clock
+
+
+def test_keep_alive_connection_is_reused(fake):
+    _, url = fake
+    client = MoneroOceanClient(url)
+    client.get("/pool/stats")
+    conn = client._pool.queue[-1]
+    sock = conn.sock
+    client.get("/network/stats")
+    assert client.stats["requests"] == 2
+    assert client._pool.qsize() == 1
+    assert client._pool.queue[-1] is conn and conn.sock is sock
+
+
+def test_expired_entry_is_revalidated_with_304(fake, clock):
+    server, url = fake
+    client = MoneroOceanClient(url)
+    data, fresh = client.get(PATH)
+    assert fresh and data["hash"] == 4500.0
+
+    assert client.get(PATH) == (data, True)
+    assert client.stats["cache_hits"] == 1 and server.requests == 1
+
+    clock.advance(moneroocean.ttl_for(PATH) + 1)
+    assert client.age(PATH) > moneroocean.ttl_for(PATH)
+    assert client.get(PATH) == (data, True)
+    assert server.not_modified == 1 and client.stats["not_modified"] == 1
+    assert client.age(PATH) == 0
+
+
+def test_rate_limited_get_serves_stale_data(fake, clock):
+    server, url = fake
+    client = MoneroOceanClient(url, rate=0.001, burst=1)
+    data, _ = client.get(PATH)
+    clock.advance(moneroocean.ttl_for(PATH) + 1)
+    assert client.get(PATH) == (data, False)
+    assert server.requests == 1
+
+
+def test_breaker_opens_and_cooldown_doubles_on_failed_trials(fake, clock):
+    server, url = fake
+    client = MoneroOceanClient(url, rate=100.0, burst=100.0)
+    breaker = client.breaker
+    server.down = True
+
+    for _ in range(breaker.threshold):
+        assert breaker.state == "closed"
+        assert client.get(PATH) == ({}, False)
+    assert breaker.state == "open"
+    client.get(PATH)
+    assert client.stats["short_circuited"] == 1
+    assert server.requests == breaker.threshold
+
+    for cooldown in (30.0, 60.0, 120.0):
+        assert breaker.cooldown == cooldown
+        clock.advance(cooldown - 1)
+        assert breaker.state == "open"
+        clock.advance(1)
+        assert breaker.state == "half-open"
+        client.get(PATH)
+        assert breaker.state == "open"
+    assert breaker.cooldown == 240.0
+
+    server.down = False
+    clock.advance(240.0)
+    data, fresh = client.get(PATH)
+    assert fresh and data["hash"] == 4500.0
+    assert breaker.state == "closed" and breaker.cooldown == 30.0
@@ -0,0 +1,57 @@
+"""Rolling share windows: deltas, miner restarts, gaps and expiry."""
+
+from share_stats import RollingWindow, ShareAnalytics, format_window
+
+
+def test_summary_deltas_fill_every_window():
+    shares = ShareAnalytics()
+    shares.observe(0.0, 10, 10, 100, 40.0)
+    shares.observe(30.0, 12, 13, 130, 60.0)
+    window = shares.snapshot(30.0)["5m"]
+    assert (window["accepted"], window["rejected"], window["acceptance"]) == (2, 1, 0.6667)
+    assert window["shares_per_min"] == 4.0 and window["avg_share_time"] == 15.0
+    assert (window["ping_avg"], window["ping_max"]) == (50.0, 60.0)
+    assert shares.snapshot(30.0)["24h"]["accepted"] == 2
+    assert format_window(window) == "66.7% of 3 accepted • 4.0/min • ping 50 ms (max 60)"
+
+
+def test_counter_reset_counts_the_new_shares():
+    shares = ShareAnalytics()
+    shares.observe(0.0, 500, 505, 7200, None)
+    shares.observe(30.0, 3, 4, 20, None)  # the miner restarted in between
+    snapshot = shares.snapshot(30.0)
+    assert snapshot["resets"] == 1
+    assert (snapshot["1h"]["accepted"], snapshot["1h"]["rejected"]) == (3, 1)
+    # uptime going backwards is a restart even when the counters grew
+    shares.observe(60.0, 600, 600, 10, None)
+    assert shares.snapshot(60.0)["resets"] == 2 and shares.snapshot(60.0)["1h"]["accepted"] == 603
+
+
+def test_gaps_and_out_of_order_samples_only_rebaseline():
+    shares = ShareAnalytics(max_gap=300.0)
+    shares.observe(0.0, 10, 10, 100, None)
+    shares.observe(1000.0, 50, 50, 1100, None)  # too long ago to place in time
+    shares.observe(900.0, 60, 60, 1000, None)  # out of order: ignored
+    assert shares.snapshot(1000.0)["1h"]["accepted"] == 0
+    shares.observe(1030.0, 51, 51, 1130, None)
+    assert shares.snapshot(1030.0)["1h"]["accepted"] == 1
+
+
+def test_buckets_expire_as_the_window_moves():
+    shares = ShareAnalytics()
+    shares.observe(0.0, 0, 0, 10, None)
+    shares.observe(60.0, 5, 5, 70, None)
+    assert shares.snapshot(300.0)["5m"]["accepted"] == 5
+    later = shares.snapshot(400.0)
+    assert later["5m"]["accepted"] == 0 and later["5m"]["acceptance"] is None
+    assert later["1h"]["accepted"] == 5
+    assert format_window(later["5m"]) == "no shares yet"
+
+
+def test_ping_max_drops_out_with_its_bucket():
+    window = RollingWindow(30.0, 10.0)
+    window.add(0.0, 0, 0, 0.0, 100.0)
+    window.add(15.0, 0, 0, 0.0, 50.0)
+    assert window.stats(20.0)["ping_max"] == 100.0
+    assert window.stats(35.0)["ping_max"] == 50.0
+    assert window.stats(1000.0)["ping_max"] is None
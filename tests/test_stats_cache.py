@@ -0,0 +1,85 @@
+"""StatsCache refreshes, the error path and the refresher threads."""
+
+import threading
+import time
+
+from stats_cache import StatsCache, format_age
+
+
+class Source:
+    """A source that returns the next value, or raises while `error` is set."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.error = None
+
+    def __call__(self) -> int:
+        self.calls += 1
+        if self.error:
+            raise OSError(self.error)
+        return self.calls
+
+
+def test_default_is_served_until_the_first_refresh():
+    cache = StatsCache()
+    cache.register("pool", Source(), 60.0, default={"ok": False})
+    assert cache.get("pool") == {"ok": False}
+    assert cache.age("pool") is None
+    assert cache.status()["pool"] == {"age": None, "duration": 0.0, "refreshing": False, "error": None}
+    assert format_age(cache.age("pool")) == "waiting for first sample"
+
+
+def test_failed_refresh_keeps_the_value_and_its_age():
+    refreshed = []
+    source = Source()
+    cache = StatsCache(on_refresh=lambda name, entry: refreshed.append((name, entry.error)))
+    cache.register("pool", source, 60.0)
+    first = cache.refresh("pool")
+    assert cache.get("pool") == 1 and first.error is None
+
+    source.error = "connection refused"
+    time.sleep(0.05)
+    failed = cache.refresh("pool")
+    assert cache.get("pool") == 1
+    assert failed.updated == first.updated
+    assert cache.age("pool") >= 0.05
+    assert cache.status()["pool"]["error"] == "connection refused"
+
+    source.error = None
+    recovered = cache.refresh("pool")
+    assert cache.get("pool") == 3 and recovered.updated > first.updated
+    assert cache.status()["pool"]["error"] is None
+    assert refreshed == [("pool", None), ("pool", "connection refused"), ("pool", None)]
+
+
+def test_failure_before_any_value_still_has_no_age():
+    source = Source()
+    source.error = "timed out"
+    cache = StatsCache()
+    cache.register("pool", source, 60.0, default={})
+    cache.refresh("pool")
+    assert cache.get("pool") == {} and cache.age("pool") is None
+
+
+def test_refresher_threads_are_paced_and_woken():
+    source = Source()
+    paced = threading.Event()
+
+    def pace(name: str, interval: float) -> float:
+        paced.set()
+        return 60.0
+
+    cache = StatsCache(pace=pace)
+    cache.register("pool", source, 0.01)
+    cache.start()
+    try:
+        assert paced.wait(1.0)
+        time.sleep(0.05)
+        assert source.calls == 1  # paced to 60 s instead of 10 ms
+        cache.wake()
+        deadline = time.monotonic() + 1.0
+        while source.calls < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert source.calls == 2
+    finally:
+        cache.stop()
@@ -0,0 +1,100 @@
+"""Governor decisions on scripted readings and on the thermal simulation."""
+
+import pytest
+
+from autotune import Candidate, apply_candidate
+from miner_api import rx_entries
+from standins import FakeXMRig
+from thermal_governor import Governor, Hysteresis, Reading, build_levels, simulate
+
+BASE = apply_candidate({"cpu": {"enabled": True}, "randomx": {}}, Candidate(8, "cores", 1, 1), FakeXMRig.SIBLINGS)
+SETTINGS = Hysteresis(dwell=120.0, cool_period=300.0, settle=60.0)
+
+
+class Rig:
+    """Scripted miner: temperature and hashrate follow the thread count."""
+
+    def __init__(self, temps: dict, rates: dict) -> None:
+        self.config = BASE
+        self.temps = temps
+        self.rates = rates
+        self.throttles = 0
+        self.now = 0.0
+
+    @property
+    def threads(self) -> int:
+        return len(rx_entries(self.config["cpu"]["rx"]))
+
+    def put_config(self, config: dict) -> None:
+        self.config = config
+
+    def hashrate(self) -> float:
+        return self.rates.get(self.threads, 4000.0)
+
+    def read(self) -> Reading:
+        temp = self.temps.get(self.threads, 70.0)
+        return Reading(temp, {"Core 0": temp}, self.throttles, 0)
+
+    def clock(self) -> float:
+        return self.now
+
+
+def run(rig: Rig, seconds: float, interval: float = 10.0) -> Governor:
+    governor = Governor(rig, rig.read, build_levels(BASE), SETTINGS, clock=rig.clock, wall=rig.clock, quiet=True)
+    while rig.now < seconds:
+        rig.now += interval
+        governor.step()
+    return governor
+
+
+def test_build_levels_drop_one_thread_down_to_half():
+    assert [len(level["cpu"]["rx"]) for level in build_levels(BASE)] == [8, 7, 6, 5, 4]
+    assert [level["cpu"]["priority"] for level in build_levels({"cpu": {"priority": 2}}, "priority")][1:] == [1, 0]
+    with pytest.raises(ValueError):
+        build_levels({"cpu": {}})
+
+
+def test_critical_steps_down_without_waiting_for_the_dwell():
+    governor = run(Rig({8: 96.0}, {}), 10.0)
+    assert [(d["action"], d["setting"]) for d in governor.decisions] == [("down", "7 threads")]
+    assert governor.decisions[0]["reason"] == "96°C is critical"
+
+
+def test_high_temperature_waits_for_the_dwell():
+    governor = run(Rig({8: 88.0, 7: 88.0}, {}), 300.0)
+    assert [(d["time"], d["setting"]) for d in governor.decisions] == [(120.0, "7 threads"), (240.0, "6 threads")]
+
+
+def test_throttle_events_step_down_and_hold_off_stepping_up():
+    rig = Rig({}, {8: 4500.0, 7: 4000.0})
+    governor = Governor(rig, rig.read, build_levels(BASE), SETTINGS, clock=rig.clock, wall=rig.clock, quiet=True)
+    while rig.now < 500.0:
+        rig.now += 10.0
+        rig.throttles += 5 if rig.now == 150.0 else 0
+        governor.step()
+    # cool all along, but stepping back up waits cool_period after the last throttle
+    assert [(d["time"], d["action"], d["reason"]) for d in governor.decisions] == [
+        (150.0, "down", "5 throttle events"),
+        (450.0, "up", "70°C <= 75°C, no throttling for 300s"),
+    ]
+
+
+def test_level_that_sustained_less_is_reprobed_with_doubling_backoff():
+    # all 8 threads run hot and sustain less than 7 threads do
+    rig = Rig({8: 88.0}, {8: 3000.0, 7: 4000.0})
+    governor = run(rig, 3000.0)
+    actions = [(d["time"], d["action"]) for d in governor.decisions]
+    holds = [time for time, action in actions if action == "hold"]
+    probes = [time for time, action in actions if action == "up"]
+    assert [action for _, action in actions[:4]] == ["down", "hold", "up", "down"]
+    assert [probe - hold for hold, probe in zip(holds, probes)] == [120.0, 240.0, 480.0, 960.0]
+    assert governor.sustained[1] > governor.sustained[0]
+
+
+def test_governed_simulation_outearns_throttling():
+    plain = simulate(BASE, 2.0, Hysteresis(), governed=False)
+    governed = simulate(BASE, 2.0, Hysteresis(), governed=True)
+    assert plain["final"] == "8 threads" and plain["throttled_seconds"] > 600
+    assert governed["throttled_seconds"] < plain["throttled_seconds"] / 10
+    assert governed["mean_hashrate"] > plain["mean_hashrate"] * 1.05
+    assert governed["decisions"][0]["action"] == "down"